@@ -0,0 +1,137 @@
+# Heterogeneous CPU mixes for se_a15.py (--cpu-mix), e.g. big.LITTLE.
+#
+# A mix is a list of clusters joined by '+'. Each cluster is COUNTxTYPE followed
+# by optional '-' separated fields:
+#
+#   2xdetailed-w4+4xminor-l1d16kB-l1i16kB
+#
+# TYPE is a --cpu-type name known to gem5 (detailed, minor, timing, ...), wN
+# sets the O3 issue width of the cluster and l1dSIZE / l1iSIZE override its
+# private L1 sizes. The spec never contains '_', ',' or spaces so it can be used
+# as-is in run directory names and in the runner's lists; CPU types with a '_'
+# in their name (arm_detailed) are therefore rejected.
+#
+# This module does not import m5: se_a15.py passes gem5's CPU class lookup in,
+# which keeps the builder usable against a stub.
+
+import re
+
+CLUSTER_RE = re.compile(r"^(?P<count>\d+)x(?P<cpu_type>[a-z][a-z0-9]*)$")
+FIELD_RE = re.compile(r"^(?:w(?P<width>\d+)|l1d(?P<l1d>\d+[kM]B)|l1i(?P<l1i>\d+[kM]B))$")
+O3_TYPES = ("detailed",)
+
+
+def parse_cpu_mix(spec):
+    clusters = []
+    first_cpu = 0
+    for text in spec.split("+"):
+        parts = text.split("-")
+        match = CLUSTER_RE.match(parts[0])
+        if not match:
+            raise ValueError("invalid cluster '%s' (expected COUNTxTYPE, e.g. 2xdetailed)" % text)
+        cluster = {
+            "count": int(match.group("count")),
+            "cpu_type": match.group("cpu_type"),
+            "width": None,
+            "l1d_size": None,
+            "l1i_size": None,
+            "first_cpu": first_cpu,
+        }
+        if cluster["count"] <= 0:
+            raise ValueError("cluster '%s' has no cores" % text)
+        for field in parts[1:]:
+            field_match = FIELD_RE.match(field)
+            if not field_match:
+                raise ValueError("invalid field '%s' in cluster '%s'" % (field, text))
+            if field_match.group("width"):
+                if cluster["cpu_type"] not in O3_TYPES:
+                    raise ValueError("width only applies to O3 clusters (%s), not '%s'"
+                                     % (", ".join(O3_TYPES), cluster["cpu_type"]))
+                cluster["width"] = int(field_match.group("width"))
+            elif field_match.group("l1d"):
+                cluster["l1d_size"] = field_match.group("l1d")
+            else:
+                cluster["l1i_size"] = field_match.group("l1i")
+        clusters.append(cluster)
+        first_cpu += cluster["count"]
+    return clusters
+
+
+def total_cores(clusters):
+    return sum(cluster["count"] for cluster in clusters)
+
+
+def mix_tag(clusters):
+    # Canonical spec of parsed clusters (parse_cpu_mix(mix_tag(c)) == c).
+    tags = []
+    for cluster in clusters:
+        fields = ["%dx%s" % (cluster["count"], cluster["cpu_type"])]
+        if cluster["width"] is not None:
+            fields.append("w%d" % cluster["width"])
+        if cluster["l1d_size"]:
+            fields.append("l1d" + cluster["l1d_size"])
+        if cluster["l1i_size"]:
+            fields.append("l1i" + cluster["l1i_size"])
+        tags.append("-".join(fields))
+    return "+".join(tags)
+
+
+def build_cpus(clusters, get_cpu_class, num_threads=1):
+    # get_cpu_class(cpu_type) -> (class, memory mode), i.e. Simulation.getCPUClass.
+    cpus = []
+    mem_modes = set()
+    for cluster in clusters:
+        cpu_class, mem_mode = get_cpu_class(cluster["cpu_type"])
+        mem_modes.add(mem_mode)
+        for _ in range(cluster["count"]):
+            cpu = cpu_class(cpu_id=len(cpus))
+            cpu.numThreads = num_threads
+            if cluster["width"] is not None:
+                cpu.issueWidth = cluster["width"]
+            cpus.append(cpu)
+    if len(mem_modes) > 1:
+        raise ValueError("all clusters need the same memory mode, got: %s"
+                         % ", ".join(sorted(mem_modes)))
+    return cpus, mem_modes.pop()
+
+
+def apply_cache_sizes(cpus, clusters):
+    # Run after CacheConfig.config_cache(), which gives every core the same L1s.
+    for cluster in clusters:
+        for cpu in cpus[cluster["first_cpu"]:cluster["first_cpu"] + cluster["count"]]:
+            if cluster["l1d_size"]:
+                cpu.dcache.size = cluster["l1d_size"]
+            if cluster["l1i_size"]:
+                cpu.icache.size = cluster["l1i_size"]
+
+
+if __name__ == "__main__":
+    # Self-check against a stub of gem5's CPU classes: python3 cpu_mix.py
+    class StubCPU(object):
+        def __init__(self, cpu_id):
+            self.cpu_id = cpu_id
+
+    def stub_cpu_class(cpu_type):
+        return StubCPU, "atomic" if cpu_type == "atomic" else "timing"
+
+    spec = "2xdetailed-w4+4xminor-l1d16kB"
+    clusters = parse_cpu_mix(spec)
+    assert mix_tag(clusters) == spec
+    cpus, mem_mode = build_cpus(clusters, stub_cpu_class, num_threads=1)
+    assert mem_mode == "timing"
+    assert [cpu.cpu_id for cpu in cpus] == list(range(6))
+    assert [getattr(cpu, "issueWidth", None) for cpu in cpus] == [4, 4, None, None, None, None]
+    assert [cluster["first_cpu"] for cluster in clusters] == [0, 2]
+    for bad in ("2xarm_detailed", "2xminor-w4", "0xdetailed", "2xdetailed-x1"):
+        try:
+            parse_cpu_mix(bad)
+        except ValueError:
+            continue
+        raise AssertionError("accepted invalid mix: %s" % bad)
+    try:
+        build_cpus(parse_cpu_mix("1xdetailed+1xatomic"), stub_cpu_class)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("accepted clusters with different memory modes")
+    print("cpu_mix: ok")
@@ -132,12 +132,23 @@ def collect_done_ipc_rows(state_rows, size_filter):
     return valid, missing
 
 
+def add_useful_ipc(rows):
+    # sim_insts also counts spin-waiting (OMP_WAIT_POLICY=ACTIVE) and OpenMP runtime
+    # instructions. useful_ipc only counts the work of the t=1 run of the same width;
+    # sync_share is the fraction of committed instructions beyond that work.
+    work_by_width = {row["width"]: row["sim_insts"] for row in rows if row["threads"] == 1}
+    for row in rows:
+        work = work_by_width.get(row["width"])
+        row["useful_ipc"] = work / row["cycles"] if work else ""
+        row["sync_share"] = max(0.0, 1 - work / row["sim_insts"]) if work else ""
+
+
 def write_ipc_csv(rows, ipc_csv_path):
     rows_sorted = sorted(rows, key=lambda x: (x["size"], x["width"], x["threads"]))
     with ipc_csv_path.open("w", newline="", encoding="utf-8") as handle:
         writer = csv.DictWriter(
             handle,
-            fieldnames=["size", "width", "threads", "sim_insts", "cycles", "ipc", "outdir"],
+            fieldnames=["size", "width", "threads", "sim_insts", "cycles", "ipc", "useful_ipc", "sync_share", "outdir"],
         )
         writer.writeheader()
         writer.writerows(rows_sorted)
@@ -159,6 +170,7 @@ def write_ipc_max_csv(rows, ipc_max_csv_path):
                 "sim_insts": best["sim_insts"],
                 "cycles": best["cycles"],
                 "ipc": best["ipc"],
+                "useful_ipc": best["useful_ipc"],
                 "outdir": best["outdir"],
             }
         )
@@ -173,6 +185,7 @@ def write_ipc_max_csv(rows, ipc_max_csv_path):
             "sim_insts": global_best["sim_insts"],
             "cycles": global_best["cycles"],
             "ipc": global_best["ipc"],
+            "useful_ipc": global_best["useful_ipc"],
             "outdir": global_best["outdir"],
         }
     )
@@ -188,6 +201,7 @@ def write_ipc_max_csv(rows, ipc_max_csv_path):
                 "sim_insts",
                 "cycles",
                 "ipc",
+                "useful_ipc",
                 "outdir",
             ],
         )
@@ -228,6 +242,7 @@ def main():
 
     selected_size = args.size if args.size is not None else sizes[0]
     ipc_rows = [row for row in ipc_rows if row["size"] == selected_size]
+    add_useful_ipc(ipc_rows)
 
     images_dir = Path(args.images_dir)
     images_dir.mkdir(parents=True, exist_ok=True)
@@ -6,11 +6,6 @@ import re
 import sys
 from pathlib import Path
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import numpy as np
-
 
 CYCLES_MULTI_RE = re.compile(r"^system\.cpu\d+\.numCycles\s+(\d+)\b")
 CYCLES_SINGLE_RE = re.compile(r"^system\.cpu\.numCycles\s+(\d+)\b")
@@ -41,6 +36,11 @@ def parse_args():
         default=None,
         help="Optional size filter. Required if state has multiple sizes.",
     )
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Only write the CSV files (skips the 3D figure and the matplotlib import).",
+    )
     return parser.parse_args()
 
 
@@ -181,6 +181,8 @@ def write_speedup_csv(rows, speedup_csv_path):
 
 
 def build_grid(rows):
+    import numpy as np
+
     widths = sorted({row["width"] for row in rows})
     threads = sorted({row["threads"] for row in rows})
     width_index = {value: idx for idx, value in enumerate(widths)}
@@ -196,6 +198,12 @@ def build_grid(rows):
 
 
 def plot_3d(rows, image_path, size_filter):
+    # matplotlib and numpy are only imported when a figure is drawn (--no-plot skips them).
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     widths, threads, z_values = build_grid(rows)
 
     figure = plt.figure(figsize=(10, 7))
@@ -277,11 +285,13 @@ def main():
 
     write_csv(done_rows, csv_path)
     missing_baseline_widths = write_speedup_csv(done_rows, speedup_csv_path)
-    plot_3d(done_rows, image_path, selected_size)
+    if not args.no_plot:
+        plot_3d(done_rows, image_path, selected_size)
 
     print(f"Wrote CSV: {csv_path}")
     print(f"Wrote speedup CSV: {speedup_csv_path}")
-    print(f"Wrote image: {image_path}")
+    if not args.no_plot:
+        print(f"Wrote image: {image_path}")
 
     if missing_baseline_widths:
         print(
@@ -12,11 +12,21 @@ Options:
   --binary <path>        Path to benchmark binary (default: ./test_omp)
   --size <int>           Matrix size (default: 64)
   --widths "<list>"      O3 widths list, space/comma separated (default: "2 4 8")
-  --threads "<list>"     Thread list, space/comma separated (default: powers of 2 up to min(SIZE, 32))
-  --results-root <path>  Output root directory (default: results/A15)
+  --threads "<list>"     Thread list, space/comma separated (default: powers of 2 up to min(SIZE, 32),
+                         or the core count of each mix with --mixes)
+  --mixes "<list>"       Heterogeneous CPU mixes instead of --widths, space/comma separated,
+                         e.g. "2xdetailed-w4+4xminor" (see scripts/A15/cpu_mix.py)
+  --results-root <path>  Output root directory (default: results/A15, results/A15_mix with --mixes,
+                         with a _sampled suffix in sampled mode)
   --env-file <path>      Environment file passed to se_a15.py (--env)
   --omp-active-wait      Append OMP_WAIT_POLICY=ACTIVE and GOMP_SPINCOUNT=1000000000
   --no-caches            Disable --caches --l2cache
+  --maxinsts <int>       Sampled mode: stop after <int> instructions (se_a15.py --maxinsts)
+  --rel-max-tick <int>   Sampled mode: stop after <int> ticks (se_a15.py --rel-max-tick)
+  --fast-forward <int>   Sampled mode: fast-forward <int> instructions before measuring
+  --raw-logs             Write plain logs with tee instead of compressed logs + JSON summary
+  --reclaim              Put RUNNING rows back to PENDING first (after a runner was killed;
+                         only when no other runner works on this campaign)
   -h, --help             Show help
 EOF
 }
@@ -30,13 +40,19 @@ BINARY="./test_omp"
 SIZE=64
 WIDTHS="2 4 8"
 THREADS=""
-RESULTS_ROOT="results/A15"
+MIXES=""
+RESULTS_ROOT=""
 USE_CACHES=1
 MAX_THREADS=32
 ENV_FILE=""
 OMP_ACTIVE_WAIT=0
 EFFECTIVE_ENV_FILE=""
 TEMP_ENV_FILE=""
+MAXINSTS=""
+REL_MAX_TICK=""
+FAST_FORWARD=""
+RAW_LOGS=0
+RECLAIM=0
 
 while [[ $# -gt 0 ]]; do
   case "$1" in
@@ -60,6 +76,10 @@ while [[ $# -gt 0 ]]; do
       THREADS="${2:-}"
       shift 2
       ;;
+    --mixes)
+      MIXES="${2:-}"
+      shift 2
+      ;;
     --results-root)
       RESULTS_ROOT="${2:-}"
       shift 2
@@ -76,6 +96,26 @@ while [[ $# -gt 0 ]]; do
       USE_CACHES=0
       shift
       ;;
+    --maxinsts)
+      MAXINSTS="${2:-}"
+      shift 2
+      ;;
+    --rel-max-tick)
+      REL_MAX_TICK="${2:-}"
+      shift 2
+      ;;
+    --fast-forward)
+      FAST_FORWARD="${2:-}"
+      shift 2
+      ;;
+    --raw-logs)
+      RAW_LOGS=1
+      shift
+      ;;
+    --reclaim)
+      RECLAIM=1
+      shift
+      ;;
     -h|--help)
       usage
       exit 0
@@ -97,6 +137,34 @@ if ! is_positive_int "${SIZE}"; then
   exit 1
 fi
 
+for sample_opt in "MAXINSTS:--maxinsts" "REL_MAX_TICK:--rel-max-tick" "FAST_FORWARD:--fast-forward"; do
+  var_name="${sample_opt%%:*}"
+  value="${!var_name}"
+  if [[ -n "${value}" ]] && ! is_positive_int "${value}"; then
+    echo "Error: ${sample_opt#*:} must be a positive integer (got: ${value})" >&2
+    exit 1
+  fi
+done
+
+SAMPLED=0
+if [[ -n "${MAXINSTS}" || -n "${REL_MAX_TICK}" ]]; then
+  SAMPLED=1
+elif [[ -n "${FAST_FORWARD}" ]]; then
+  echo "Error: --fast-forward needs a measurement window (--maxinsts or --rel-max-tick)." >&2
+  exit 1
+fi
+
+# Sampled and mixed runs go to their own tree so they never shadow full runs in state.tsv.
+if [[ -z "${RESULTS_ROOT}" ]]; then
+  RESULTS_ROOT="results/A15"
+  if [[ -n "${MIXES}" ]]; then
+    RESULTS_ROOT="${RESULTS_ROOT}_mix"
+  fi
+  if (( SAMPLED )); then
+    RESULTS_ROOT="${RESULTS_ROOT}_sampled"
+  fi
+fi
+
 read_list() {
   local raw="$1"
   raw="${raw//,/ }"
@@ -117,6 +185,41 @@ for width in "${WIDTHS_LIST[@]}"; do
   fi
 done
 
+# Total core count of a mix: sum of the COUNT of every COUNTxTYPE cluster.
+mix_cores() {
+  local mix="$1"
+  local cluster count total=0
+  local -a clusters
+  IFS='+' read -r -a clusters <<< "${mix}"
+  for cluster in "${clusters[@]}"; do
+    count="${cluster%%x*}"
+    if [[ "${count}" == "${cluster}" ]] || ! is_positive_int "${count}"; then
+      return 1
+    fi
+    total=$((total + count))
+  done
+  echo "${total}"
+}
+
+MIXES_LIST=()
+if [[ -n "${MIXES}" ]]; then
+  mapfile -t MIXES_LIST < <(read_list "${MIXES}")
+  if [[ "${#MIXES_LIST[@]}" -eq 0 ]]; then
+    echo "Error: --mixes is empty." >&2
+    exit 1
+  fi
+  for mix in "${MIXES_LIST[@]}"; do
+    if [[ "${mix}" == *_* ]] || ! mix_cores "${mix}" > /dev/null; then
+      echo "Error: invalid mix: ${mix} (expected COUNTxTYPE[-wN]... joined by '+')" >&2
+      exit 1
+    fi
+  done
+  # A mix is one configuration, like one width: the loops below run over CONFIG_LIST.
+  CONFIG_LIST=("${MIXES_LIST[@]}")
+else
+  CONFIG_LIST=("${WIDTHS_LIST[@]}")
+fi
+
 THREADS_LIST=()
 if [[ -n "${THREADS}" ]]; then
   mapfile -t THREADS_LIST < <(read_list "${THREADS}")
@@ -124,7 +227,7 @@ if [[ -n "${THREADS}" ]]; then
     echo "Error: --threads is empty." >&2
     exit 1
   fi
-else
+elif [[ "${#MIXES_LIST[@]}" -eq 0 ]]; then
   t=1
   while (( t <= SIZE && t <= MAX_THREADS )); do
     THREADS_LIST+=("${t}")
@@ -145,10 +248,47 @@ for threads in "${THREADS_LIST[@]}"; do
     echo "Error: thread value ${threads} exceeds size ${SIZE}." >&2
     exit 1
   fi
+  for mix in "${MIXES_LIST[@]}"; do
+    if (( threads > $(mix_cores "${mix}") )); then
+      echo "Error: thread value ${threads} exceeds the $(mix_cores "${mix}") cores of mix ${mix}." >&2
+      exit 1
+    fi
+  done
 done
 
+# Per-configuration helpers: a configuration is a width, or a mix with --mixes.
+# Mixed runs are keyed by the mix column of state.tsv and have width "-".
+config_width() {
+  if [[ "${#MIXES_LIST[@]}" -gt 0 ]]; then echo "-"; else echo "$1"; fi
+}
+
+config_mix() {
+  if [[ "${#MIXES_LIST[@]}" -gt 0 ]]; then echo "$1"; else echo "-"; fi
+}
+
+config_threads() {
+  if [[ "${#THREADS_LIST[@]}" -gt 0 ]]; then
+    printf '%s\n' "${THREADS_LIST[@]}"
+  else
+    mix_cores "$1"
+  fi
+}
+
+run_name() {
+  if [[ "${#MIXES_LIST[@]}" -gt 0 ]]; then
+    echo "s${SIZE}_m$1_t$2"
+  else
+    echo "s${SIZE}_w$1_t$2"
+  fi
+}
+
 GEM5_BIN="${GEM5}/build/ARM/gem5.fast"
 SE_SCRIPT="${SCRIPT_DIR}/se_a15.py"
+LOG_CAPTURE="${REPO_ROOT}/scripts/cmpperf/logcapture.py"
+LOG_EXT="log.gz"
+if (( RAW_LOGS )); then
+  LOG_EXT="log"
+fi
 
 if [[ ! -x "${GEM5_BIN}" ]]; then
   echo "Error: gem5 binary not found or not executable: ${GEM5_BIN}" >&2
@@ -199,20 +339,42 @@ LOGS_DIR="${RESULTS_ROOT}/logs"
 mkdir -p "${LOGS_DIR}"
 
 STATE_FILE="${RESULTS_ROOT}/state.tsv"
+# Same lock and claim statuses as scripts/cmpperf/run_campaign.py, so both can work
+# on one campaign: every read-modify-write of state.tsv holds an flock on this file.
+STATE_LOCK="${STATE_FILE}.lock"
+OWNER="$(hostname)-$$"
+CLAIMED_RUN=()
 
+# Rows written before the mix column existed have an empty 7th field: read it as "-".
 get_existing_status() {
   local size="$1"
   local width="$2"
   local threads="$3"
-  local state_path="$4"
-  awk -F'\t' -v s="${size}" -v w="${width}" -v t="${threads}" '
+  local mix="$4"
+  local state_path="$5"
+  awk -F'\t' -v s="${size}" -v w="${width}" -v t="${threads}" -v m="${mix}" '
     NR == 1 { next }
-    $1 == s && $2 == w && $3 == t { print $4; exit }
+    $1 == s && $2 == w && $3 == t && ($7 == "" ? "-" : $7) == m { print $4; exit }
+  ' "${state_path}"
+}
+
+# Columns after mix (host usage written by run_campaign.py) of an existing row,
+# padded to the header: "\tfield8\tfield9..." or nothing.
+get_existing_extra() {
+  local size="$1"
+  local width="$2"
+  local threads="$3"
+  local mix="$4"
+  local state_path="$5"
+  awk -F'\t' -v s="${size}" -v w="${width}" -v t="${threads}" -v m="${mix}" '
+    NR == 1 { columns = NF; next }
+    $1 == s && $2 == w && $3 == t && ($7 == "" ? "-" : $7) == m { found = 1; exit }
+    END { for (i = 8; i <= columns; i++) printf "\t%s", (found ? $i : "") }
   ' "${state_path}"
 }
 
 initialize_state_file() {
-  local tmp_state old_state status outdir log_path
+  local tmp_state old_state status outdir log_path name width mix extra
   tmp_state="$(mktemp)"
   old_state=""
 
@@ -221,26 +383,54 @@ initialize_state_file() {
     cp "${STATE_FILE}" "${old_state}"
   fi
 
-  printf "size\twidth\tthreads\tstatus\toutdir\tlog\n" > "${tmp_state}"
-
-  for width in "${WIDTHS_LIST[@]}"; do
-    for threads in "${THREADS_LIST[@]}"; do
-      outdir="${RESULTS_ROOT}/s${SIZE}_w${width}_t${threads}"
-      log_path="${LOGS_DIR}/s${SIZE}_w${width}_t${threads}.log"
+  printf "size\twidth\tthreads\tstatus\toutdir\tlog\tmix" > "${tmp_state}"
+  if [[ -n "${old_state}" ]]; then
+    head -n 1 "${old_state}" | awk -F'\t' '{ for (i = 8; i <= NF; i++) printf "\t%s", $i }' >> "${tmp_state}"
+  fi
+  printf "\n" >> "${tmp_state}"
+
+  for config in "${CONFIG_LIST[@]}"; do
+    width="$(config_width "${config}")"
+    mix="$(config_mix "${config}")"
+    while read -r threads; do
+      name="$(run_name "${config}" "${threads}")"
+      outdir="${RESULTS_ROOT}/${name}"
+      log_path="${LOGS_DIR}/${name}.${LOG_EXT}"
       status="PENDING"
+      extra=""
 
       if [[ -n "${old_state}" ]]; then
-        existing_status="$(get_existing_status "${SIZE}" "${width}" "${threads}" "${old_state}")"
+        existing_status="$(get_existing_status "${SIZE}" "${width}" "${threads}" "${mix}" "${old_state}")"
         if [[ -n "${existing_status}" ]]; then
           status="${existing_status}"
         fi
+        if (( RECLAIM )) && [[ "${status}" == RUNNING* ]]; then
+          status="PENDING"
+        fi
+        extra="$(get_existing_extra "${SIZE}" "${width}" "${threads}" "${mix}" "${old_state}")"
       fi
 
-      printf "%s\t%s\t%s\t%s\t%s\t%s\n" \
-        "${SIZE}" "${width}" "${threads}" "${status}" "${outdir}" "${log_path}" >> "${tmp_state}"
-    done
+      printf "%s\t%s\t%s\t%s\t%s\t%s\t%s%s\n" \
+        "${SIZE}" "${width}" "${threads}" "${status}" "${outdir}" "${log_path}" "${mix}" "${extra}" >> "${tmp_state}"
+    done < <(config_threads "${config}")
   done
 
+  # Rows this run does not plan (another runner's widths/threads) are kept, claims included.
+  if [[ -n "${old_state}" ]]; then
+    awk -F'\t' -v OFS='\t' -v reclaim="${RECLAIM}" '
+      FNR == NR { if (FNR > 1) planned[$1 FS $2 FS $3 FS $7] = 1; next }
+      FNR == 1 { next }
+      {
+        $7 = ($7 == "" ? "-" : $7)
+        if (($1 FS $2 FS $3 FS $7) in planned) next
+        if (reclaim && $4 ~ /^RUNNING/) $4 = "PENDING"
+        print
+      }
+    ' "${tmp_state}" "${old_state}" > "${old_state}.others"
+    cat "${old_state}.others" >> "${tmp_state}"
+    rm -f "${old_state}.others"
+  fi
+
   mv "${tmp_state}" "${STATE_FILE}"
   if [[ -n "${old_state}" ]]; then
     rm -f "${old_state}"
@@ -251,18 +441,19 @@ update_state_status() {
   local size="$1"
   local width="$2"
   local threads="$3"
-  local status="$4"
-  local outdir="$5"
-  local log_path="$6"
+  local mix="$4"
+  local status="$5"
+  local outdir="$6"
+  local log_path="$7"
   local tmp_file
 
   tmp_file="$(mktemp)"
   awk -F'\t' -v OFS='\t' \
-      -v s="${size}" -v w="${width}" -v t="${threads}" \
+      -v s="${size}" -v w="${width}" -v t="${threads}" -v m="${mix}" \
       -v new_status="${status}" -v new_outdir="${outdir}" -v new_log="${log_path}" '
     NR == 1 { print; next }
     {
-      if ($1 == s && $2 == w && $3 == t) {
+      if ($1 == s && $2 == w && $3 == t && $7 == m) {
         $4 = new_status
         $5 = new_outdir
         $6 = new_log
@@ -278,20 +469,52 @@ get_state_status() {
   local size="$1"
   local width="$2"
   local threads="$3"
-  awk -F'\t' -v s="${size}" -v w="${width}" -v t="${threads}" '
+  local mix="$4"
+  awk -F'\t' -v s="${size}" -v w="${width}" -v t="${threads}" -v m="${mix}" '
     NR == 1 { next }
-    $1 == s && $2 == w && $3 == t { print $4; exit }
+    $1 == s && $2 == w && $3 == t && $7 == m { print $4; exit }
   ' "${STATE_FILE}"
 }
 
-initialize_state_file
+with_state_lock() {
+  ( flock -x 9 && "$@" ) 9>>"${STATE_LOCK}"
+}
+
+# Marks a run RUNNING:<owner> unless it is done or claimed by another runner;
+# prints the status that prevented the claim.
+claim_run() {
+  local status
+  status="$(get_state_status "$1" "$2" "$3" "$4")"
+  if [[ "${status}" == DONE* || "${status}" == RUNNING* ]]; then
+    echo "${status}"
+    return 1
+  fi
+  update_state_status "$1" "$2" "$3" "$4" "RUNNING:${OWNER}" "$5" "$6"
+}
+
+# A run interrupted by Ctrl-C or an error goes back to PENDING for the next runner.
+release_claim() {
+  if [[ "${#CLAIMED_RUN[@]}" -gt 0 ]]; then
+    with_state_lock update_state_status "${CLAIMED_RUN[@]:0:4}" "PENDING" "${CLAIMED_RUN[@]:4}"
+  fi
+}
+trap release_claim EXIT
+trap 'exit 130' INT
+trap 'exit 143' TERM
+
+with_state_lock initialize_state_file
 
 echo "Q9 A15 batch start"
 echo "- GEM5: ${GEM5}"
 echo "- BINARY: ${BINARY}"
 echo "- SIZE: ${SIZE}"
-echo "- WIDTHS: ${WIDTHS_LIST[*]}"
-echo "- THREADS: ${THREADS_LIST[*]}"
+if [[ "${#MIXES_LIST[@]}" -gt 0 ]]; then
+  echo "- MIXES: ${MIXES_LIST[*]}"
+  echo "- THREADS: ${THREADS_LIST[*]:-cores of each mix}"
+else
+  echo "- WIDTHS: ${WIDTHS_LIST[*]}"
+  echo "- THREADS: ${THREADS_LIST[*]}"
+fi
 echo "- RESULTS_ROOT: ${RESULTS_ROOT}"
 if [[ -n "${EFFECTIVE_ENV_FILE}" ]]; then
   echo "- ENV_FILE: ${EFFECTIVE_ENV_FILE}"
@@ -301,20 +524,31 @@ if (( USE_CACHES )); then
 else
   echo "- CACHES: disabled"
 fi
+if (( SAMPLED )); then
+  echo "- SAMPLED: maxinsts=${MAXINSTS:-none} rel_max_tick=${REL_MAX_TICK:-none} fast_forward=${FAST_FORWARD:-none}"
+fi
 if (( OMP_ACTIVE_WAIT )); then
   echo "- OMP_ACTIVE_WAIT: enabled (OMP_WAIT_POLICY=ACTIVE, GOMP_SPINCOUNT=1000000000)"
 fi
 
-for width in "${WIDTHS_LIST[@]}"; do
-  for threads in "${THREADS_LIST[@]}"; do
-    status="$(get_state_status "${SIZE}" "${width}" "${threads}")"
-    outdir="${RESULTS_ROOT}/s${SIZE}_w${width}_t${threads}"
-    log_path="${LOGS_DIR}/s${SIZE}_w${width}_t${threads}.log"
+for config in "${CONFIG_LIST[@]}"; do
+  width="$(config_width "${config}")"
+  mix="$(config_mix "${config}")"
+  mapfile -t config_threads_list < <(config_threads "${config}")
+  for threads in "${config_threads_list[@]}"; do
+    name="$(run_name "${config}" "${threads}")"
+    outdir="${RESULTS_ROOT}/${name}"
+    log_path="${LOGS_DIR}/${name}.${LOG_EXT}"
+    label="size=${SIZE} width=${width} threads=${threads}"
+    if [[ "${mix}" != "-" ]]; then
+      label="size=${SIZE} mix=${mix} threads=${threads}"
+    fi
 
-    if [[ "${status}" == "DONE" ]]; then
-      echo "SKIP DONE: size=${SIZE} width=${width} threads=${threads}"
+    if ! status="$(with_state_lock claim_run "${SIZE}" "${width}" "${threads}" "${mix}" "${outdir}" "${log_path}")"; then
+      echo "SKIP ${status}: ${label}"
       continue
     fi
+    CLAIMED_RUN=("${SIZE}" "${width}" "${threads}" "${mix}" "${outdir}" "${log_path}")
 
     mkdir -p "${outdir}"
     cmd=(
@@ -322,8 +556,14 @@ for width in "${WIDTHS_LIST[@]}"; do
       "--outdir=${outdir}"
       "${SE_SCRIPT}"
       "--cpu-type=detailed"
-      "--o3-width=${width}"
-      "--num-cpus=${threads}"
+    )
+    if [[ "${mix}" != "-" ]]; then
+      # se_a15.py derives --num-cpus and the per-cluster widths from the mix.
+      cmd+=("--cpu-mix=${mix}")
+    else
+      cmd+=("--o3-width=${width}" "--num-cpus=${threads}")
+    fi
+    cmd+=(
       "-c" "${BINARY}"
       "-o" "${threads} ${SIZE}"
     )
@@ -336,23 +576,43 @@ for width in "${WIDTHS_LIST[@]}"; do
       cmd+=("--caches" "--l2cache")
     fi
 
-    echo "RUN: size=${SIZE} width=${width} threads=${threads}"
+    if [[ -n "${MAXINSTS}" ]]; then
+      cmd+=("--maxinsts=${MAXINSTS}")
+    fi
+    if [[ -n "${REL_MAX_TICK}" ]]; then
+      cmd+=("--rel-max-tick=${REL_MAX_TICK}")
+    fi
+    if [[ -n "${FAST_FORWARD}" ]]; then
+      cmd+=("--fast-forward=${FAST_FORWARD}")
+    fi
+
+    echo "RUN: ${label}"
     echo "LOG: ${log_path}"
 
     set +e
-    "${cmd[@]}" 2>&1 | tee "${log_path}"
-    cmd_status=${PIPESTATUS[0]}
+    if (( RAW_LOGS )); then
+      "${cmd[@]}" 2>&1 | tee "${log_path}"
+      cmd_status=${PIPESTATUS[0]}
+    else
+      python3 "${LOG_CAPTURE}" --log "${log_path}" -- "${cmd[@]}"
+      cmd_status=$?
+    fi
     set -e
 
     if (( cmd_status != 0 )); then
-      update_state_status "${SIZE}" "${width}" "${threads}" "FAILED" "${outdir}" "${log_path}"
-      echo "FAILED at size=${SIZE} width=${width} threads=${threads} (exit=${cmd_status})" >&2
+      with_state_lock update_state_status "${SIZE}" "${width}" "${threads}" "${mix}" "FAILED" "${outdir}" "${log_path}"
+      CLAIMED_RUN=()
+      echo "FAILED at ${label} (exit=${cmd_status})" >&2
+      if [[ -f "${log_path}.summary.json" ]]; then
+        echo "Summary: ${log_path}.summary.json" >&2
+      fi
       echo "See full log: ${log_path}" >&2
       exit "${cmd_status}"
     fi
 
-    update_state_status "${SIZE}" "${width}" "${threads}" "DONE" "${outdir}" "${log_path}"
-    echo "DONE: size=${SIZE} width=${width} threads=${threads}"
+    with_state_lock update_state_status "${SIZE}" "${width}" "${threads}" "${mix}" "DONE" "${outdir}" "${log_path}"
+    CLAIMED_RUN=()
+    echo "DONE: ${label}"
   done
 done
 
@@ -80,6 +80,9 @@ import MemConfig
 from Caches import *
 from cpu2000 import *
 
+# Custom change: heterogeneous CPU mixes (--cpu-mix), see cpu_mix.py next to this script.
+import cpu_mix
+
 # Check if KVM support has been enabled, we might need to do VM
 # configuration if that's the case.
 have_kvm_support = 'BaseKvmCPU' in globals()
@@ -143,6 +146,10 @@ Options.addCommonOptions(parser)
 Options.addSEOptions(parser)
 # Custom change: set a default issue width for detailed/O3 runs.
 parser.set_defaults(o3_width=2)
+# Custom change: heterogeneous clusters, e.g. --cpu-mix=2xdetailed-w4+4xminor
+parser.add_option("--cpu-mix", type="string", default=None,
+                  help="Heterogeneous CPU clusters: COUNTxTYPE[-wN][-l1dSIZE][-l1iSIZE] "
+                       "joined by '+' (overrides --cpu-type/--num-cpus/--o3-width)")
 
 if '--ruby' in sys.argv:
     Ruby.define_options(parser)
@@ -185,15 +192,42 @@ else:
     sys.exit(1)
 
 
-(CPUClass, test_mem_mode, FutureClass) = Simulation.setCPUClass(options)
-CPUClass.numThreads = numThreads
+# Custom change: a CPU mix builds its own per-cluster CPU list.
+clusters = None
+if options.cpu_mix:
+    try:
+        clusters = cpu_mix.parse_cpu_mix(options.cpu_mix)
+    except ValueError as e:
+        fatal("--cpu-mix: %s" % e)
+    if options.fast_forward or options.checkpoint_restore != None or options.smt:
+        fatal("--cpu-mix cannot be combined with --fast-forward, "
+              "--checkpoint-restore or --smt")
+    options.num_cpus = cpu_mix.total_cores(clusters)
+    try:
+        (mix_cpus, test_mem_mode) = cpu_mix.build_cpus(
+            clusters, Simulation.getCPUClass, numThreads)
+    except ValueError as e:
+        fatal("--cpu-mix: %s" % e)
+    CPUClass = mix_cpus[0].__class__
+    FutureClass = None
+else:
+    (CPUClass, test_mem_mode, FutureClass) = Simulation.setCPUClass(options)
+    CPUClass.numThreads = numThreads
+    # Custom change: with --fast-forward, system.cpu are atomic CPUs and the O3
+    # cores are the switch CPUs Simulation.run builds from FutureClass.
+    if options.cpu_type == "detailed" and FutureClass:
+        FutureClass.issueWidth = options.o3_width
 
 # Check -- do not allow SMT with multiple CPUs
 if options.smt and options.num_cpus > 1:
     fatal("You cannot use SMT with multiple CPUs!")
 
 np = options.num_cpus
-system = System(cpu = [CPUClass(cpu_id=i) for i in xrange(np)],
+if clusters:
+    cpus = mix_cpus
+else:
+    cpus = [CPUClass(cpu_id=i) for i in xrange(np)]
+system = System(cpu = cpus,
                 mem_mode = test_mem_mode,
                 mem_ranges = [AddrRange(options.mem_size)],
                 cache_line_size = options.cacheline_size)
@@ -242,7 +276,7 @@ if options.simpoint_profile:
         fatal("SimPoint generation not supported with more than one CPUs")
 
 for i in xrange(np):
-    if options.cpu_type == "detailed":  #
+    if options.cpu_type == "detailed" and not clusters and not FutureClass:  #
         system.cpu[i].issueWidth = options.o3_width #
     if options.smt:
         system.cpu[i].workload = multiprocesses
@@ -294,6 +328,9 @@ else:
     system.membus = SystemXBar()
     system.system_port = system.membus.slave
     CacheConfig.config_cache(options, system)
+    # Custom change: per-cluster L1 sizes of a CPU mix.
+    if clusters and options.caches:
+        cpu_mix.apply_cache_sizes(system.cpu, clusters)
     MemConfig.config_mem(options, system)
 
 root = Root(full_system = False, system = system)
@@ -71,14 +71,25 @@ def main(a7_dir="results/A7", size=64, out_csv="results/images/A7/q7_ipc.csv"):
         # Optional: "global" IPC like A15 (sim_insts / cycles_app)
         ipc_global = (sim_insts / cycles_app) if (sim_insts is not None and cycles_app > 0) else float("nan")
 
-        rows.append((t, ipc_max, f"cpu{cpu_max:02d}", ipc_global))
+        rows.append((t, ipc_max, f"cpu{cpu_max:02d}", ipc_global, sim_insts, cycles_app))
 
     rows.sort(key=lambda x: x[0])
 
+    # Useful-work IPC: only the t=1 instructions count, not the extra ones committed by
+    # OpenMP waiting/runtime code (sync_share); comparable with OMP_WAIT_POLICY=ACTIVE runs
+    work = next((r[4] for r in rows if r[0] == 1), None)
+    out = []
+    for t, ipc_max, cpu, ipc_global, sim_insts, cycles_app in rows:
+        if work and sim_insts and cycles_app > 0:
+            useful_ipc, sync_share = work / cycles_app, max(0.0, 1 - work / sim_insts)
+        else:
+            useful_ipc, sync_share = float("nan"), float("nan")
+        out.append((t, ipc_max, cpu, ipc_global, useful_ipc, sync_share))
+
     with out_csv.open("w", newline="") as f:
         w = csv.writer(f)
-        w.writerow(["threads", "ipc_max", "cpu_at_ipc_max", "ipc_global"])
-        w.writerows(rows)
+        w.writerow(["threads", "ipc_max", "cpu_at_ipc_max", "ipc_global", "useful_ipc", "sync_share"])
+        w.writerows(out)
 
     print("[OK] wrote", out_csv)
 
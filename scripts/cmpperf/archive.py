@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import concurrent.futures
+import fnmatch
+import hashlib
+import io
+import itertools
+import json
+import os
+import resource
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+from campaign import find_runs
+from gem5stats import read_stats
+
+
+ARCHIVE_VERSION = 2
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Pack finished runs into a compressed, indexed campaign archive "
+            "(columnar stats + deduplicated config blobs), or inspect one."
+        )
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pack = sub.add_parser("pack", help="Add the runs found under --results-root to an archive.")
+    pack.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for run directories with stats.txt (default: results).",
+    )
+    pack.add_argument(
+        "--archive",
+        default="results/campaigns.cmpz",
+        help="Archive path; existing runs are kept and updated (default: results/campaigns.cmpz).",
+    )
+    pack.add_argument(
+        "--keep",
+        action="append",
+        default=None,
+        help="Stat family glob to keep, e.g. 'system.cpu*.numCycles' or 'system.l2.*' (repeatable). Default: all.",
+    )
+    pack.add_argument(
+        "--keep-file",
+        default=None,
+        help="File with one stat family glob per line (# comments allowed).",
+    )
+    pack.add_argument(
+        "--all-status",
+        action="store_true",
+        help="Also pack runs whose state.tsv status is not DONE*.",
+    )
+    pack.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Parser processes (default: CPU count).",
+    )
+    pack.add_argument(
+        "--chunk",
+        type=int,
+        default=16,
+        help="Runs per worker task; with --jobs it bounds the parsed data held at once (default: 16).",
+    )
+
+    info = sub.add_parser("info", help="List the runs and sizes stored in an archive.")
+    info.add_argument("--archive", default="results/campaigns.cmpz")
+
+    show = sub.add_parser("show", help="Print stats (or a config) of one archived run.")
+    show.add_argument("--archive", default="results/campaigns.cmpz")
+    show.add_argument("run", help="Run name, e.g. A15/s64_w4_t8.")
+    show.add_argument("--key", action="append", default=None, help="Stat key glob to print (repeatable).")
+    show.add_argument("--config", choices=["ini", "json"], default=None, help="Print a config file instead.")
+    return parser.parse_args()
+
+
+def blob_hash(data):
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+def split_ini_sections(text):
+    sections = []
+    current = []
+    for line in text.splitlines(keepends=True):
+        if line.startswith("[") and current:
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+class CampaignArchive:
+    # Layout (a zip with LZMA members, so any member is readable without extracting the rest):
+    #   index.json            runs (coordinates, --keep patterns, config references)
+    #   stats/keys.json       stat key of every column
+    #   stats/values.npy      float64 [runs x keys]
+    #   stats/present.npy     bool [runs x keys] (gem5 itself writes nan, so NaN is not "missing")
+    #   configs/ini.json      {hash: section text}; a config.ini is a list of section hashes
+    #   configs/json/<hash>   config.json blobs, deduplicated by content
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.zip = zipfile.ZipFile(self.path, "r")
+        self.index = json.loads(self.zip.read("index.json"))
+        self.runs = self.index["runs"]
+        for run in self.runs:
+            # Version 1 archives: mix and --keep patterns were not stored per run.
+            run.setdefault("mix", None)
+            run.setdefault("keep_patterns", self.index.get("keep_patterns"))
+        self.run_index = {run["name"]: i for i, run in enumerate(self.runs)}
+        self.keys = json.loads(self.zip.read("stats/keys.json"))
+        self.key_index = {key: j for j, key in enumerate(self.keys)}
+        self.int_keys = set(self.index["int_keys"])
+        self._values = None
+        self._present = None
+        self._ini_sections = None
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_npy(self, name):
+        import numpy as np
+
+        return np.load(io.BytesIO(self.zip.read(name)), allow_pickle=False)
+
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = self._load_npy("stats/values.npy")
+        return self._values
+
+    @property
+    def present(self):
+        if self._present is None:
+            self._present = self._load_npy("stats/present.npy")
+        return self._present
+
+    def _rows(self, name):
+        # Rows of a stats matrix streamed from the zip; only one row is held at a time.
+        with self.zip.open(name) as member:
+            yield from npy_rows(member)
+
+    def row(self, run_name):
+        # Values and presence of one run, without loading the [runs x keys] matrices
+        # (the members are still decompressed up to that row).
+        i = self.run_index[run_name]
+        if self._values is not None and self._present is not None:
+            return self._values[i], self._present[i]
+        values = next(itertools.islice(self._rows("stats/values.npy"), i, None))
+        present = next(itertools.islice(self._rows("stats/present.npy"), i, None))
+        return values, present
+
+    def column(self, key):
+        import numpy as np
+
+        # One stat across every archived run (NaN where a run does not have it).
+        j = self.key_index[key]
+        if self._values is not None and self._present is not None:
+            return np.where(self._present[:, j], self._values[:, j], np.nan)
+        values = np.fromiter((row[j] for row in self._rows("stats/values.npy")), dtype=np.float64, count=len(self.runs))
+        present = np.fromiter((row[j] for row in self._rows("stats/present.npy")), dtype=bool, count=len(self.runs))
+        return np.where(present, values, np.nan)
+
+    def stats(self, run_name, patterns=None):
+        import numpy as np
+
+        row, mask = self.row(run_name)
+        stats = {}
+        for j in np.flatnonzero(mask):
+            key = self.keys[j]
+            if patterns and not any(fnmatch.fnmatchcase(key, pattern) for pattern in patterns):
+                continue
+            value = float(row[j])
+            stats[key] = int(value) if value.is_integer() and key in self.int_keys else value
+        return stats
+
+    def config_ini(self, run_name):
+        if self._ini_sections is None:
+            self._ini_sections = json.loads(self.zip.read("configs/ini.json"))
+        sections = self.runs[self.run_index[run_name]].get("config_ini")
+        if sections is None:
+            return None
+        return "".join(self._ini_sections[h] for h in sections)
+
+    def config_json(self, run_name):
+        blob = self.runs[self.run_index[run_name]].get("config_json")
+        if blob is None:
+            return None
+        return json.loads(self.zip.read(f"configs/json/{blob}"))
+
+
+def load_keep_patterns(args):
+    patterns = list(args.keep or [])
+    if args.keep_file:
+        for line in Path(args.keep_file).read_text().splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                patterns.append(line)
+    return patterns or None
+
+
+def parse_chunk(runs, patterns):
+    import numpy as np
+
+    # Worker side: parses a chunk of runs and returns compact arrays instead of
+    # stats dicts. Keys are sent once per chunk; each run gets int32 indexes into
+    # them, float64 values and an is-integer mask.
+    chunk_keys = {}
+    parsed = []
+    ini_sections = {}
+    json_blobs = {}
+    bytes_in = 0
+    for run in runs:
+        outdir = Path(run["outdir"])
+        stats = read_stats(run["stats_path"])
+        if patterns:
+            stats = {k: v for k, v in stats.items() if any(fnmatch.fnmatchcase(k, p) for p in patterns)}
+        bytes_in += Path(run["stats_path"]).stat().st_size
+        ids = np.fromiter((chunk_keys.setdefault(key, len(chunk_keys)) for key in stats), dtype=np.int32, count=len(stats))
+        values = np.fromiter(stats.values(), dtype=np.float64, count=len(stats))
+        is_int = np.fromiter((isinstance(value, int) for value in stats.values()), dtype=bool, count=len(stats))
+
+        entry = {
+            "name": run["name"],
+            "campaign": run["campaign"],
+            "size": run["size"],
+            "width": run["width"],
+            "mix": run["mix"],
+            "threads": run["threads"],
+            "status": run["status"],
+            # Per run: a later pack with other --keep patterns leaves this run's stats as they were.
+            "keep_patterns": patterns,
+            "config_ini": None,
+            "config_json": None,
+        }
+        ini_path = outdir / "config.ini"
+        if ini_path.is_file():
+            text = ini_path.read_text(encoding="utf-8", errors="replace")
+            bytes_in += ini_path.stat().st_size
+            hashes = []
+            for section in split_ini_sections(text):
+                h = blob_hash(section.encode("utf-8"))
+                ini_sections.setdefault(h, section)
+                hashes.append(h)
+            entry["config_ini"] = hashes
+        json_path = outdir / "config.json"
+        if json_path.is_file():
+            data = json_path.read_bytes()
+            bytes_in += len(data)
+            # Re-serialize compactly so whitespace-only differences share a blob.
+            data = json.dumps(json.loads(data), sort_keys=True, separators=(",", ":")).encode("utf-8")
+            h = blob_hash(data)
+            json_blobs.setdefault(h, data)
+            entry["config_json"] = h
+        parsed.append((entry, ids, values, is_int))
+    return list(chunk_keys), parsed, ini_sections, json_blobs, bytes_in
+
+
+class RowSpill:
+    # Sparse rows (global key ids + values) appended to a temporary file, so the
+    # main process holds one row at a time whatever the number of runs.
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = open(path, "w+b")
+        self.offsets = {}
+
+    def add(self, name, ids, values):
+        import numpy as np
+
+        self.offsets[name] = (self.handle.tell(), len(ids))
+        self.handle.write(np.asarray(ids, dtype=np.int64).tobytes())
+        self.handle.write(np.asarray(values, dtype=np.float64).tobytes())
+
+    def row(self, name):
+        import numpy as np
+
+        offset, count = self.offsets[name]
+        self.handle.seek(offset)
+        ids = np.frombuffer(self.handle.read(count * 8), dtype=np.int64)
+        values = np.frombuffer(self.handle.read(count * 8), dtype=np.float64)
+        return ids, values
+
+    def close(self):
+        self.handle.close()
+        self.path.unlink()
+
+
+def npy_rows(member):
+    import numpy as np
+
+    # Rows of a 2-D .npy zip member, read one at a time.
+    version = np.lib.format.read_magic(member)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(member)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(member)
+    for _ in range(shape[0]):
+        yield np.frombuffer(member.read(shape[1] * dtype.itemsize), dtype=dtype)
+
+
+def write_npy_rows(out, name, shape, dtype, rows):
+    import numpy as np
+
+    with out.open(name, "w", force_zip64=True) as member:
+        header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": shape}
+        np.lib.format.write_array_header_2_0(member, header)
+        for row in rows:
+            member.write(np.ascontiguousarray(row, dtype=dtype).tobytes())
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def pack(args):
+    import numpy as np
+
+    results_root = Path(args.results_root)
+    archive_path = Path(args.archive)
+    patterns = load_keep_patterns(args)
+
+    runs = [
+        run
+        for run in find_runs(results_root)
+        if args.all_status or run["status"].startswith("DONE") or run["status"] == "UNTRACKED"
+    ]
+    if not runs:
+        print(f"Error: no run with stats.txt found under {results_root}", file=sys.stderr)
+        return 1
+    for run in runs:
+        run["stats_path"] = str(run["stats_path"])
+
+    started = time.perf_counter()
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+    spill = RowSpill(archive_path.with_name(archive_path.name + ".rows"))
+    keys = []
+    key_index = {}
+    int_keys = set()
+    entries = {}
+    ini_sections = {}
+    written_json = set()
+    bytes_in = 0
+
+    def global_ids(local_keys):
+        # Chunk-local key indexes -> columns of the archive, growing the key list.
+        for key in local_keys:
+            if key not in key_index:
+                key_index[key] = len(keys)
+                keys.append(key)
+        return np.array([key_index[key] for key in local_keys], dtype=np.int64)
+
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_LZMA) as out:
+            # Runs of the previous archive that are not re-packed now are streamed over row by row.
+            packed_now = {run["name"] for run in runs}
+            if archive_path.is_file():
+                with CampaignArchive(archive_path) as previous:
+                    ids = global_ids(previous.keys)
+                    int_keys.update(key_index[key] for key in previous.int_keys)
+                    kept = [run for run in previous.runs if run["name"] not in packed_now]
+                    with previous.zip.open("stats/values.npy") as values_member, previous.zip.open("stats/present.npy") as present_member:
+                        for run, values, present in zip(previous.runs, npy_rows(values_member), npy_rows(present_member)):
+                            if run["name"] in packed_now:
+                                continue
+                            spill.add(run["name"], ids[present], values[present])
+                    sections = json.loads(previous.zip.read("configs/ini.json"))
+                    for run in kept:
+                        entries[run["name"]] = run
+                        for h in run.get("config_ini") or []:
+                            ini_sections[h] = sections[h]
+                        blob = run.get("config_json")
+                        if blob and blob not in written_json:
+                            out.writestr(f"configs/json/{blob}", previous.zip.read(f"configs/json/{blob}"))
+                            written_json.add(blob)
+
+            # At most 2 chunks per worker are in flight, which bounds the parsed data held in memory.
+            parse_started = time.perf_counter()
+            pending = list(chunks(runs, args.chunk))[::-1]
+            with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                running = set()
+                while pending or running:
+                    while pending and len(running) < 2 * args.jobs:
+                        running.add(pool.submit(parse_chunk, pending.pop(), patterns))
+                    done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        local_keys, parsed, sections, blobs, chunk_bytes = future.result()
+                        ids = global_ids(local_keys)
+                        for entry, local_ids, values, is_int in parsed:
+                            spill.add(entry["name"], ids[local_ids], values)
+                            int_keys.update(ids[local_ids[is_int]].tolist())
+                            entries[entry["name"]] = entry
+                        ini_sections.update(sections)
+                        for h, data in blobs.items():
+                            if h not in written_json:
+                                out.writestr(f"configs/json/{h}", data)
+                                written_json.add(h)
+                        bytes_in += chunk_bytes
+            parsed_at = time.perf_counter()
+
+            names = sorted(entries)
+            # Columns no kept run has (stats the previous archive had beyond --keep) are dropped.
+            used = np.zeros(len(keys), dtype=bool)
+            for name in names:
+                used[spill.row(name)[0]] = True
+            columns = np.flatnonzero(used)
+            column_of = np.full(len(keys), -1, dtype=np.int64)
+            column_of[columns] = np.arange(len(columns))
+            keys = [keys[j] for j in columns]
+            int_keys = {int(column_of[j]) for j in int_keys if used[j]}
+            width = len(keys)
+
+            def value_rows():
+                for name in names:
+                    row = np.zeros(width)
+                    ids, values = spill.row(name)
+                    row[column_of[ids]] = values
+                    yield row
+
+            def present_rows():
+                for name in names:
+                    row = np.zeros(width, dtype=bool)
+                    row[column_of[spill.row(name)[0]]] = True
+                    yield row
+
+            write_npy_rows(out, "stats/values.npy", (len(names), width), np.float64, value_rows())
+            write_npy_rows(out, "stats/present.npy", (len(names), width), bool, present_rows())
+            used_sections = {h for name in names for h in (entries[name]["config_ini"] or [])}
+            index = {
+                "version": ARCHIVE_VERSION,
+                "runs": [entries[name] for name in names],
+                "int_keys": sorted(keys[j] for j in int_keys),
+            }
+            out.writestr("index.json", json.dumps(index))
+            out.writestr("stats/keys.json", json.dumps(keys))
+            out.writestr(
+                "configs/ini.json",
+                json.dumps({h: ini_sections[h] for h in sorted(used_sections)}),
+            )
+        tmp_path.replace(archive_path)
+    finally:
+        spill.close()
+
+    elapsed = time.perf_counter() - started
+    parse_seconds = parsed_at - parse_started
+    # The parse workers are child processes: their peak counts as much as the main one.
+    peak_kib = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    size_out = archive_path.stat().st_size
+    print(f"Wrote archive: {archive_path}")
+    print(f"  runs={len(names)} (packed now: {len(runs)}) stat keys={len(keys)}")
+    print(f"  unique config.ini sections={len(used_sections)} unique config.json blobs={len(written_json)}")
+    if bytes_in:
+        print(f"  input {bytes_in / 1e6:.1f} MB -> archive {size_out / 1e6:.2f} MB ({bytes_in / size_out:.0f}x)")
+    print(
+        f"  {len(runs) / parse_seconds:.1f} runs/s parsing with {args.jobs} worker(s) "
+        f"({bytes_in / 1e6 / parse_seconds:.1f} MB/s), {elapsed:.2f}s total, "
+        f"peak RSS {peak_kib / 1024:.0f} MiB"
+    )
+    return 0
+
+
+def info(args):
+    with CampaignArchive(args.archive) as archive:
+        print(f"{archive.path}: {len(archive.runs)} runs, {len(archive.keys)} stat keys")
+        families = collections.Counter(tuple(run["keep_patterns"] or ()) for run in archive.runs)
+        for patterns, count in sorted(families.items()):
+            print(f"  {count} run(s) with {'kept families: ' + ', '.join(patterns) if patterns else 'all stats'}")
+        for member in archive.zip.infolist():
+            if not member.filename.startswith("configs/json/"):
+                print(f"  {member.filename:<22} {member.file_size:>10} -> {member.compress_size:>9} bytes")
+        for run in archive.runs:
+            coordinates = f"m{run['mix']}" if run["mix"] else f"w{run['width']}"
+            print(f"  {run['name']:<32} {coordinates} t{run['threads']} status={run['status']}")
+    return 0
+
+
+def show(args):
+    with CampaignArchive(args.archive) as archive:
+        if args.run not in archive.run_index:
+            print(f"Error: run not in archive: {args.run}", file=sys.stderr)
+            return 1
+        if args.config == "ini":
+            sys.stdout.write(archive.config_ini(args.run) or "")
+            return 0
+        if args.config == "json":
+            print(json.dumps(archive.config_json(args.run), indent=4, sort_keys=True))
+            return 0
+        for key, value in archive.stats(args.run, args.key).items():
+            print(f"{key:<60} {value}")
+    return 0
+
+
+def main():
+    args = parse_args()
+    if args.command == "pack":
+        return pack(args)
+    if args.command == "info":
+        return info(args)
+    return show(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from archive import CampaignArchive, pack
+from campaign import find_runs
+from cube import MetricsCube, refresh
+from gem5stats import read_stats
+from metrics import run_table
+from plotbatch import init_worker, load_specs, render, select_rows
+from statdiff import align, diff, load_matrices
+
+
+HERE = Path(__file__).resolve().parent
+STAGES = ["parse", "metrics", "cube_refresh", "cube_load", "archive_pack", "archive_load", "diff", "plot"]
+# Synthetic campaigns (fakegem5.py generate): run count per dataset name.
+SYNTHETIC = {"100": 100, "1k": 1000, "10k": 10000}
+# Stats kept in the synthetic runs: what metrics, coherence and memsys read, so every
+# stage does its real work while 10k runs stay around 600 MB.
+SYNTH_KEEP = [
+    "sim_*",
+    "final_tick",
+    "host_*",
+    "system.cpu*.numCycles",
+    "system.cpu*.committedInsts",
+    "system.cpu*.committedOps",
+    "system.cpu*.ipc",
+    "system.cpu*.dcache.overall_*::total",
+    "system.cpu*.dcache.writebacks::total",
+    "system.l2.overall_*",
+    "system.l2.writebacks::total",
+    "system.tol2bus.trans_dist::*",
+    "system.tol2bus.snoop*",
+    "system.tol2bus.*Layer*.occupancy",
+    "system.membus.snoops",
+    "system.membus.reqLayer0.occupancy",
+    "system.mem_ctrls.bytes*",
+    "system.mem_ctrls.peakBW",
+]
+SYNTH_JITTER = 0.02
+# Bumped when fakegem5.py generate writes different files, so cached datasets are redone.
+SYNTH_VERSION = 2
+# Figures rendered by the plot stage, restricted to the largest campaign of the dataset.
+BENCH_SPECS = {
+    "defaults": {"kind": "line", "x": "threads", "dpi": 100, "marker": "o", "logx": True, "logy": False, "ideal": False},
+    "figures": [
+        {"out": "cycles.png", "y": "cycles", "hue": "width", "logy": True},
+        {"out": "speedup.png", "y": "speedup", "hue": "width", "ideal": True},
+        {"out": "ipc.png", "y": "ipc", "hue": "size", "facet": "width"},
+        {"out": "host_seconds.png", "y": "host_seconds", "kind": "bar", "hue": "width"},
+    ],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark the post-processing pipeline (stats parser, metrics table, cube, "
+            "archive, diff, plot batch) on the real results tree and on synthetic "
+            "campaigns, and fail when it regresses against a JSON baseline."
+        )
+    )
+    parser.add_argument(
+        "--datasets",
+        default="real 100 1k 10k",
+        help='Datasets: "real" (--results-root) and synthetic run counts 100, 1k, 10k (default: all).',
+    )
+    parser.add_argument(
+        "--stages",
+        default=" ".join(STAGES),
+        help=f"Stages to measure (default: {' '.join(STAGES)}).",
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory of the real dataset (default: results).",
+    )
+    parser.add_argument(
+        "--work-dir",
+        default="/tmp/cmpperf-bench",
+        help="Synthetic campaigns and stage outputs (default: /tmp/cmpperf-bench).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each stage; the fastest counts (default: 3).")
+    parser.add_argument(
+        "--out",
+        default="results/bench/latest.json",
+        help="Measurements of this run (default: results/bench/latest.json).",
+    )
+    parser.add_argument(
+        "--baseline",
+        default="results/bench/baseline.json",
+        help="Baseline compared against (default: results/bench/baseline.json).",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the measured stages in the baseline instead of failing on regressions.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Relative slowdown counted as a regression (default: 0.15).",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.05,
+        help="Slowdowns shorter than this many seconds are noise (default: 0.05).",
+    )
+    parser.add_argument(
+        "--mem-threshold",
+        type=float,
+        default=0.20,
+        help="Relative peak RSS growth counted as a regression (default: 0.20).",
+    )
+    parser.add_argument(
+        "--min-mem-delta",
+        type=float,
+        default=16.0,
+        help="Peak RSS growth smaller than this many MiB is noise (default: 16).",
+    )
+    return parser.parse_args()
+
+
+def stats_bytes(runs):
+    return sum(os.path.getsize(run["stats_path"]) for run in runs)
+
+
+def largest_campaign(runs):
+    return Counter(run["campaign"] for run in runs).most_common(1)[0][0]
+
+
+def quiet_call(function, *args):
+    # The tools report on stdout; the benchmark only prints its own table.
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def cube_args(root, out_dir):
+    return argparse.Namespace(results_root=str(root), cube=str(out_dir / "cube"), full=True)
+
+
+def archive_args(root, out_dir):
+    return argparse.Namespace(
+        results_root=str(root),
+        archive=str(out_dir / "bench.cmpz"),
+        keep=None,
+        keep_file=None,
+        all_status=False,
+        jobs=1,
+        chunk=16,
+    )
+
+
+# Stages: setup (find_runs, inputs of a previous stage) is not timed; each returns
+# the timed seconds, the runs handled and the bytes read.
+
+def stage_parse(root, out_dir):
+    runs = find_runs(root)
+    started = time.perf_counter()
+    for run in runs:
+        read_stats(run["stats_path"])
+    return time.perf_counter() - started, len(runs), stats_bytes(runs)
+
+
+def stage_metrics(root, out_dir):
+    runs = find_runs(root)
+    started = time.perf_counter()
+    rows = quiet_call(run_table, root)
+    return time.perf_counter() - started, len(rows), stats_bytes(runs)
+
+
+def stage_cube_refresh(root, out_dir):
+    runs = find_runs(root)
+    started = time.perf_counter()
+    quiet_call(refresh, cube_args(root, out_dir))
+    return time.perf_counter() - started, len(runs), stats_bytes(runs)
+
+
+def stage_cube_load(root, out_dir):
+    if not (out_dir / "cube" / "values.npy").is_file():
+        quiet_call(refresh, cube_args(root, out_dir))
+    started = time.perf_counter()
+    rows = MetricsCube(out_dir / "cube").rows()
+    stored = sum(os.path.getsize(out_dir / "cube" / name) for name in ("cells.npy", "values.npy"))
+    return time.perf_counter() - started, len(rows), stored
+
+
+def stage_archive_pack(root, out_dir):
+    args = archive_args(root, out_dir)
+    Path(args.archive).unlink(missing_ok=True)
+    runs = find_runs(root)
+    started = time.perf_counter()
+    quiet_call(pack, args)
+    return time.perf_counter() - started, len(runs), stats_bytes(runs)
+
+
+def stage_archive_load(root, out_dir):
+    args = archive_args(root, out_dir)
+    if not Path(args.archive).is_file():
+        quiet_call(pack, args)
+    started = time.perf_counter()
+    with CampaignArchive(args.archive) as archive:
+        archive.values
+        archive.present
+        archive.column("sim_insts")
+        runs = len(archive.runs)
+    return time.perf_counter() - started, runs, os.path.getsize(args.archive)
+
+
+def stage_diff(root, out_dir):
+    # The largest campaign against itself: every stats.txt is loaded twice and every
+    # key diffed, which is the cost of comparing two campaigns of that size.
+    runs = find_runs(root)
+    campaign = largest_campaign(runs)
+    pairs = align(runs, campaign, campaign)
+    started = time.perf_counter()
+    keys, a, b = load_matrices(pairs, True)
+    diff(a, b, 0.05, 0.0)
+    return time.perf_counter() - started, 2 * len(pairs), stats_bytes([run for pair in pairs for run in pair])
+
+
+def stage_plot(root, out_dir):
+    if not (out_dir / "cube" / "values.npy").is_file():
+        quiet_call(refresh, cube_args(root, out_dir))
+    rows = MetricsCube(out_dir / "cube").rows()
+    campaign = Counter(row["campaign"] for row in rows).most_common(1)[0][0]
+    specs_path = out_dir / "bench_specs.json"
+    document = dict(BENCH_SPECS, figures=[dict(figure, where={"campaign": [campaign]}) for figure in BENCH_SPECS["figures"]])
+    specs_path.write_text(json.dumps(document, indent=1), encoding="utf-8")
+    specs = load_specs(specs_path)
+    init_worker()
+    started = time.perf_counter()
+    for spec in specs:
+        render(spec, select_rows(rows, spec), out_dir / "plots" / spec["out"])
+    return time.perf_counter() - started, len(rows), 0
+
+
+def measure(stage, root, out_dir):
+    # Runs in a fresh interpreter, so ru_maxrss is the peak of this stage alone
+    # (children: the archive pack parser pool).
+    seconds, runs, size = globals()[f"stage_{stage}"](Path(root), Path(out_dir))
+    peak_kib = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return seconds, runs, size, peak_kib / 1024
+
+
+def prepare_synthetic(name, work_dir):
+    # Campaign S<name> under work_dir/synth_<name>, generated again only when its
+    # parameters changed.
+    root = work_dir / f"synth_{name}"
+    params = {"runs": SYNTHETIC[name], "keep": SYNTH_KEEP, "jitter": SYNTH_JITTER, "version": SYNTH_VERSION}
+    marker = root / "dataset.json"
+    if marker.is_file() and json.loads(marker.read_text(encoding="utf-8")) == params:
+        return root
+    if root.exists():
+        shutil.rmtree(root)
+    command = [
+        sys.executable, str(HERE / "fakegem5.py"), "generate",
+        "--out", str(root / f"S{name}"),
+        "--runs", str(params["runs"]),
+        "--no-configs",
+        "--jitter", str(SYNTH_JITTER),
+    ]
+    for pattern in SYNTH_KEEP:
+        command += ["--keep", pattern]
+    print(f"Generating synthetic campaign: {root / f'S{name}'} ({params['runs']} runs)")
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    marker.write_text(json.dumps(params), encoding="utf-8")
+    return root
+
+
+def host_info():
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "node": platform.node(),
+    }
+
+
+def compare(results, baseline, args):
+    # [(dataset, stage, what, measured, base)] beyond the thresholds.
+    regressions = []
+    for dataset, stages in results.items():
+        for stage, entry in stages.items():
+            base = baseline.get(dataset, {}).get(stage)
+            if base is None:
+                continue
+            slower = entry["seconds"] - base["seconds"]
+            if slower > args.min_delta and entry["seconds"] > base["seconds"] * (1 + args.threshold):
+                regressions.append((dataset, stage, "seconds", entry["seconds"], base["seconds"]))
+            grown = entry["peak_rss_mib"] - base["peak_rss_mib"]
+            if grown > args.min_mem_delta and entry["peak_rss_mib"] > base["peak_rss_mib"] * (1 + args.mem_threshold):
+                regressions.append((dataset, stage, "peak_rss_mib", entry["peak_rss_mib"], base["peak_rss_mib"]))
+    return regressions
+
+
+def change(value, base):
+    if base is None or not base:
+        return "new"
+    return f"{value / base - 1:+.0%}"
+
+
+def main():
+    args = parse_args()
+
+    datasets = args.datasets.replace(",", " ").split()
+    stages = args.stages.replace(",", " ").split()
+    unknown = [name for name in datasets if name != "real" and name not in SYNTHETIC]
+    unknown += [name for name in stages if name not in STAGES]
+    if unknown:
+        print(f"Error: unknown dataset or stage: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+    if "real" in datasets and not find_runs(args.results_root):
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.is_file() else {}
+    same_host = all(baseline.get("host", {}).get(key) == value for key, value in host_info().items() if key != "node")
+    if baseline and not same_host:
+        print(f"Warning: baseline measured on another host ({baseline.get('host', {}).get('node')}); timings may not compare", file=sys.stderr)
+
+    work_dir = Path(args.work_dir)
+    results = {}
+    started = time.perf_counter()
+    print(f"{'dataset':<8} {'stage':<13} {'runs':>6} {'seconds':>9} {'base':>9} {'change':>7} {'runs/s':>9} {'MB/s':>8} {'peak MiB':>9} {'base':>7}")
+    for dataset in datasets:
+        root = Path(args.results_root) if dataset == "real" else prepare_synthetic(dataset, work_dir)
+        out_dir = work_dir / f"out_{dataset}"
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        out_dir.mkdir(parents=True)
+        results[dataset] = {}
+        for stage in stages:
+            timings = []
+            peak = 0.0
+            for _ in range(args.repeat):
+                # One fresh process per measurement: no parse cache or RSS high-water
+                # mark carried over from the previous stage.
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                ) as pool:
+                    seconds, runs, size, peak_mib = pool.submit(measure, stage, str(root), str(out_dir)).result()
+                timings.append(seconds)
+                peak = max(peak, peak_mib)
+            best = min(timings)
+            entry = {
+                "runs": runs,
+                "bytes": size,
+                "seconds": best,
+                "seconds_all": timings,
+                "runs_per_s": runs / best if best else None,
+                "mb_per_s": size / 1e6 / best if best and size else None,
+                "peak_rss_mib": peak,
+            }
+            results[dataset][stage] = entry
+            base = baseline.get("results", {}).get(dataset, {}).get(stage)
+            print(
+                f"{dataset:<8} {stage:<13} {runs:>6} {best:>9.3f} "
+                f"{base['seconds'] if base else float('nan'):>9.3f} {change(best, base and base['seconds']):>7} "
+                f"{entry['runs_per_s'] or 0:>9.0f} {entry['mb_per_s'] or 0:>8.1f} "
+                f"{peak:>9.0f} {base['peak_rss_mib'] if base else float('nan'):>7.0f}"
+            )
+
+    document = {
+        "host": host_info(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(document, indent=1) + "\n", encoding="utf-8")
+    print(f"\nWrote benchmark results: {out_path} ({time.perf_counter() - started:.0f}s)")
+
+    if args.update_baseline:
+        merged = baseline.get("results", {})
+        for dataset, entries in results.items():
+            merged.setdefault(dataset, {}).update(entries)
+        document = dict(document, results=merged)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(document, indent=1) + "\n", encoding="utf-8")
+        print(f"Wrote benchmark baseline: {baseline_path}")
+        return 0
+
+    regressions = compare(results, baseline.get("results", {}), args)
+    for dataset, stage, what, value, base in regressions:
+        print(f"REGRESSION {dataset}/{stage}: {what} {value:.3f} vs baseline {base:.3f} ({change(value, base)})", file=sys.stderr)
+    if not baseline:
+        print(f"No baseline at {baseline_path}; run with --update-baseline to record one.")
+    elif not regressions:
+        print(f"No regression against {baseline_path} (threshold {args.threshold:.0%} time, {args.mem_threshold:.0%} memory)")
+    return 2 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import csv
+import re
+from pathlib import Path
+
+from gem5stats import STATS_ARCHIVE_SUFFIX
+
+
+# s64_t8 (A7), s64_w4_t8 (A15) and s64_m2xdetailed-w4+4xminor_t6 (A15 CPU mix).
+RUN_NAME_RE = re.compile(r"^s(?P<size>\d+)(?:_w(?P<width>\d+)|_m(?P<mix>[^_]+))?_t(?P<threads>\d+)$")
+NAME_TOKEN_RE = re.compile(r"^(?P<dim>[swt])(?P<value>\d+)$")
+DIM_NAMES = {"s": "size", "w": "width", "t": "threads"}
+
+
+def read_state_rows(state_file, required=("size", "threads", "status", "outdir")):
+    rows = []
+    with Path(state_file).open("r", newline="") as handle:
+        reader = csv.DictReader(handle, delimiter="\t")
+        if not reader.fieldnames or not set(required).issubset(set(reader.fieldnames)):
+            raise ValueError(
+                f"{state_file} is missing required columns: {','.join(required)}"
+            )
+        rows.extend(reader)
+    return rows
+
+
+def parse_run_name(name):
+    match = RUN_NAME_RE.match(name)
+    if not match:
+        return None
+    return {
+        "size": int(match.group("size")),
+        "width": int(match.group("width")) if match.group("width") else None,
+        "threads": int(match.group("threads")),
+        "mix": match.group("mix"),
+    }
+
+
+def parse_variant_name(name):
+    # Loose form for hand-named variants such as A15_w4_t8_active.
+    coords = {"size": None, "width": None, "threads": None, "mix": None}
+    for token in name.split("_"):
+        match = NAME_TOKEN_RE.match(token)
+        if match:
+            coords[DIM_NAMES[match.group("dim")]] = int(match.group("value"))
+    return coords if coords["threads"] is not None else None
+
+
+def run_identity(results_root, outdir):
+    # (campaign, name) with names always prefixed by their campaign, e.g. A15/s64_w4_t8,
+    # whether results_root is results/ or a single campaign such as results/A15.
+    parts = outdir.relative_to(results_root).parts
+    if not parts:
+        return results_root.name, results_root.name
+    if len(parts) == 1:
+        if RUN_NAME_RE.match(parts[0]):
+            return results_root.name, f"{results_root.name}/{parts[0]}"
+        return parts[0], parts[0]
+    return parts[0], "/".join(parts)
+
+
+def stats_file(outdir):
+    # <outdir>/stats.txt, else the <outdir>.tar.xz of scratchrun.py --stage tar
+    # (gem5stats.read_stats reads both); None when neither has data.
+    outdir = Path(outdir)
+    for path in (outdir / "stats.txt", outdir.with_name(outdir.name + STATS_ARCHIVE_SUFFIX)):
+        if path.is_file() and path.stat().st_size > 0:
+            return path
+    return None
+
+
+def find_runs(results_root):
+    # Every run under results_root with a non-empty stats.txt, in its directory or in
+    # <outdir>.tar.xz. state.tsv statuses are attached when present; unlisted runs
+    # get status "UNTRACKED".
+    results_root = Path(results_root)
+    statuses = {}
+    for state_file in sorted(results_root.glob("**/state.tsv")):
+        for row in read_state_rows(state_file):
+            statuses[Path(row["outdir"]).resolve()] = row["status"]
+
+    outdirs = {stats_path.parent for stats_path in results_root.glob("**/stats.txt")}
+    for archive in results_root.glob(f"**/*{STATS_ARCHIVE_SUFFIX}"):
+        outdirs.add(archive.with_name(archive.name[: -len(STATS_ARCHIVE_SUFFIX)]))
+
+    runs = []
+    for outdir in sorted(outdirs):
+        stats_path = stats_file(outdir)
+        if stats_path is None:
+            continue
+        coords = parse_run_name(outdir.name) or parse_variant_name(outdir.name)
+        if coords is None:
+            continue
+        campaign, name = run_identity(results_root, outdir)
+        runs.append(
+            {
+                "name": name,
+                "campaign": campaign,
+                "size": coords["size"],
+                "width": coords["width"],
+                "threads": coords["threads"],
+                "mix": coords["mix"],
+                "status": statuses.get(outdir.resolve(), "UNTRACKED"),
+                "outdir": str(outdir),
+                "stats_path": stats_path,
+            }
+        )
+    return runs
+
+
+def run_key(row):
+    # Mixed-CPU rows have width "-"; their configuration is in the mix column.
+    width = row.get("width")
+    mix = row.get("mix")
+    return (
+        int(row["size"]),
+        int(width) if width not in (None, "", "-") else None,
+        int(row["threads"]),
+        mix if mix not in (None, "", "-") else None,
+    )
+
+
+def done_runs(state_rows, size_filter=None):
+    valid = []
+    missing = []
+
+    for row in state_rows:
+        try:
+            size, width, threads, mix = run_key(row)
+        except ValueError:
+            missing.append((row, "invalid numeric fields in state.tsv"))
+            continue
+
+        if size_filter is not None and size != size_filter:
+            continue
+
+        if not row["status"].startswith("DONE"):
+            missing.append((row, f"status={row['status']}"))
+            continue
+
+        stats_path = stats_file(row["outdir"])
+        if stats_path is None:
+            missing.append((row, "missing stats.txt"))
+            continue
+
+        valid.append(
+            {
+                "size": size,
+                "width": width,
+                "threads": threads,
+                "mix": mix,
+                "status": row["status"],
+                "outdir": row["outdir"],
+                "stats_path": stats_path,
+            }
+        )
+
+    return valid, missing
+
+
+def describe_row(row):
+    if row.get("mix") not in (None, "", "-"):
+        return f"size={row.get('size')} mix={row.get('mix')} threads={row.get('threads')}"
+    return f"size={row.get('size')} width={row.get('width')} threads={row.get('threads')}"
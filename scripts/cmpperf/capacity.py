@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import heapq
+import math
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from campaign import find_runs, read_state_rows
+from gem5stats import read_stats
+from logcapture import read_summary
+from run_campaign import USAGE_FIELDS, job_usage, mix_cores
+
+
+RUN_FIELDS = [
+    "campaign", "name", "size", "width", "mix", "cores", "status", "source",
+    "wall_seconds", "cpu_seconds", "cpu_util", "max_rss_mib", "mean_rss_mib",
+    "major_faults", "voluntary_switches", "involuntary_switches", "read_mb", "write_mb", "sim_kips",
+]
+GROUP_FIELDS = [
+    "campaign", "width", "mix", "size", "cores", "runs", "failed",
+    "wall_median", "cpu_median", "max_rss_mib", "mean_rss_mib", "sim_kips_median",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Capacity planning from the host cost of every run (rusage captured by "
+            "logcapture.py in state.tsv, else gem5's host_seconds/host_mem_usage): "
+            "cost vs simulated cores, width and size, and worker counts that fit a host."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs and state.tsv files (default: results).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images",
+        help="Directory where capacity.csv and capacity_groups.csv are written (default: results/images).",
+    )
+    parser.add_argument(
+        "--cpus",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="CPUs of the host being sized (default: this host's).",
+    )
+    parser.add_argument(
+        "--memory",
+        type=float,
+        default=None,
+        help="Memory of the host being sized, in GiB (default: this host's MemTotal).",
+    )
+    parser.add_argument(
+        "--headroom",
+        type=float,
+        default=0.10,
+        help="Fraction of the memory kept free for the OS and page cache (default: 0.10).",
+    )
+    return parser.parse_args()
+
+
+def host_memory_gib():
+    with open("/proc/meminfo", "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) / (1 << 20)
+    return float("nan")
+
+
+def number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def mean_rss_mib(log_path):
+    # Mean of logcapture.py's RSS samples (evenly spaced, also after decimation).
+    try:
+        summary = read_summary(log_path)
+    except (OSError, ValueError):
+        return float("nan")
+    samples = ((summary or {}).get("usage") or {}).get("rss_samples") or []
+    return sum(rss for _, rss in samples) / len(samples) / 1024 if samples else float("nan")
+
+
+def usage_record(row):
+    usage = {field: number(row.get(field)) for field in USAGE_FIELDS}
+    return {
+        "source": "rusage",
+        "wall_seconds": usage["wall_seconds"],
+        "cpu_seconds": usage["user_seconds"] + usage["sys_seconds"],
+        "max_rss_mib": usage["max_rss_kib"] / 1024,
+        "mean_rss_mib": mean_rss_mib(row["log"]),
+        "major_faults": usage["major_faults"],
+        "voluntary_switches": usage["voluntary_switches"],
+        "involuntary_switches": usage["involuntary_switches"],
+        "read_mb": usage["read_bytes"] / 1e6,
+        "write_mb": usage["write_bytes"] / 1e6,
+    }
+
+
+def load_records(results_root):
+    # One record per run with a known host cost: the rusage run_campaign.py stored in
+    # state.tsv or, for run_q9_a15.sh rows, logcapture.py's summary next to the log
+    # (failed runs included), else gem5's own host stats (A7, older runs).
+    results_root = Path(results_root)
+    measured = {}
+    for state_file in sorted(results_root.glob("**/state.tsv")):
+        for row in read_state_rows(state_file):
+            if not row.get("wall_seconds") and row.get("log"):
+                usage = job_usage(row)
+                if usage:
+                    row.update({field: usage.get(field, "") for field in USAGE_FIELDS})
+            if row.get("wall_seconds"):
+                measured[Path(row["outdir"]).resolve()] = (state_file.parent.name, row)
+
+    records = []
+    for run in find_runs(results_root):
+        stats = read_stats(run["stats_path"], keys=["sim_insts", "host_seconds", "host_mem_usage"])
+        record = {key: run[key] for key in ("campaign", "size", "width", "mix")}
+        record["name"] = Path(run["outdir"]).name
+        record["cores"] = mix_cores(run["mix"]) if run["mix"] else run["threads"]
+        record["status"] = run["status"].split(":", 1)[0]
+        state = measured.pop(Path(run["outdir"]).resolve(), None)
+        if state:
+            record.update(usage_record(state[1]))
+        elif "host_seconds" in stats:
+            # gem5 reports host_mem_usage in KiB; no CPU time, faults or I/O.
+            record.update(
+                {
+                    "source": "stats",
+                    "wall_seconds": stats["host_seconds"],
+                    "max_rss_mib": stats.get("host_mem_usage", float("nan")) / 1024,
+                }
+            )
+        else:
+            continue
+        sim_insts = stats.get("sim_insts")
+        record["sim_kips"] = sim_insts / record["wall_seconds"] / 1000 if sim_insts and record["wall_seconds"] else float("nan")
+        records.append(record)
+
+    # Crashed runs: no stats.txt, but their cost is what sizing must not forget.
+    for outdir, (campaign, row) in sorted(measured.items()):
+        mix = row.get("mix") if row.get("mix") not in (None, "", "-") else None
+        record = {
+            "campaign": campaign,
+            "name": outdir.name,
+            "size": int(row["size"]),
+            "width": int(row["width"]) if row["width"].isdigit() else None,
+            "mix": mix,
+            "cores": mix_cores(mix) if mix else int(row["threads"]),
+            "status": row["status"].split(":", 1)[0],
+        }
+        record.update(usage_record(row))
+        records.append(record)
+
+    for record in records:
+        for field in RUN_FIELDS:
+            record.setdefault(field, float("nan"))
+        record["cpu_util"] = record["cpu_seconds"] / record["wall_seconds"] if record["wall_seconds"] else float("nan")
+    return records
+
+
+def finished(record):
+    # Runs whose wall time is the cost of a whole run: failed and timed-out runs
+    # stopped early (or hung until killed) and would skew fits and schedules.
+    return record["status"].startswith("DONE") or record["status"] == "UNTRACKED"
+
+
+def group_records(records):
+    groups = {}
+    for record in records:
+        key = (record["campaign"], record["width"], record["mix"], record["size"], record["cores"])
+        groups.setdefault(key, []).append(record)
+    rows = []
+    order = lambda item: tuple((value is None, value if value is not None else 0) for value in item[0])
+    for (campaign, width, mix, size, cores), members in sorted(groups.items(), key=order):
+        rows.append(
+            {
+                "campaign": campaign,
+                "width": width,
+                "mix": mix,
+                "size": size,
+                "cores": cores,
+                "runs": len(members),
+                "failed": sum(1 for member in members if member["status"] == "FAILED"),
+                "wall_median": nanmedian([m["wall_seconds"] for m in members if finished(m)]),
+                "cpu_median": nanmedian([m["cpu_seconds"] for m in members if finished(m)]),
+                "max_rss_mib": float(np.nanmax([m["max_rss_mib"] for m in members])),
+                "mean_rss_mib": nanmedian([m["mean_rss_mib"] for m in members]),
+                "sim_kips_median": nanmedian([m["sim_kips"] for m in members]),
+            }
+        )
+    return rows
+
+
+def nanmedian(values):
+    values = [value for value in values if not math.isnan(value)]
+    return float(np.median(values)) if values else float("nan")
+
+
+def fit(records, target, log_scale):
+    # Least squares of target on cores, width and size (those that vary), linear for
+    # memory, log-log for time (coefficients are then elasticities: wall ~ cores^k).
+    dims = [dim for dim in ("cores", "width", "size") if len({r[dim] for r in records if r[dim] is not None}) > 1]
+    usable = [r for r in records if not math.isnan(r[target]) and r[target] > 0 and all(r[dim] is not None for dim in dims)]
+    if len(usable) <= len(dims) + 1:
+        return None
+    columns = [[math.log(r[dim]) if log_scale else r[dim] for r in usable] for dim in dims]
+    design = np.column_stack([np.ones(len(usable))] + columns)
+    y = np.array([math.log(r[target]) if log_scale else r[target] for r in usable])
+    coefficients, _, _, _ = np.linalg.lstsq(design, y, rcond=None)
+    predicted = design @ coefficients
+    total = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - ((y - predicted) ** 2).sum() / total if total else float("nan")
+    return {"dims": dims, "coefficients": coefficients, "r2": r2, "runs": len(usable)}
+
+
+def makespan(walls, workers):
+    # Longest-processing-time-first list schedule of the runs on `workers` slots.
+    slots = [0.0] * max(1, workers)
+    for wall in sorted(walls, reverse=True):
+        heapq.heappush(slots, heapq.heappop(slots) + wall)
+    return max(slots)
+
+
+def write_csv(path, fields, rows):
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    args = parse_args()
+
+    records = load_records(args.results_root)
+    if not records:
+        print(f"Error: no run with a host cost under {args.results_root}", file=sys.stderr)
+        return 1
+    memory_gib = args.memory if args.memory is not None else host_memory_gib()
+    budget_mib = memory_gib * 1024 * (1 - args.headroom)
+
+    groups = group_records(records)
+    print(f"{len(records)} runs ({sum(1 for r in records if r['source'] == 'rusage')} with rusage, the others from gem5 host stats)\n")
+    print(f"  {'campaign':<20} {'width/mix':<22} {'size':>5} {'cores':>5} {'runs':>4} {'wall s':>8} {'cpu s':>8} {'peak MiB':>9} {'mean MiB':>9} {'sim kIPS':>9}")
+    for row in groups:
+        print(
+            f"  {row['campaign']:<20} {str(row['mix'] or row['width'] or '-'):<22} {str(row['size'] or '-'):>5} {row['cores']:>5} "
+            f"{row['runs']:>4} {row['wall_median']:>8.1f} {row['cpu_median']:>8.1f} {row['max_rss_mib']:>9.0f} "
+            f"{row['mean_rss_mib']:>9.0f} {row['sim_kips_median']:>9.0f}"
+        )
+
+    done = [r for r in records if finished(r)]
+    memory_fit = fit(done, "max_rss_mib", False)
+    if memory_fit:
+        terms = " ".join(f"{c:+.1f} MiB/{dim}" for dim, c in zip(memory_fit["dims"], memory_fit["coefficients"][1:]))
+        print(f"\nPeak RSS ~ {memory_fit['coefficients'][0]:.0f} MiB {terms} (R2={memory_fit['r2']:.2f}, {memory_fit['runs']} runs)")
+    time_fit = fit(done, "wall_seconds", True)
+    if time_fit:
+        terms = " * ".join(f"{dim}^{c:.2f}" for dim, c in zip(time_fit["dims"], time_fit["coefficients"][1:]))
+        print(f"Wall time ~ {math.exp(time_fit['coefficients'][0]):.3g} s * {terms} (R2={time_fit['r2']:.2f}, {time_fit['runs']} runs)")
+
+    print(f"\nSizing for {args.cpus} CPUs and {memory_gib:.1f} GiB ({args.headroom:.0%} kept free):")
+    by_campaign = {}
+    for record in records:
+        by_campaign.setdefault(record["campaign"], []).append(record)
+    for campaign, members in sorted(by_campaign.items()):
+        # Any run may share the host with the heaviest one: size the slots for the peak.
+        peak = max((m["max_rss_mib"] for m in members if not math.isnan(m["max_rss_mib"])), default=float("nan"))
+        memory_workers = int(budget_mib // peak) if peak and not math.isnan(peak) else args.cpus
+        workers = max(1, min(args.cpus, memory_workers))
+        walls = [m["wall_seconds"] for m in members if finished(m) and not math.isnan(m["wall_seconds"])]
+        bound = "memory" if memory_workers < args.cpus else "CPU"
+        print(
+            f"  {campaign}: {len(members)} runs ({len(walls)} finished), {sum(walls) / 3600:.2f} core-h, peak {peak:.0f} MiB -> -j {workers} "
+            f"({bound} bound), makespan ~{makespan(walls, workers) / 60:.1f} min"
+        )
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    runs_path = images_dir / "capacity.csv"
+    groups_path = images_dir / "capacity_groups.csv"
+    write_csv(runs_path, RUN_FIELDS, records)
+    write_csv(groups_path, GROUP_FIELDS, groups)
+    print(f"\nWrote capacity CSV: {runs_path}")
+    print(f"Wrote capacity CSV: {groups_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from campaign import find_runs
+from gem5stats import per_cpu, read_stats
+
+
+O3_TYPES = ("DerivO3CPU", "O3_ARM_v7a_3")
+# gem5 class -> --cpu-type name (the TYPE of a se_a15.py --cpu-mix cluster).
+CPU_TYPE_NAMES = {
+    "DerivO3CPU": "detailed",
+    "O3_ARM_v7a_3": "arm_detailed",
+    "MinorCPU": "minor",
+    "TimingSimpleCPU": "timing",
+    "AtomicSimpleCPU": "atomic",
+}
+
+FIELDS = [
+    "run",
+    "mix",
+    "threads",
+    "cluster",
+    "cpu_type",
+    "width",
+    "cores",
+    "first_cpu",
+    "insts",
+    "insts_share",
+    "active_cycles_max",
+    "active_cycles_mean",
+    "ipc_per_core",
+    "intra_imbalance",
+    "run_cycles",
+    "inter_imbalance",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Per-cluster cycles, work share and load imbalance of heterogeneous "
+            "(--cpu-mix) runs; homogeneous runs show up as a single cluster."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results/A15_mix",
+        help="Directory scanned for runs (default: results/A15_mix).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images/A15_mix",
+        help="Directory where clusters.csv is written (default: results/images/A15_mix).",
+    )
+    return parser.parse_args()
+
+
+def config_cpus(outdir):
+    # system.cpu of config.json as a list (gem5 writes a dict for a single core).
+    config_path = Path(outdir) / "config.json"
+    if not config_path.is_file():
+        return []
+    with config_path.open("r", encoding="utf-8") as handle:
+        cpus = json.load(handle).get("system", {}).get("cpu", [])
+    return cpus if isinstance(cpus, list) else [cpus]
+
+
+def read_clusters(outdir):
+    # Consecutive cores with the same class, width and L1 sizes form a cluster,
+    # which is how se_a15.py lays out a --cpu-mix.
+    clusters = []
+    for index, cpu in enumerate(config_cpus(outdir)):
+        signature = (
+            cpu.get("type"),
+            cpu.get("issueWidth") if cpu.get("type") in O3_TYPES else None,
+            (cpu.get("dcache") or {}).get("size"),
+            (cpu.get("icache") or {}).get("size"),
+        )
+        if clusters and clusters[-1]["signature"] == signature:
+            clusters[-1]["count"] += 1
+            continue
+        cpu_class, width, l1d_size, l1i_size = signature
+        clusters.append(
+            {
+                "signature": signature,
+                "cpu_class": cpu_class,
+                "cpu_type": CPU_TYPE_NAMES.get(cpu_class, cpu_class),
+                "width": width,
+                "l1d_size": l1d_size,
+                "l1i_size": l1i_size,
+                "first_cpu": index,
+                "count": 1,
+            }
+        )
+    for cluster in clusters:
+        label = cluster["cpu_type"] + (f"-w{cluster['width']}" if cluster["width"] else "")
+        cluster["name"] = f"{cluster['count']}x{label}"
+    return clusters
+
+
+def cluster_metrics(stats, clusters):
+    insts = per_cpu(stats, "committedInsts")
+    cycles = per_cpu(stats, "numCycles")
+    idle = per_cpu(stats, "idleCycles")
+    total_insts = sum(insts.values()) or float("nan")
+
+    rows = []
+    for cluster in clusters:
+        ids = range(cluster["first_cpu"], cluster["first_cpu"] + cluster["count"])
+        active = [cycles.get(i, 0) - idle.get(i, 0) for i in ids]
+        work = sum(insts.get(i, 0) for i in ids)
+        mean_active = sum(active) / len(active)
+        rows.append(
+            {
+                "cluster": cluster["name"],
+                "cpu_type": cluster["cpu_type"],
+                "width": cluster["width"],
+                "cores": cluster["count"],
+                "first_cpu": cluster["first_cpu"],
+                "insts": work,
+                "insts_share": work / total_insts,
+                "active_cycles_max": max(active),
+                "active_cycles_mean": mean_active,
+                "ipc_per_core": work / sum(active) if sum(active) else float("nan"),
+                # 0 when every core of the cluster was busy for the same time.
+                "intra_imbalance": max(active) / mean_active - 1 if mean_active else float("nan"),
+            }
+        )
+    # Between clusters: how much longer the slowest cluster's cores ran than the fastest's.
+    means = [row["active_cycles_mean"] for row in rows if row["active_cycles_mean"]]
+    inter = max(means) / min(means) - 1 if means else float("nan")
+    run_cycles = max(cycles.values()) if cycles else None
+    for row in rows:
+        row["inter_imbalance"] = inter
+        row["run_cycles"] = run_cycles
+    return rows
+
+
+def main():
+    args = parse_args()
+
+    runs = find_runs(args.results_root)
+    if not runs:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    rows = []
+    for run in sorted(runs, key=lambda r: (r["mix"] or "", r["width"] or 0, r["threads"])):
+        clusters = read_clusters(run["outdir"])
+        if not clusters:
+            print(f"Warning: skipping {run['name']} (no config.json)", file=sys.stderr)
+            continue
+        for row in cluster_metrics(read_stats(run["stats_path"]), clusters):
+            row.update({"run": run["name"], "mix": run["mix"] or "", "threads": run["threads"]})
+            rows.append(row)
+    if not rows:
+        print("Error: no run with a config.json found.", file=sys.stderr)
+        return 1
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "clusters.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote cluster CSV: {csv_path}")
+
+    print(f"{'run':<40} {'cluster':<16} {'insts%':>6} {'cyc max':>9} {'cyc mean':>9} {'ipc':>5} {'intra':>6} {'inter':>6}")
+    for row in rows:
+        print(
+            f"{row['run']:<40} {row['cluster']:<16} {row['insts_share']:6.1%} {row['active_cycles_max']:9d} "
+            f"{row['active_cycles_mean']:9.0f} {row['ipc_per_core']:5.2f} {row['intra_imbalance']:6.1%} "
+            f"{row['inter_imbalance']:6.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+# Single entry point for the campaign tools: `cmpperf <command> ...`.
+# Only argparse is imported at startup; each command imports what it needs when
+# it runs, so --help and the CSV-only commands never load matplotlib or numpy.
+
+import argparse
+import sys
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve().parent
+A7_SCRIPTS = HERE.parent / "A7"
+A15_SCRIPTS = HERE.parent / "A15"
+
+# Commands that hand their remaining arguments to an existing tool unchanged.
+DELEGATED = {
+    "ingest": (HERE / "archive.py", ["pack"]),
+    "plot": (HERE / "figures.py", []),
+    "diff": (HERE / "statdiff.py", []),
+}
+
+SPEEDUP_FIELDS = ["name", "campaign", "size", "width", "mix", "threads", "cycles", "cycles_t1", "speedup", "efficiency"]
+IPC_FIELDS = [
+    "name", "campaign", "size", "width", "mix", "threads", "sim_insts", "cycles", "ipc", "ipc_max", "useful_ipc", "sync_share",
+]
+COMPARE_METRICS = ["cycles", "sim_insts", "ipc", "ipc_max", "speedup", "host_seconds"]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="cmpperf",
+        description="gem5 campaign tools (A7 / A15): ingest, extract, speedup, ipc, plot, compare.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    sub.add_parser(
+        "ingest",
+        add_help=False,
+        help="Pack runs into the campaign archive (arguments of `archive.py pack`).",
+    )
+
+    extract = sub.add_parser("extract", help="Write the A7 (q4, q7) and A15 (q9) CSVs without plotting.")
+    extract.add_argument("--results-root", default="results", help="Directory holding A7/ and A15/ (default: results).")
+    extract.add_argument("--images-root", default="results/images", help="Output root (default: results/images).")
+    extract.add_argument("--size", type=int, default=64, help="Matrix size (default: 64).")
+    extract.add_argument(
+        "--campaign",
+        choices=["A7", "A15"],
+        action="append",
+        default=None,
+        help="Only extract this campaign (repeatable; default: both).",
+    )
+
+    for name, help_text in (
+        ("speedup", "Cycles, speedup and efficiency of every run against its t=1 baseline."),
+        ("ipc", "Global IPC, best per-core IPC and useful-work IPC (t=1 instructions only) of every run."),
+    ):
+        table = sub.add_parser(name, help=help_text)
+        table.add_argument("--results-root", default="results", help="Directory scanned for runs (default: results).")
+        table.add_argument("--campaign", action="append", default=None, help="Only include these campaigns (repeatable).")
+        table.add_argument("--csv", default=None, help=f"Also write the table to this CSV (e.g. results/images/{name}.csv).")
+
+    sub.add_parser(
+        "plot",
+        add_help=False,
+        help="Rebuild out-of-date CSVs and figures (arguments of `figures.py`).",
+    )
+
+    sub.add_parser(
+        "diff",
+        add_help=False,
+        help="Diff every stats.txt key between two runs or campaigns (arguments of `statdiff.py`).",
+    )
+
+    compare = sub.add_parser("compare", help="Compare two runs or two campaigns point by point.")
+    compare.add_argument("a", help="Run (e.g. A15/s64_w4_t8) or campaign (e.g. A15).")
+    compare.add_argument("b", help="Run or campaign to compare against a.")
+    compare.add_argument("--results-root", default="results", help="Directory scanned for runs (default: results).")
+
+    if argv and argv[0] in DELEGATED:
+        return argparse.Namespace(command=argv[0], rest=argv[1:])
+    return parser.parse_args(argv)
+
+
+def load_script(path):
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so process pools started by the tool can pickle its functions.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_tool(path, argv):
+    # Runs an argparse tool's main() in this process, as if called with argv.
+    saved = sys.argv
+    sys.argv = [str(path)] + list(argv)
+    try:
+        return load_script(path).main() or 0
+    finally:
+        sys.argv = saved
+
+
+def extract(args):
+    campaigns = args.campaign or ["A7", "A15"]
+    results_root = Path(args.results_root)
+    images_root = Path(args.images_root)
+    status = 0
+    if "A7" in campaigns:
+        for script, out_name in (("extract_q4_cycles.py", "q4_cycles.csv"), ("extract_q7_ipc.py", "q7_ipc.csv")):
+            try:
+                load_script(A7_SCRIPTS / script).main(
+                    a7_dir=str(results_root / "A7"),
+                    size=args.size,
+                    out_csv=str(images_root / "A7" / out_name),
+                )
+            except (OSError, RuntimeError) as exc:
+                print(f"Error: {script}: {exc}", file=sys.stderr)
+                status = 1
+    if "A15" in campaigns:
+        common = [
+            "--results-root",
+            str(results_root / "A15"),
+            "--images-dir",
+            str(images_root / "A15"),
+            "--size",
+            str(args.size),
+        ]
+        status |= run_tool(A15_SCRIPTS / "plot_q9_cycles.py", common + ["--no-plot"])
+        status |= run_tool(A15_SCRIPTS / "extract_q9_ipc.py", common)
+    return status
+
+
+def load_rows(results_root, campaigns=None):
+    from metrics import run_table
+
+    return run_table(results_root, campaigns)
+
+
+def write_table(rows, fields, csv_path):
+    import csv
+
+    csv_path = Path(csv_path)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote CSV: {csv_path}")
+
+
+def table(args):
+    rows = load_rows(args.results_root, args.campaign)
+    if not rows:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+    if args.command == "speedup":
+        print(f"{'run':<40} {'cycles':>11} {'cycles_t1':>11} {'speedup':>8} {'eff':>6}")
+        for row in rows:
+            print(
+                f"{row['name']:<40} {row['cycles']:11d} {row['cycles_t1'] or 0:11d} "
+                f"{row['speedup']:8.3f} {row['efficiency']:6.1%}"
+            )
+        fields = SPEEDUP_FIELDS
+    else:
+        print(f"{'run':<40} {'sim_insts':>11} {'cycles':>11} {'ipc':>6} {'ipc_max':>7} {'useful':>7} {'sync':>6}")
+        for row in rows:
+            print(
+                f"{row['name']:<40} {row['sim_insts']:11d} {row['cycles']:11d} {row['ipc']:6.3f} {row['ipc_max']:7.3f} "
+                f"{row['useful_ipc']:7.3f} {row['sync_share']:6.1%}"
+            )
+        fields = IPC_FIELDS
+    if args.csv:
+        write_table(rows, fields, args.csv)
+    return 0
+
+
+def compare(args):
+    rows = load_rows(args.results_root)
+    by_name = {row["name"]: row for row in rows}
+    by_campaign = {}
+    for row in rows:
+        by_campaign.setdefault(row["campaign"], []).append(row)
+
+    def point(row):
+        return (row["width"], row["mix"], row["threads"])
+
+    def same_size(row_a, row_b):
+        # Hand-named variants have no size (None), which matches any size, as in statdiff.py.
+        return row_a["size"] is None or row_b["size"] is None or row_a["size"] == row_b["size"]
+
+    if args.a in by_name and args.b in by_name:
+        pairs = [(by_name[args.a], by_name[args.b])]
+    elif args.a in by_campaign and args.b in by_campaign:
+        b_points = {}
+        for row in by_campaign[args.b]:
+            b_points.setdefault(point(row), []).append(row)
+        pairs = []
+        for row in by_campaign[args.a]:
+            matches = [other for other in b_points.get(point(row), []) if same_size(row, other)]
+            # Exact size first when the other side has several sizes.
+            matches.sort(key=lambda other: other["size"] != row["size"])
+            if matches:
+                pairs.append((row, matches[0]))
+        if not pairs:
+            print(
+                f"Error: {args.a} and {args.b} have no (size, width, mix, threads) point in common.",
+                file=sys.stderr,
+            )
+            return 1
+    else:
+        unknown = [name for name in (args.a, args.b) if name not in by_name and name not in by_campaign]
+        if unknown:
+            print(f"Error: no run or campaign named: {', '.join(unknown)}", file=sys.stderr)
+        else:
+            print("Error: compare two runs or two campaigns, not one of each.", file=sys.stderr)
+        return 1
+
+    print(f"{'a':<32} {'b':<32} " + " ".join(f"{name + ' b/a':>15}" for name in COMPARE_METRICS))
+    for row_a, row_b in pairs:
+        ratios = []
+        for name in COMPARE_METRICS:
+            value_a, value_b = row_a.get(name), row_b.get(name)
+            ratios.append(value_b / value_a if value_a else float("nan"))
+        print(f"{row_a['name']:<32} {row_b['name']:<32} " + " ".join(f"{ratio:15.4f}" for ratio in ratios))
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command in DELEGATED:
+        path, prefix = DELEGATED[args.command]
+        return run_tool(path, prefix + args.rest)
+    if args.command == "extract":
+        return extract(args)
+    if args.command in ("speedup", "ipc"):
+        return table(args)
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+from campaign import find_runs
+from gem5stats import read_stats, sum_matching
+from metrics import add_speedup, base_metrics
+
+
+FIELDS = [
+    "campaign",
+    "size",
+    "width",
+    "threads",
+    "cycles",
+    "speedup",
+    "efficiency",
+    "sim_insts",
+    "snoops_pki",
+    "snoop_fanout",
+    "upgrades_pki",
+    "readex_pki",
+    "invalidating_pki",
+    "l1d_writebacks_pki",
+    "l2_writebacks_pki",
+    "l1d_miss_rate",
+    "l2bus_req_util",
+    "l2bus_resp_util_max",
+    "membus_req_util",
+    "membus_snoops_pki",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Coherence traffic per (width, threads): snoops, upgrades and read-exclusive "
+            "(invalidating) requests per kilo-instruction, writebacks and bus occupancy."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs; every campaign under it is compared (default: results).",
+    )
+    parser.add_argument(
+        "--campaign",
+        action="append",
+        default=None,
+        help="Only include these campaigns, e.g. A15 and A15_w4_t8_active (repeatable).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images/A15",
+        help="Directory where coherence.csv is written (default: results/images/A15).",
+    )
+    parser.add_argument(
+        "--knee-gain",
+        type=float,
+        default=1.25,
+        help="A thread doubling that gains less speedup than this is a scaling knee (default: 1.25).",
+    )
+    parser.add_argument(
+        "--knee-traffic",
+        type=float,
+        default=1.2,
+        help="...and is attributed to coherence if snoops/kinst grew by at least this factor (default: 1.2).",
+    )
+    return parser.parse_args()
+
+
+def coherence_metrics(stats):
+    metrics = base_metrics(stats)
+    if metrics is None:
+        return None
+    kinst = metrics["sim_insts"] / 1000.0
+    sim_ticks = metrics["sim_ticks"] or float("nan")
+
+    upgrades = stats.get("system.tol2bus.trans_dist::UpgradeReq", 0) + stats.get(
+        "system.tol2bus.trans_dist::SCUpgradeReq", 0
+    )
+    readex = stats.get("system.tol2bus.trans_dist::ReadExReq", 0)
+    l1d_misses = sum_matching(stats, "system.cpu*.dcache.overall_misses::total")
+    l1d_accesses = sum_matching(stats, "system.cpu*.dcache.overall_accesses::total")
+    resp_occupancy = [
+        value
+        for key, value in stats.items()
+        if key.startswith("system.tol2bus.respLayer") and key.endswith(".occupancy")
+    ]
+
+    metrics.update(
+        {
+            "snoops_pki": stats.get("system.tol2bus.snoops", 0) / kinst,
+            "snoop_fanout": stats.get("system.tol2bus.snoop_fanout::mean", float("nan")),
+            "upgrades_pki": upgrades / kinst,
+            "readex_pki": readex / kinst,
+            # Upgrades and read-exclusive requests are what invalidates other sharers.
+            "invalidating_pki": (upgrades + readex) / kinst,
+            "l1d_writebacks_pki": sum_matching(stats, "system.cpu*.dcache.writebacks::total") / kinst,
+            "l2_writebacks_pki": stats.get("system.l2.writebacks::total", 0) / kinst,
+            "l1d_miss_rate": l1d_misses / l1d_accesses if l1d_accesses else float("nan"),
+            "l2bus_req_util": stats.get("system.tol2bus.reqLayer0.occupancy", 0) / sim_ticks,
+            "l2bus_resp_util_max": max(resp_occupancy, default=0) / sim_ticks,
+            "membus_req_util": stats.get("system.membus.reqLayer0.occupancy", 0) / sim_ticks,
+            "membus_snoops_pki": stats.get("system.membus.snoops", 0) / kinst,
+        }
+    )
+    return metrics
+
+
+def find_knees(rows, knee_gain, knee_traffic):
+    # Per (campaign, size, width): first thread doubling whose speedup gain falls
+    # below knee_gain; coherence_bound tells whether snoops/kinst grew by knee_traffic
+    # or more over the same step (otherwise the knee comes from something else).
+    knees = []
+    series = {}
+    for row in rows:
+        series.setdefault((row["campaign"], row["size"], row["width"]), []).append(row)
+    for key, points in sorted(series.items(), key=lambda item: str(item[0])):
+        points.sort(key=lambda row: row["threads"])
+        for prev, cur in zip(points, points[1:]):
+            if not prev["speedup"] or prev["speedup"] != prev["speedup"]:
+                continue
+            gain = cur["speedup"] / prev["speedup"]
+            traffic = cur["snoops_pki"] / prev["snoops_pki"] if prev["snoops_pki"] else float("inf")
+            if gain < knee_gain:
+                knees.append((key, prev, cur, gain, traffic, traffic >= knee_traffic))
+                break
+    return knees
+
+
+def main():
+    args = parse_args()
+
+    runs = [
+        run
+        for run in find_runs(args.results_root)
+        if run["width"] is not None and (not args.campaign or run["campaign"] in args.campaign)
+    ]
+    if not runs:
+        print(f"Error: no A15 (o3) run found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    rows = []
+    for run in runs:
+        metrics = coherence_metrics(read_stats(run["stats_path"]))
+        if metrics is None:
+            print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+            continue
+        metrics.update({key: run[key] for key in ("campaign", "size", "width", "threads")})
+        rows.append(metrics)
+    add_speedup(rows)
+    rows.sort(key=lambda row: (row["campaign"], row["size"] or 0, row["width"], row["threads"]))
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "coherence.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote coherence CSV: {csv_path}")
+
+    print(f"{'campaign':<18} {'w':>2} {'t':>3} {'speedup':>7} {'eff':>5} {'snoop/ki':>9} {'inval/ki':>9} {'wb/ki':>7} {'l2bus%':>7}")
+    for row in rows:
+        print(
+            f"{row['campaign']:<18} {row['width']:>2} {row['threads']:>3} {row['speedup']:7.2f} "
+            f"{row['efficiency']:5.2f} {row['snoops_pki']:9.1f} {row['invalidating_pki']:9.2f} "
+            f"{row['l1d_writebacks_pki']:7.2f} {row['l2bus_req_util'] * 100:6.1f}%"
+        )
+
+    # Same (size, width, threads) point in several campaigns: show the traffic delta.
+    by_point = {}
+    for row in rows:
+        by_point.setdefault((row["width"], row["threads"]), []).append(row)
+    shared = {point: group for point, group in by_point.items() if len({r["campaign"] for r in group}) > 1}
+    if shared:
+        print("\nSame (width, threads) across campaigns:")
+        for (width, threads), group in sorted(shared.items()):
+            for row in group:
+                print(
+                    f"  w{width} t{threads} {row['campaign']:<18} cycles={row['cycles']:>9} "
+                    f"snoop/ki={row['snoops_pki']:7.1f} inval/ki={row['invalidating_pki']:6.2f}"
+                )
+
+    knees = find_knees(rows, args.knee_gain, args.knee_traffic)
+    if knees:
+        print("\nScaling knees:")
+        for (campaign, size, width), prev, cur, gain, traffic, coherence_bound in knees:
+            cause = "coherence-limited" if coherence_bound else "not coherence-bound"
+            print(
+                f"  {campaign} s{size} w{width}: t{prev['threads']} -> t{cur['threads']} "
+                f"speedup x{gain:.2f}, snoops/kinst x{traffic:.2f} "
+                f"({prev['snoops_pki']:.1f} -> {cur['snoops_pki']:.1f}), "
+                f"L2 bus {prev['l2bus_req_util']:.1%} -> {cur['l2bus_req_util']:.1%}: {cause}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from campaign import find_runs
+
+
+# gem5 writes config.json with json.dump(indent=4): one key, scalar or bracket per line.
+KEY_LINE_RE = re.compile(r'^"(?P<key>(?:[^"\\]|\\.)*)":\s*(?P<rest>.*?),?\s*$')
+CPU_RE = re.compile(r"^system\.(?P<group>switch_cpus|cpu)\d*$")
+# Effective parameter -> (object path pattern, parameter name). {cpu} is the first
+# measured core: system.cpu, system.cpu0 or system.cpu00 (switch_cpus after fast-forward).
+PARAMS = {
+    "cpu_class": ("{cpu}", "type"),
+    "issueWidth": ("{cpu}", "issueWidth"),
+    "fetchWidth": ("{cpu}", "fetchWidth"),
+    "commitWidth": ("{cpu}", "commitWidth"),
+    "numThreads": ("{cpu}", "numThreads"),
+    "l1d_size": ("{cpu}.dcache", "size"),
+    "l1d_assoc": ("{cpu}.dcache", "assoc"),
+    "l1i_size": ("{cpu}.icache", "size"),
+    "l1i_assoc": ("{cpu}.icache", "assoc"),
+    "l2_size": ("system.l2", "size"),
+    "l2_assoc": ("system.l2", "assoc"),
+    "clock": ("system.cpu_clk_domain", "clock"),
+    "mem_mode": ("system", "mem_mode"),
+    "cmd": ("{cpu}.workload", "cmd"),
+    "env": ("{cpu}.workload", "env"),
+}
+# Compiled form of PARAMS: {cpu} paths become regexes, the others stay exact paths.
+PARAM_PATTERNS = {
+    name: (
+        re.compile(r"^system\.(?P<group>switch_cpus|cpu)0*" + re.escape(path[len("{cpu}"):]) + "$")
+        if path.startswith("{cpu}")
+        else path,
+        param,
+    )
+    for name, (path, param) in PARAMS.items()
+}
+DERIVED = ["num_cpus", "cpu_classes", "cmd_threads", "cmd_size", "omp_wait_policy"]
+# Not compared across runs: they differ by construction (or say nothing about the config).
+SKIP_VARIATION = {"cmd", "env"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Index the effective parameters of every run from config.json (streamed), "
+            "infer which of them vary per campaign and flag runs that do not match "
+            "their sweep point."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images",
+        help="Directory where config_index.csv is written (default: results/images).",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit with status 2 when a run is flagged (for scripts and CI).",
+    )
+    return parser.parse_args()
+
+
+def scalar(text):
+    return json.loads(text)
+
+
+def stream_objects(path):
+    # Yields (object path, {param: value}) for every gem5 SimObject of config.json,
+    # reading it line by line: only the objects currently open are held in memory.
+    # Lists of scalars (cmd, env, clock) are kept as lists; nested objects are not.
+    stack = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            text = line.strip()
+            if not text:
+                continue
+            match = KEY_LINE_RE.match(text)
+            if match:
+                key, rest = match.group("key"), match.group("rest")
+            else:
+                key, rest = None, text.rstrip(", ")
+            if rest in ("{", "["):
+                stack.append({"key": key, "kind": rest, "params": {}, "items": []})
+                continue
+            if rest in ("}", "]"):
+                frame = stack.pop()
+                if frame["kind"] == "{":
+                    object_path = frame["params"].get("path")
+                    if isinstance(object_path, str):
+                        yield object_path, frame["params"]
+                elif stack and frame["key"] is not None and stack[-1]["kind"] == "{" and frame["items"]:
+                    stack[-1]["params"][frame["key"]] = frame["items"]
+                continue
+            if not stack:
+                continue
+            if rest in ("{}", "[]"):
+                value = {} if rest == "{}" else []
+            else:
+                try:
+                    value = scalar(rest)
+                except ValueError:
+                    continue
+            if stack[-1]["kind"] == "{" and key is not None:
+                stack[-1]["params"][key] = value
+            elif stack[-1]["kind"] == "[":
+                stack[-1]["items"].append(value)
+
+
+def effective_params(outdir):
+    # Parameter vector of one run, or None without config.json.
+    path = Path(outdir) / "config.json"
+    if not path.is_file():
+        return None
+    found = {"cpu": {}, "switch_cpus": {}}
+    cpu_classes = {"cpu": Counter(), "switch_cpus": Counter()}
+    others = {}
+    for object_path, params in stream_objects(path):
+        cpu_match = CPU_RE.match(object_path)
+        if cpu_match:
+            cpu_classes[cpu_match.group("group")][params.get("type")] += 1
+        for name, (pattern, param) in PARAM_PATTERNS.items():
+            if param not in params:
+                continue
+            if isinstance(pattern, str):
+                if object_path == pattern:
+                    others[name] = params[param]
+                continue
+            match = pattern.match(object_path)
+            if match:
+                found[match.group("group")].setdefault(name, params[param])
+
+    # Measured cores: switch_cpus after fast-forward, the cpu objects otherwise.
+    group = "switch_cpus" if found["switch_cpus"] else "cpu"
+    values = dict(others)
+    values.update(found[group])
+    classes = cpu_classes[group]
+    values["num_cpus"] = sum(classes.values())
+    values["cpu_classes"] = "+".join(f"{count}x{name}" for name, count in sorted(classes.items()))
+    if isinstance(values.get("clock"), list) and len(values["clock"]) == 1:
+        values["clock"] = values["clock"][0]
+    cmd = values.get("cmd") or []
+    # test_omp takes "<threads> <size>".
+    values["cmd_threads"] = int(cmd[1]) if len(cmd) > 1 and str(cmd[1]).isdigit() else None
+    values["cmd_size"] = int(cmd[2]) if len(cmd) > 2 and str(cmd[2]).isdigit() else None
+    env = dict(item.split("=", 1) for item in values.get("env") or [] if "=" in item)
+    values["omp_wait_policy"] = env.get("OMP_WAIT_POLICY", "default")
+    values["cmd"] = " ".join(str(part) for part in cmd)
+    values["env"] = " ".join(values.get("env") or [])
+    return values
+
+
+def mix_cores(mix):
+    return sum(int(cluster.split("x", 1)[0]) for cluster in mix.split("+"))
+
+
+def sweep_mismatches(run, params):
+    # Effective values that contradict the point the run was named after.
+    problems = []
+    if params["cmd_threads"] is not None and params["cmd_threads"] != run["threads"]:
+        problems.append(f"threads: named {run['threads']}, test_omp got {params['cmd_threads']}")
+    if run["size"] is not None and params["cmd_size"] is not None and params["cmd_size"] != run["size"]:
+        problems.append(f"size: named {run['size']}, test_omp got {params['cmd_size']}")
+    if run["width"] is not None and params.get("issueWidth") not in (None, run["width"]):
+        problems.append(f"width: named {run['width']}, issueWidth={params['issueWidth']}")
+    expected_cpus = mix_cores(run["mix"]) if run["mix"] else run["threads"]
+    if params["num_cpus"] != expected_cpus:
+        problems.append(f"cores: expected {expected_cpus}, config has {params['num_cpus']}")
+    if "active" in run["campaign"].lower().split("_") and params["omp_wait_policy"] != "ACTIVE":
+        problems.append(f"campaign is _active but OMP_WAIT_POLICY={params['omp_wait_policy']}")
+    return problems
+
+
+def variation(records):
+    # {param: Counter(value)} for parameters with more than one value in the campaign.
+    names = [name for name in list(PARAMS) + DERIVED if name not in SKIP_VARIATION]
+    varying = {}
+    for name in names:
+        counts = Counter(json.dumps(record["params"].get(name)) for record in records)
+        if len(counts) > 1:
+            varying[name] = counts
+    return varying
+
+
+# Parameters that follow a sweep dimension; any other varying parameter is unexplained.
+FOLLOWS = {
+    "threads": {"cmd_threads", "num_cpus", "cpu_classes"},
+    "size": {"cmd_size"},
+    "width": {"issueWidth"},
+    "mix": {"num_cpus", "cpu_classes", "issueWidth", "cpu_class", "l1d_size", "l1i_size", "l1d_assoc", "l1i_assoc"},
+}
+
+
+def main():
+    args = parse_args()
+
+    started = time.perf_counter()
+    campaigns = {}
+    skipped = 0
+    for run in find_runs(args.results_root):
+        params = effective_params(run["outdir"])
+        if params is None:
+            skipped += 1
+            continue
+        campaigns.setdefault(run["campaign"], []).append({"run": run, "params": params})
+    elapsed = time.perf_counter() - started
+    if not campaigns:
+        print(f"Error: no run with a config.json under {args.results_root}", file=sys.stderr)
+        return 1
+
+    rows = []
+    flagged = 0
+    for campaign, records in sorted(campaigns.items()):
+        sweep_dims = [
+            dim for dim in ("size", "width", "mix", "threads")
+            if len({record["run"][dim] for record in records}) > 1
+        ]
+        explained = set().union(*(FOLLOWS[dim] for dim in sweep_dims)) if sweep_dims else set()
+        varying = variation(records)
+        fixed = [
+            name for name in list(PARAMS) + DERIVED
+            if name not in varying and name not in SKIP_VARIATION
+        ]
+        print(f"\n{campaign}: {len(records)} runs, sweep over {', '.join(sweep_dims) or 'nothing'}")
+        print("  fixed:   " + ", ".join(f"{name}={records[0]['params'].get(name)}" for name in fixed))
+        print("  varying: " + (", ".join(f"{name} ({len(counts)} values)" for name, counts in varying.items()) or "-"))
+
+        for record in sorted(records, key=lambda r: (r["run"]["size"] or 0, r["run"]["width"] or 0, r["run"]["threads"])):
+            run, params = record["run"], record["params"]
+            problems = sweep_mismatches(run, params)
+            for name, counts in varying.items():
+                if name in explained:
+                    continue
+                majority, _ = counts.most_common(1)[0]
+                value = json.dumps(params.get(name))
+                if value != majority:
+                    problems.append(f"{name}={params.get(name)} differs from the campaign ({json.loads(majority)})")
+            if problems:
+                flagged += 1
+                print(f"  FLAG {run['name']}: " + "; ".join(problems))
+            row = {"run": run["name"], "campaign": campaign}
+            row.update({dim: run[dim] for dim in ("size", "width", "mix", "threads")})
+            row.update({name: params.get(name) for name in list(PARAMS) + DERIVED})
+            row["problems"] = "; ".join(problems)
+            rows.append(row)
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "config_index.csv"
+    fields = ["run", "campaign", "size", "width", "mix", "threads"] + list(PARAMS) + DERIVED + ["problems"]
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nWrote config index: {csv_path}")
+    print(
+        f"{len(rows)} runs indexed in {elapsed:.2f}s ({len(rows) / elapsed:.0f} configs/s), "
+        f"{skipped} without config.json, {flagged} flagged"
+    )
+    return 2 if args.strict and flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from campaign import find_runs
+from coherence import coherence_metrics
+from gem5stats import read_stats
+from memsys import memsys_metrics
+from metrics import add_speedup, core_type
+
+
+DIMS = ["campaign", "core_type", "size", "width", "mix", "threads", "cores", "cache"]
+# Per-run measures read from stats.txt; the t=1-relative measures (speedup, useful
+# IPC...) are derived from them at every refresh since a new t=1 run changes its whole group.
+RUN_MEASURES = [
+    "sim_insts",
+    "sim_ops",
+    "sim_seconds",
+    "cycles",
+    "ipc",
+    "ipc_max",
+    "host_seconds",
+    "host_inst_rate",
+    "host_mem_usage",
+    "snoops_pki",
+    "invalidating_pki",
+    "l1d_writebacks_pki",
+    "l2_writebacks_pki",
+    "l1d_miss_rate",
+    "l2bus_req_util",
+    "membus_req_util",
+    "dram_bytes",
+    "achieved_bw_mib",
+    "bw_fraction",
+    "row_hit_rate",
+    "avg_mem_lat_ns",
+    "arith_intensity",
+    "perf_gops",
+    "roof_fraction",
+]
+DERIVED_MEASURES = ["cycles_t1", "speedup", "efficiency", "useful_ipc", "sync_share"]
+MEASURES = RUN_MEASURES + DERIVED_MEASURES
+CACHE_SECTION_RE = re.compile(r"^\[system\.(?:cpu0*\.(?P<l1>dcache|icache)|(?P<l2>l2))\]$")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Materialized metrics cube over every campaign: the filled cells of "
+            "[campaign, core_type, size, width, mix, threads, cores, cache, measure], memory-mapped, with labels."
+        )
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    refresh = sub.add_parser("refresh", help="Add new or changed runs to the cube (only those are parsed).")
+    refresh.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    refresh.add_argument("--cube", default="results/cube", help="Cube directory (default: results/cube).")
+    refresh.add_argument("--full", action="store_true", help="Re-parse every run.")
+
+    query = sub.add_parser("query", help="Print a slice of the cube.")
+    query.add_argument("--cube", default="results/cube", help="Cube directory (default: results/cube).")
+    query.add_argument("--measure", required=True, help="Measure to print, e.g. ipc or speedup.")
+    query.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        help="dim=label selection, e.g. width=4 or core_type=A15 (repeatable).",
+    )
+
+    info = sub.add_parser("info", help="Show dimensions, labels and measures.")
+    info.add_argument("--cube", default="results/cube", help="Cube directory (default: results/cube).")
+    return parser.parse_args()
+
+
+def cache_config(outdir, stats):
+    # L1D/L1I/L2 sizes of the first core (cpu, cpu0 or cpu00) from config.ini,
+    # e.g. "l1d64k-l1i32k-l2_2048k"; "none" for cacheless runs (A7 atomic).
+    ini_path = Path(outdir) / "config.ini"
+    if not ini_path.is_file():
+        return "l2" if "system.l2.overall_accesses::total" in stats else "none"
+    sizes = {}
+    section = None
+    with ini_path.open("r", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            if line.startswith("["):
+                match = CACHE_SECTION_RE.match(line.strip())
+                section = (match.group("l1") or match.group("l2")) if match else None
+            elif section and line.startswith("size=") and section not in sizes:
+                sizes[section] = int(line.split("=", 1)[1]) // 1024
+    if not sizes:
+        return "none"
+    parts = [f"{name}{sizes[key]}k" for key, name in (("dcache", "l1d"), ("icache", "l1i"), ("l2", "l2_")) if key in sizes]
+    return "-".join(parts)
+
+
+def run_record(run):
+    stats = read_stats(run["stats_path"])
+    metrics = coherence_metrics(stats)
+    if metrics is None:
+        return None
+    metrics.update(memsys_metrics(stats, run["width"], run["threads"]))
+    coords = {
+        "campaign": run["campaign"],
+        "core_type": core_type(run),
+        "size": run["size"],
+        "width": run["width"],
+        "mix": run["mix"],
+        "threads": run["threads"],
+        "cores": metrics["cores"],
+        "cache": cache_config(run["outdir"], stats),
+    }
+    values = [float(metrics.get(name, float("nan"))) for name in RUN_MEASURES]
+    return coords, values
+
+
+def fingerprint(path):
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def sort_labels(labels):
+    # None (unknown size of hand-named variants) last; labels of one dim share a type.
+    return sorted(labels, key=lambda label: (label is None, label if label is not None else 0))
+
+
+def save_atomic(path, writer):
+    # Readers keep a valid mapping of the previous file: the new one replaces it by rename.
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        writer(handle)
+    os.replace(tmp_path, path)
+
+
+def refresh(args):
+    cube_dir = Path(args.cube)
+    cube_dir.mkdir(parents=True, exist_ok=True)
+    runs_path = cube_dir / "runs.json"
+    previous = {}
+    if runs_path.is_file() and not args.full:
+        document = json.loads(runs_path.read_text(encoding="utf-8"))
+        if document.get("measures") == RUN_MEASURES and document.get("dims") == DIMS:
+            previous = {record["name"]: record for record in document["runs"]}
+
+    started = time.perf_counter()
+    records = []
+    parsed = 0
+    for run in find_runs(args.results_root):
+        stamp = fingerprint(run["stats_path"])
+        record = previous.get(run["name"])
+        if record is None or record["fingerprint"] != stamp:
+            result = run_record(run)
+            parsed += 1
+            if result is None:
+                print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+                continue
+            coords, values = result
+            record = {"name": run["name"], "fingerprint": stamp, "coords": coords, "values": values}
+        records.append(record)
+    if not records:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    # Speedup is recomputed over the whole table (cheap: cycles and sim_insts only).
+    rows = [
+        dict(
+            record["coords"],
+            cycles=record["values"][RUN_MEASURES.index("cycles")],
+            sim_insts=record["values"][RUN_MEASURES.index("sim_insts")],
+        )
+        for record in records
+    ]
+    add_speedup(rows)
+
+    labels = {dim: sort_labels({record["coords"][dim] for record in records}) for dim in DIMS}
+    positions = {dim: {label: i for i, label in enumerate(labels[dim])} for dim in DIMS}
+    shape = [len(labels[dim]) for dim in DIMS] + [len(MEASURES)]
+    # Only filled cells are stored (one per run): the dense array is almost all NaN,
+    # since each campaign covers a few points of the dims product.
+    cells = {}
+    for record, row in zip(records, rows):
+        cell = tuple(positions[dim][record["coords"][dim]] for dim in DIMS)
+        if cell in cells:
+            print(f"Warning: {record['name']} and {cells[cell][0]} share a cell; keeping {record['name']}", file=sys.stderr)
+        values = record["values"] + [row[name] if row[name] is not None else np.nan for name in DERIVED_MEASURES]
+        cells[cell] = (record["name"], values)
+    order = sorted(cells)
+    cell_index = np.array(order, dtype=np.int32).reshape(len(order), len(DIMS))
+    values = np.array([cells[cell][1] for cell in order], dtype=np.float64)
+
+    save_atomic(cube_dir / "cells.npy", lambda handle: np.save(handle, cell_index, allow_pickle=False))
+    save_atomic(cube_dir / "values.npy", lambda handle: np.save(handle, values, allow_pickle=False))
+    coords_doc = {"dims": DIMS, "labels": labels, "measures": MEASURES}
+    save_atomic(cube_dir / "coords.json", lambda handle: handle.write(json.dumps(coords_doc, indent=1).encode()))
+    runs_doc = {"dims": DIMS, "measures": RUN_MEASURES, "runs": records}
+    save_atomic(runs_path, lambda handle: handle.write(json.dumps(runs_doc).encode()))
+    # Dense array written by older versions.
+    (cube_dir / "cube.npy").unlink(missing_ok=True)
+
+    size_kib = (cell_index.nbytes + values.nbytes) / 1024
+    dense = np.prod(shape[:-1])
+    print(
+        f"Wrote cube: {cube_dir} shape={tuple(shape)}, {len(order)} filled cells "
+        f"({len(order) / dense:.2%}), {size_kib:.0f} KiB"
+    )
+    print(f"{len(records)} runs, {parsed} parsed, {len(records) - parsed} unchanged in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+class MetricsCube:
+    # Query side. cells.npy holds the label index of every filled cell on each dim
+    # (int32 [cells x dims]) and values.npy its measures (float64 [cells x measures]);
+    # both are memory-mapped read-only and selections filter their rows.
+
+    def __init__(self, cube_dir="results/cube"):
+        cube_dir = Path(cube_dir)
+        document = json.loads((cube_dir / "coords.json").read_text(encoding="utf-8"))
+        self.dims = document["dims"]
+        self.labels_by_dim = document["labels"]
+        self.measures = document["measures"]
+        self.cell_index = np.load(cube_dir / "cells.npy", mmap_mode="r")
+        self.values = np.load(cube_dir / "values.npy", mmap_mode="r")
+        self.shape = tuple(len(self.labels_by_dim[dim]) for dim in self.dims) + (len(self.measures),)
+
+    def labels(self, dim):
+        return list(self.labels_by_dim[dim])
+
+    def index(self, dim, label):
+        labels = self.labels_by_dim[dim]
+        if label in labels:
+            return labels.index(label)
+        # Labels typed on a command line arrive as strings.
+        for i, candidate in enumerate(labels):
+            if str(candidate) == str(label):
+                return i
+        raise KeyError(f"no label {label!r} on dimension '{dim}' (have: {labels})")
+
+    def measure_index(self, measure):
+        if measure not in self.measures:
+            raise KeyError(f"unknown measure '{measure}'")
+        return self.measures.index(measure)
+
+    def match(self, selection):
+        # Filled cells inside a selection (row numbers) and the dims left free.
+        unknown = set(selection) - set(self.dims)
+        if unknown:
+            raise KeyError(f"unknown dimension(s): {', '.join(sorted(unknown))}")
+        mask = np.ones(len(self.cell_index), dtype=bool)
+        for j, dim in enumerate(self.dims):
+            if dim in selection:
+                mask &= self.cell_index[:, j] == self.index(dim, selection[dim])
+        return np.flatnonzero(mask), [dim for dim in self.dims if dim not in selection]
+
+    def sel(self, measure=None, **selection):
+        # Dense (array, remaining dims) of one slice, NaN where no run; e.g.
+        # sel("ipc", width=4) -> [campaign, core_type, size, mix, threads, cores, cache].
+        # Built from the filled cells, so only the slice itself is allocated.
+        rows, remaining = self.match(selection)
+        columns = [self.dims.index(dim) for dim in remaining]
+        shape = [len(self.labels_by_dim[dim]) for dim in remaining]
+        if measure is None:
+            shape.append(len(self.measures))
+            remaining = remaining + ["measure"]
+            data = self.values[rows]
+        else:
+            data = self.values[rows, self.measure_index(measure)]
+        array = np.full(shape, np.nan)
+        if columns:
+            array[tuple(self.cell_index[rows][:, columns].T)] = data
+        elif len(rows):
+            # Every dim selected: at most one cell.
+            array[...] = data[0]
+        return array, remaining
+
+    def cells(self, measure, **selection):
+        # Filled cells of a slice as ({dim: label}, value) pairs, for tables and plots.
+        j = self.measure_index(measure)
+        rows, remaining = self.match(selection)
+        columns = [self.dims.index(dim) for dim in remaining]
+        for i in rows:
+            value = float(self.values[i, j])
+            if np.isnan(value):
+                continue
+            coords = {dim: self.labels_by_dim[dim][self.cell_index[i, c]] for dim, c in zip(remaining, columns)}
+            yield coords, value
+
+    def rows(self, **selection):
+        # One dict per filled cell (dimension labels + every measure), the shape
+        # of metrics.run_table rows, so plotbatch.py can draw from the cube.
+        matched, remaining = self.match(selection)
+        columns = [self.dims.index(dim) for dim in remaining]
+        rows = []
+        for index, values in zip(self.cell_index[matched].tolist(), self.values[matched].tolist()):
+            row = dict(selection)
+            row.update({dim: self.labels_by_dim[dim][index[c]] for dim, c in zip(remaining, columns)})
+            row.update(zip(self.measures, values))
+            rows.append(row)
+        return rows
+
+
+def parse_where(items):
+    selection = {}
+    for item in items:
+        dim, sep, label = item.partition("=")
+        if not sep:
+            raise ValueError(f"--where expects dim=label, got '{item}'")
+        selection[dim] = None if label in ("None", "-") else label
+    return selection
+
+
+def query(args):
+    try:
+        cube = MetricsCube(args.cube)
+        selection = parse_where(args.where)
+        cells = list(cube.cells(args.measure, **selection))
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Error: {exc.args[0] if isinstance(exc, KeyError) else exc}", file=sys.stderr)
+        return 1
+    if not cells:
+        print("No filled cell in this slice.")
+        return 0
+    dims = list(cells[0][0])
+    print(" ".join(f"{dim:>16}" for dim in dims) + f" {args.measure:>14}")
+    for coords, value in cells:
+        print(" ".join(f"{str(coords[dim]):>16}" for dim in dims) + f" {value:14.6g}")
+    return 0
+
+
+def info(args):
+    try:
+        cube = MetricsCube(args.cube)
+    except OSError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    stored = (cube.cell_index.nbytes + cube.values.nbytes) / 1024
+    dense = np.prod(cube.shape[:-1])
+    print(f"shape: {cube.shape}, {len(cube.cell_index)} filled cells ({len(cube.cell_index) / dense:.2%}), {stored:.0f} KiB")
+    for dim in cube.dims:
+        print(f"{dim:<10} {cube.labels(dim)}")
+    print(f"measures   {cube.measures}")
+    return 0
+
+
+def main():
+    args = parse_args()
+    if args.command == "refresh":
+        return refresh(args)
+    if args.command == "query":
+        return query(args)
+    return info(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
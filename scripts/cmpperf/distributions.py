@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from campaign import find_runs
+from gem5stats import CPU_STAT_RE, read_stats
+
+
+BUCKET_RE = re.compile(r"^(?P<lo>-?\d+)(?:-(?P<hi>-?\d+))?$")
+SUMMARY_FIELDS = ("samples", "mean", "gmean", "stdev", "underflows", "overflows", "min_value", "max_value", "total")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Rebuild gem5 distributions (::bucket lines) as arrays and compare one "
+            "distribution across O3 widths, e.g. iq.issued_per_cycle for w2/w4/w8."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results/A15",
+        help="Directory scanned for runs (default: results/A15).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images/A15",
+        help="Directory where the comparison CSV is written (default: results/images/A15).",
+    )
+    parser.add_argument(
+        "--stat",
+        default="iq.issued_per_cycle",
+        help=(
+            "Distribution to compare: a per-core stat without the system.cpuN. prefix, summed over "
+            "the cores, or a system-level one such as mem_ctrls.bytesPerActivate "
+            "(default: iq.issued_per_cycle)."
+        ),
+    )
+    parser.add_argument("--size", type=int, default=None, help="Optional size filter.")
+    parser.add_argument("--threads", type=int, default=None, help="Optional thread-count filter.")
+    return parser.parse_args()
+
+
+class Distribution:
+    # One gem5 Distribution/Histogram: bucket i covers [lo[i], hi[i]] and holds counts[i].
+
+    def __init__(self, name, lo, hi, counts, summary):
+        self.name = name
+        self.lo = lo
+        self.hi = hi
+        self.counts = counts
+        self.samples = summary.get("samples", int(counts.sum()))
+        self.mean = summary.get("mean", float("nan"))
+        self.stdev = summary.get("stdev", float("nan"))
+        self.gmean = summary.get("gmean")
+        self.underflows = summary.get("underflows", 0)
+        self.overflows = summary.get("overflows", 0)
+        self.min_value = summary.get("min_value")
+        self.max_value = summary.get("max_value")
+
+    def __repr__(self):
+        return f"Distribution({self.name!r}, buckets={len(self.counts)}, samples={self.samples})"
+
+    @property
+    def centers(self):
+        return (self.lo + self.hi) / 2.0
+
+    def pmf(self):
+        total = self.counts.sum()
+        return self.counts / total if total else np.zeros(len(self.counts))
+
+    def cdf(self):
+        return np.cumsum(self.pmf())
+
+    def bucket_mean(self):
+        total = self.counts.sum()
+        return float((self.centers * self.counts).sum() / total) if total else float("nan")
+
+    def fraction_above(self, value):
+        # Share of samples in buckets whose lower edge is > value.
+        total = self.counts.sum()
+        return float(self.counts[self.lo > value].sum() / total) if total else float("nan")
+
+    def __add__(self, other):
+        lo, hi, (a, b) = align([self, other])
+        return Distribution(f"{self.name}+{other.name}", lo, hi, a + b, {})
+
+
+def distributions_from_stats(stats):
+    grouped = {}
+    for key, value in stats.items():
+        if "::" not in key:
+            continue
+        name, field = key.split("::", 1)
+        grouped.setdefault(name, {})[field] = value
+
+    distributions = {}
+    for name, fields in grouped.items():
+        if "samples" not in fields:
+            continue
+        buckets = []
+        for field, value in fields.items():
+            match = BUCKET_RE.match(field)
+            if match:
+                lo = int(match.group("lo"))
+                hi = int(match.group("hi")) if match.group("hi") else lo
+                buckets.append((lo, hi, value))
+        if not buckets:
+            continue
+        buckets.sort()
+        lo = np.array([b[0] for b in buckets], dtype=np.int64)
+        hi = np.array([b[1] for b in buckets], dtype=np.int64)
+        counts = np.array([b[2] for b in buckets], dtype=np.int64)
+        summary = {field: fields[field] for field in SUMMARY_FIELDS if field in fields}
+        distributions[name] = Distribution(name, lo, hi, counts, summary)
+    return distributions
+
+
+def read_distributions(stats_path):
+    return distributions_from_stats(read_stats(stats_path))
+
+
+def align(distributions):
+    # Common bucket axis for several distributions; returns lo, hi and one count row each.
+    edges = sorted({(lo, hi) for d in distributions for lo, hi in zip(d.lo.tolist(), d.hi.tolist())})
+    position = {edge: i for i, edge in enumerate(edges)}
+    matrix = np.zeros((len(distributions), len(edges)), dtype=np.int64)
+    for row, d in enumerate(distributions):
+        columns = [position[edge] for edge in zip(d.lo.tolist(), d.hi.tolist())]
+        matrix[row, columns] = d.counts
+    lo = np.array([edge[0] for edge in edges], dtype=np.int64)
+    hi = np.array([edge[1] for edge in edges], dtype=np.int64)
+    return lo, hi, matrix
+
+
+def per_core_total(distributions, stat):
+    # Sum of system.cpuN.<stat> over every core of one run.
+    groups = {"cpu": [], "switch_cpus": []}
+    for name, d in distributions.items():
+        match = CPU_STAT_RE.match(name)
+        if match and match.group("stat") == stat:
+            groups[match.group("group")].append(d)
+    # Same rule as gem5stats.per_cpu(): measured cores after fast-forward win.
+    cores = groups["switch_cpus"] or groups["cpu"]
+    if not cores:
+        return None
+    total = Distribution(f"system.cpu*.{stat}", cores[0].lo, cores[0].hi, cores[0].counts.copy(), {})
+    for d in cores[1:]:
+        total = total + d
+    total.name = f"system.cpu*.{stat}"
+    return total
+
+
+def run_total(distributions, stat):
+    # Per-core stats are summed over the cores; anything else (mem_ctrls, buses) is
+    # looked up as system.<stat>, with or without the system. prefix on the command line.
+    # Returns (distribution, per_core) or (None, False).
+    total = per_core_total(distributions, stat)
+    if total is not None:
+        return total, True
+    for name in (stat, f"system.{stat}"):
+        if name in distributions:
+            return distributions[name], False
+    return None, False
+
+
+def compare(rows):
+    # rows: [(label, width, Distribution)] -> pmf matrix and the share of samples
+    # beyond what the next narrower width could have issued.
+    lo, hi, matrix = align([d for _, _, d in rows])
+    totals = matrix.sum(axis=1, keepdims=True)
+    pmf = np.divide(matrix, totals, out=np.zeros(matrix.shape), where=totals > 0)
+    widths = sorted({width for _, width, _ in rows if width is not None})
+    beyond = []
+    for label, width, d in rows:
+        narrower = [w for w in widths if width is not None and w < width]
+        beyond.append(d.fraction_above(max(narrower)) if narrower else float("nan"))
+    return lo, hi, pmf, np.array(beyond)
+
+
+def main():
+    args = parse_args()
+
+    runs = [
+        run
+        for run in find_runs(args.results_root)
+        if (args.size is None or run["size"] == args.size)
+        and (args.threads is None or run["threads"] == args.threads)
+    ]
+    if not runs:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    rows = []
+    per_core = True
+    for run in sorted(runs, key=lambda r: (r["size"] or 0, r["threads"], r["width"] or 0)):
+        total, core_stat = run_total(read_distributions(run["stats_path"]), args.stat)
+        if total is None:
+            print(f"Warning: {run['name']} has no {args.stat} distribution", file=sys.stderr)
+            continue
+        per_core = per_core and core_stat
+        rows.append((run["name"], run["width"], total, run))
+    if not rows:
+        print(f"Error: no {args.stat} distribution found.", file=sys.stderr)
+        return 1
+
+    lo, hi, pmf, beyond = compare([(name, width, d) for name, width, d, _ in rows])
+    if not per_core:
+        # Issue width only bounds per-core distributions.
+        beyond[:] = float("nan")
+    labels = [f"{a}" if a == b else f"{a}-{b}" for a, b in zip(lo.tolist(), hi.tolist())]
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / f"dist_{args.stat.replace('.', '_')}.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["run", "size", "width", "threads", "samples", "mean", "beyond_narrower"] + labels)
+        for (name, width, d, run), row_pmf, extra in zip(rows, pmf, beyond):
+            writer.writerow(
+                [name, run["size"], width, run["threads"], int(d.counts.sum()), d.bucket_mean(), extra]
+                + [f"{p:.6f}" for p in row_pmf]
+            )
+
+    print(f"Wrote distribution CSV: {csv_path}")
+    print(f"{'run':<28} {'mean':>6} {'beyond':>7}  pmf[{', '.join(labels[:10])}{', ...' if len(labels) > 10 else ''}]")
+    for (name, width, d, _), row_pmf, extra in zip(rows, pmf, beyond):
+        shown = " ".join(f"{p:.2f}" for p in row_pmf[:10])
+        print(f"{name:<28} {d.bucket_mean():6.2f} {extra:7.1%}  {shown}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
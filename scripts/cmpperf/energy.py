@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from campaign import find_runs
+from clusters import read_clusters
+from gem5stats import per_cpu, read_stats
+from memsys import l2_bytes
+from metrics import base_metrics
+
+
+DEFAULT_PARAMS = Path(__file__).with_name("energy_params.json")
+MIB = 1024 * 1024
+
+FIELDS = [
+    "campaign",
+    "size",
+    "width",
+    "threads",
+    "profile",
+    "cores",
+    "cycles",
+    "sim_seconds",
+    "area_mm2",
+    "energy_uj",
+    "e_ops_uj",
+    "e_regfile_uj",
+    "e_rename_uj",
+    "e_l1_uj",
+    "e_l2_uj",
+    "e_dram_uj",
+    "e_static_uj",
+    "avg_power_mw",
+    "edp_uj_ms",
+    "gops_per_w",
+    "gops_per_mm2",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Activity-based energy estimate of every run (per-event energies x stats.txt "
+            "counts + leakage), with EDP, perf/W and perf/mm2."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--campaign",
+        action="append",
+        default=None,
+        help="Only include these campaigns (repeatable).",
+    )
+    parser.add_argument(
+        "--params",
+        default=str(DEFAULT_PARAMS),
+        help="JSON file with per-event energies and core/cache areas (default: energy_params.json next to this script).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images/A15",
+        help="Directory where energy.csv is written (default: results/images/A15).",
+    )
+    parser.add_argument("--top", type=int, default=5, help="Configurations shown per ranking (default: 5).")
+    return parser.parse_args()
+
+
+def load_params(path):
+    params = json.loads(Path(path).read_text(encoding="utf-8"))
+    for section in ("cores", "events_pj", "uncore"):
+        if section not in params:
+            raise ValueError(f"{path}: missing '{section}' section")
+    return params
+
+
+def profile_name(width):
+    # A7 runs have no O3 width; A15 profiles are per issue width.
+    return "A7" if width is None else f"A15_w{width}"
+
+
+def core_profiles(width, outdir, mix, cores):
+    # Profile of every core. A --cpu-mix run takes it from its clusters: O3 cores
+    # by issue width, in-order cores (minor, timing, atomic) as A7.
+    if not mix:
+        return [profile_name(width)] * cores
+    profiles = []
+    for cluster in read_clusters(outdir):
+        profiles.extend([profile_name(cluster["width"])] * cluster["count"])
+    return profiles
+
+
+def core_total(stats, *names):
+    # Sum over cores of the first stat name that exists (O3 and atomic CPUs
+    # count the same activity under different names).
+    for name in names:
+        values = per_cpu(stats, name)
+        if values:
+            return sum(values.values())
+    return 0
+
+
+def activity(stats):
+    # Event counts summed over cores. The A7 runs use AtomicSimpleCPU without
+    # caches: L1 accesses fall back to memory references and fetched instructions.
+    return {
+        "regfile_read": core_total(stats, "int_regfile_reads", "num_int_register_reads")
+        + core_total(stats, "fp_regfile_reads", "num_fp_register_reads"),
+        "regfile_write": core_total(stats, "int_regfile_writes", "num_int_register_writes")
+        + core_total(stats, "fp_regfile_writes", "num_fp_register_writes"),
+        "rename_lookup": core_total(stats, "rename.RenameLookups"),
+        "l1i_access": core_total(stats, "icache.overall_accesses::total", "committedInsts"),
+        "l1d_access": core_total(stats, "dcache.overall_accesses::total", "num_mem_refs"),
+        "l2_access": stats.get("system.l2.overall_accesses::total", 0),
+        "dram_byte": stats.get("system.mem_ctrls.bytesReadDRAM", 0) + stats.get("system.mem_ctrls.bytesWritten", 0),
+    }
+
+
+def energy_metrics(stats, width, outdir, params, mix=None):
+    metrics = base_metrics(stats)
+    if metrics is None:
+        return None
+    profiles = core_profiles(width, outdir, mix, metrics["cores"])
+    for profile in set(profiles):
+        if profile not in params["cores"]:
+            raise KeyError(f"no core profile '{profile}' in energy parameters")
+    cores = [params["cores"][profile] for profile in profiles]
+    events = params["events_pj"]
+    uncore = params["uncore"]
+    counts = activity(stats)
+    seconds = metrics["sim_seconds"]
+
+    has_l2 = "system.l2.overall_accesses::total" in stats
+    l2_mib = l2_bytes(outdir) / MIB if has_l2 else 0.0
+    area = sum(core["area_mm2"] for core in cores) + l2_mib * uncore["l2_area_mm2_per_mib"] + uncore["bus_area_mm2"]
+    leak_w = (sum(core["leak_mw"] for core in cores) + l2_mib * uncore["l2_leak_mw_per_mib"]) / 1000.0
+    ops = per_cpu(stats, "committedOps")
+    ops_pj = sum(ops.get(i, 0) * core["op_pj"] for i, core in enumerate(cores))
+
+    pj = 1e-12
+    parts = {
+        "e_ops": ops_pj * pj,
+        "e_regfile": (counts["regfile_read"] * events["regfile_read"] + counts["regfile_write"] * events["regfile_write"]) * pj,
+        "e_rename": counts["rename_lookup"] * events["rename_lookup"] * pj,
+        "e_l1": (counts["l1i_access"] * events["l1i_access"] + counts["l1d_access"] * events["l1d_access"]) * pj,
+        "e_l2": counts["l2_access"] * events["l2_access"] * pj,
+        "e_dram": counts["dram_byte"] * events["dram_byte"] * pj,
+        # Idle cores still leak for the whole run.
+        "e_static": leak_w * seconds,
+    }
+    energy = sum(parts.values())
+    perf = metrics["sim_ops"] / seconds
+
+    metrics.update({f"{name}_uj": value * 1e6 for name, value in parts.items()})
+    metrics.update(
+        {
+            "profile": "+".join(sorted(set(profiles))),
+            "area_mm2": area,
+            "energy_j": energy,
+            "energy_uj": energy * 1e6,
+            "avg_power_mw": energy / seconds * 1000.0,
+            "edp_uj_ms": energy * 1e6 * seconds * 1e3,
+            "gops_per_w": perf / 1e9 / (energy / seconds),
+            "gops_per_mm2": perf / 1e9 / area,
+        }
+    )
+    return metrics
+
+
+def main():
+    args = parse_args()
+
+    try:
+        params = load_params(args.params)
+    except (OSError, ValueError) as exc:
+        print(f"Error: cannot load energy parameters: {exc}", file=sys.stderr)
+        return 1
+
+    runs = [
+        run
+        for run in find_runs(args.results_root)
+        if not args.campaign or run["campaign"] in args.campaign
+    ]
+    if not runs:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    rows = []
+    for run in runs:
+        try:
+            metrics = energy_metrics(read_stats(run["stats_path"]), run["width"], run["outdir"], params, run["mix"])
+        except KeyError as exc:
+            print(f"Error: {run['name']}: {exc.args[0]}", file=sys.stderr)
+            return 1
+        if metrics is None:
+            print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+            continue
+        metrics.update({key: run[key] for key in ("name", "campaign", "size", "width", "threads")})
+        rows.append(metrics)
+    rows.sort(key=lambda row: (row["campaign"], row["size"] or 0, row["width"] or 0, row["threads"]))
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "energy.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote energy CSV: {csv_path}")
+
+    print(f"{'run':<26} {'mm2':>6} {'uJ':>9} {'mW':>8} {'EDP':>9} {'Gops/W':>7} {'Gops/mm2':>9}")
+    for row in rows:
+        print(
+            f"{row['name']:<26} {row['area_mm2']:6.2f} {row['energy_uj']:9.1f} {row['avg_power_mw']:8.1f} "
+            f"{row['edp_uj_ms']:9.2f} {row['gops_per_w']:7.2f} {row['gops_per_mm2']:9.3f}"
+        )
+
+    print()
+    for label, key, best_first in (
+        ("perf/W", "gops_per_w", True),
+        ("perf/mm2", "gops_per_mm2", True),
+        ("EDP", "edp_uj_ms", False),
+    ):
+        ranked = sorted(rows, key=lambda row: row[key], reverse=best_first)[: args.top]
+        print(f"Best {label}: " + ", ".join(f"{row['name']} ({row[key]:.3g})" for row in ranked))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
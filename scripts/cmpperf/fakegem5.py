@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+
+import argparse
+import concurrent.futures
+import fnmatch
+import json
+import math
+import os
+import random
+import re
+import signal
+import sys
+import time
+import zlib
+from pathlib import Path
+
+from campaign import find_runs
+
+
+HERE = Path(__file__).resolve().parent
+REPO_ROOT = HERE.parents[1]
+DEFAULT_TEMPLATES = REPO_ROOT / "results" / "A15"
+# A core in a stat key, section name or port list: system.cpu3.x, cpu0, ::cpu0.data,
+# system.cpu.x (single core). Not cpu_clk_domain, cpu_id or switch_cpus.
+CPU_TOKEN_RE = re.compile(r"(?<![\w])cpu(\d*)(?![\w])")
+CPU_OBJECT_RE = re.compile(r"^\[system\.cpu\d*\]$")
+WORKLOAD_RE = re.compile(r"^\[system\.cpu\d*\.workload\]$")
+FAILURES = ("segv_after_done", "hang", "fatal")
+# Stats perturbed by generate --jitter: the ones the analyses read.
+JITTER_KEYS = (
+    "sim_seconds",
+    "sim_ticks",
+    "sim_insts",
+    "sim_ops",
+    "final_tick",
+    "host_*",
+    "system.cpu*.numCycles",
+    "system.cpu*.committedInsts",
+    "system.cpu*.committedOps",
+    "system.l2.overall_*",
+)
+WARNINGS = [
+    "warn: DRAM device capacity (8192 Mbytes) does not match the address range assigned (512 Mbytes)",
+    "warn: Sockets disabled, not accepting gdb connections",
+    "warn: ignoring syscall sigprocmask(...)",
+    "warn: ignoring syscall madvise(...)",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Stand-in for gem5.fast + se_a15.py: writes stats.txt/config.ini/config.json "
+            "derived from real runs and scaled to any core count, burns a configurable "
+            "time and RSS, and can inject the known gem5 failures."
+        )
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    install = sub.add_parser("install", help="Write <dir>/build/ARM/gem5.fast, usable as --gem5 <dir>.")
+    install.add_argument("dir", help="Fake gem5-stable directory.")
+    add_behaviour_args(install)
+
+    run = sub.add_parser("run", help="Emulate one gem5 run (what the installed gem5.fast calls).")
+    run.add_argument("argv", nargs=argparse.REMAINDER, help="gem5 command line.")
+
+    generate = sub.add_parser("generate", help="Write a finished synthetic campaign without running anything.")
+    generate.add_argument("--out", required=True, help="Campaign directory to create, e.g. /tmp/synth/S1k.")
+    generate.add_argument("--runs", type=int, required=True, help="Number of runs.")
+    generate.add_argument("--widths", default="2 4 8", help='Widths cycled through (default: "2 4 8").')
+    generate.add_argument("--threads", default="1 2 4 8 16 32", help='Thread counts cycled through (default: "1 2 4 8 16 32").')
+    generate.add_argument(
+        "--templates",
+        default=str(DEFAULT_TEMPLATES),
+        help="Real runs the files are derived from (default: results/A15).",
+    )
+    generate.add_argument(
+        "--keep",
+        action="append",
+        default=None,
+        help="Only write stats whose key matches this glob (repeatable), to keep large campaigns small.",
+    )
+    generate.add_argument("--no-configs", action="store_true", help="Only write stats.txt.")
+    generate.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Relative noise on sim_seconds/ticks/insts/ops, host_*, numCycles, committedInsts and l2 overall stats (default: 0).",
+    )
+    generate.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count).")
+    return parser.parse_args()
+
+
+def add_behaviour_args(parser):
+    parser.add_argument(
+        "--time",
+        default="0.1",
+        help='Wall time per run: seconds, or "<f>x" for f times the template host_seconds (default: 0.1).',
+    )
+    parser.add_argument(
+        "--rss",
+        default="0",
+        help='Memory held: bytes with K/M/G suffix, or "<f>x" of the template host_mem_usage (default: 0).',
+    )
+    parser.add_argument("--burn", action="store_true", help="Spin on the CPU instead of sleeping.")
+    parser.add_argument(
+        "--fail",
+        default="",
+        help=(
+            'Failures as mode=probability or mode=run-glob, comma separated; modes: '
+            f'{", ".join(FAILURES)}. E.g. "segv_after_done=0.05,hang=*_t32".'
+        ),
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the failure draws (default: 0).")
+    parser.add_argument(
+        "--templates",
+        default=str(DEFAULT_TEMPLATES),
+        help="Real runs the outputs are derived from (default: results/A15).",
+    )
+
+
+def core_name(index, cores):
+    # gem5 vector naming: "cpu" alone, else padded to the digits of the last index.
+    return "cpu" if cores == 1 else f"cpu{index:0{len(str(cores - 1))}d}"
+
+
+def source_core(n, template_cores):
+    # Core 0 runs the main thread and owns the process: it is copied from template
+    # core 0, the other cores cycle over the template's worker cores.
+    if n == 0 or template_cores == 1:
+        return 0
+    return 1 + (n - 1) % (template_cores - 1)
+
+
+def core_of(text):
+    # (pattern, core index) of the first core named in text, None without one.
+    match = CPU_TOKEN_RE.search(text)
+    if match is None:
+        return None
+    return CPU_TOKEN_RE.sub("cpu*", text), int(match.group(1) or 0)
+
+
+def retarget(text, source, n, cores):
+    # The source core's own name becomes core n; references to another core
+    # (the shared system.cpu0.workload) keep their index.
+    def name(match):
+        index = int(match.group(1) or 0)
+        return core_name(n if index == source else index, cores)
+
+    return CPU_TOKEN_RE.sub(name, text)
+
+
+def expand(items, key, cores, template_cores, rename):
+    # Runs of consecutive per-core items (stats lines, ini sections, port tokens) are
+    # re-emitted core-major for `cores` cores: core n gets the items of template core
+    # source_core(n), in their order.
+    out = []
+    i = 0
+    while i < len(items):
+        if core_of(key(items[i])) is None:
+            out.append(items[i])
+            i += 1
+            continue
+        by_core = {}
+        while i < len(items) and core_of(key(items[i])) is not None:
+            by_core.setdefault(core_of(key(items[i]))[1], []).append(items[i])
+            i += 1
+        for n in range(cores):
+            source = source_core(n, template_cores)
+            out.extend(rename(item, source, n) for item in by_core.get(source, []))
+    return out
+
+
+def scale_stats(text, cores, template_cores):
+    def rename(line, source, n):
+        key = line.split(None, 1)[0]
+        new_key = retarget(key, source, n, cores)
+        rest = line[len(key):]
+        # Keep the value column in place when the name grows (cpu -> cpu00).
+        grown = len(new_key) - len(key)
+        if grown > 0 and rest.startswith(" " * (grown + 1)):
+            rest = rest[grown:]
+        return new_key + rest
+
+    lines = text.splitlines(keepends=True)
+    return "".join(expand(lines, lambda line: line.split(None, 1)[0] if line.strip() else "", cores, template_cores, rename))
+
+
+def split_sections(text):
+    sections = []
+    for line in text.splitlines(keepends=True):
+        if line.startswith("[") or not sections:
+            sections.append("")
+        sections[-1] += line
+    return sections
+
+
+def expand_list(tokens, cores, template_cores):
+    # ["clk_domain", "cpu0", "cpu1", "l2"] -> the same list for `cores` cores.
+    return expand(tokens, lambda token: token, cores, template_cores, lambda token, source, n: retarget(token, source, n, cores))
+
+
+def scale_ini(text, point, template_cores):
+    cores = point["cores"]
+    shared_workload = f"system.{core_name(0, cores)}.workload"
+
+    def rename(section, source, n):
+        section = retarget(section, source, n, cores)
+        header = section.split("\n", 1)[0].strip()
+        # Copies of a single-core template: only core 0 keeps the process object.
+        borrowed = source == 0 and n > 0
+        if WORKLOAD_RE.match(header):
+            if borrowed:
+                return ""
+            return "".join(
+                f"cmd={' '.join(point['cmd'])}\n" if line.startswith("cmd=")
+                else f"env={' '.join(point['env'])}\n" if line.startswith("env=")
+                else line
+                for line in section.splitlines(keepends=True)
+            )
+        if CPU_OBJECT_RE.match(header):
+            lines = []
+            for line in section.splitlines(keepends=True):
+                if line.startswith("cpu_id="):
+                    line = f"cpu_id={n}\n"
+                elif line.startswith("issueWidth=") and point["width"]:
+                    line = f"issueWidth={point['width']}\n"
+                elif line.startswith("workload="):
+                    line = f"workload={shared_workload}\n"
+                elif line.startswith("children=") and borrowed:
+                    line = "children=" + " ".join(child for child in line[len("children="):].split() if child != "workload") + "\n"
+                lines.append(line)
+            return "".join(lines)
+        return section
+
+    sections = expand(split_sections(text), lambda section: section.split("\n", 1)[0], cores, template_cores, rename)
+    out = []
+    for section in sections:
+        if core_of(section.split("\n", 1)[0]) is None:
+            lines = []
+            for line in section.splitlines(keepends=True):
+                name, sep, value = line.rstrip("\n").partition("=")
+                if sep and core_of(value) is not None:
+                    line = f"{name}={' '.join(expand_list(value.split(' '), cores, template_cores))}\n"
+                lines.append(line)
+            section = "".join(lines)
+        out.append(section)
+    return "".join(out)
+
+
+def retarget_tree(node, source, n, cores):
+    if isinstance(node, dict):
+        return {key: retarget_tree(value, source, n, cores) for key, value in node.items()}
+    if isinstance(node, list):
+        return [retarget_tree(value, source, n, cores) for value in node]
+    if isinstance(node, str):
+        return retarget(node, source, n, cores)
+    return node
+
+
+def scale_json(node, point, template_cores):
+    cores = point["cores"]
+    if isinstance(node, dict):
+        out = {}
+        for key, value in node.items():
+            if key == "cpu" and isinstance(value, list) and value and isinstance(value[0], dict):
+                objects = []
+                for n in range(cores):
+                    source = source_core(n, len(value))
+                    cpu = retarget_tree(value[source], source, n, cores)
+                    cpu["cpu_id"] = n
+                    if point["width"] and "issueWidth" in cpu:
+                        cpu["issueWidth"] = point["width"]
+                    if n > 0:
+                        cpu["workload"] = [f"system.{core_name(0, cores)}.workload"]
+                    for process in cpu.get("workload") or []:
+                        if isinstance(process, dict):
+                            process["cmd"] = list(point["cmd"])
+                            process["env"] = list(point["env"])
+                    objects.append(cpu)
+                out[key] = objects
+            else:
+                out[key] = scale_json(value, point, template_cores)
+        return out
+    if isinstance(node, list):
+        if node and all(isinstance(value, str) for value in node):
+            return expand_list(node, cores, template_cores)
+        return [scale_json(value, point, template_cores) for value in node]
+    return node
+
+
+def load_templates(root):
+    # Finished runs with both config files, by (width, threads).
+    templates = {}
+    for run in find_runs(root):
+        outdir = Path(run["outdir"])
+        if run["width"] and (outdir / "config.ini").is_file() and (outdir / "config.json").is_file():
+            templates.setdefault((run["width"], run["threads"]), outdir)
+    if not templates:
+        raise FileNotFoundError(f"no run with stats.txt, config.ini and config.json under {root}")
+    return templates
+
+
+def pick_template(templates, width, cores):
+    # Closest width first, then closest core count, both on a log2 scale.
+    return min(
+        templates.items(),
+        key=lambda item: (
+            abs(math.log2(item[0][0]) - math.log2(width or 4)),
+            abs(math.log2(item[0][1]) - math.log2(cores)),
+        ),
+    )
+
+
+# Scaled stats text and configs per (template, cores), reused across runs of one process.
+_SCALED = {}
+
+
+def scaled_files(template, template_cores, point, configs):
+    key = (str(template), point["cores"], configs)
+    if key not in _SCALED:
+        stats = scale_stats((template / "stats.txt").read_text(encoding="utf-8"), point["cores"], template_cores)
+        ini = (template / "config.ini").read_text(encoding="utf-8") if configs else None
+        tree = json.loads((template / "config.json").read_text(encoding="utf-8")) if configs else None
+        _SCALED[key] = (stats, ini, tree)
+    stats, ini, tree = _SCALED[key]
+    if not configs:
+        return stats, None, None
+    ini_text = scale_ini(ini, point, template_cores)
+    json_text = json.dumps(scale_json(tree, point, template_cores), indent=4, separators=(", ", ": "))
+    return stats, ini_text, json_text
+
+
+def stat_value(stats_text, key):
+    for line in stats_text.splitlines():
+        parts = line.split()
+        if len(parts) > 1 and parts[0] == key:
+            return float(parts[1])
+    return None
+
+
+def parse_command(argv):
+    # gem5 options, then the config script and its options (se_a15.py).
+    gem5 = argparse.ArgumentParser(add_help=False)
+    gem5.add_argument("-d", "--outdir", default="m5out")
+    gem5_args = []
+    while argv and argv[0].startswith("-"):
+        gem5_args.append(argv.pop(0))
+        if gem5_args[-1] in ("-d", "--outdir") and argv:
+            gem5_args.append(argv.pop(0))
+    script = argv.pop(0) if argv else None
+    options, _ = gem5.parse_known_args(gem5_args)
+
+    se = argparse.ArgumentParser(add_help=False)
+    se.add_argument("--num-cpus", type=int, default=1)
+    se.add_argument("--o3-width", type=int, default=2)
+    se.add_argument("--cpu-mix", default=None)
+    se.add_argument("-c", "--cmd", default="")
+    se.add_argument("-o", "--options", default="")
+    se.add_argument("--env", default=None)
+    se_args, _ = se.parse_known_args(argv)
+
+    cores = se_args.num_cpus
+    if se_args.cpu_mix:
+        cores = sum(int(cluster.split("x", 1)[0]) for cluster in se_args.cpu_mix.split("+"))
+    env = []
+    if se_args.env:
+        env = [line.strip() for line in Path(se_args.env).read_text().splitlines() if line.strip()]
+    return {
+        "outdir": Path(options.outdir),
+        "script": script,
+        "cores": cores,
+        "width": None if se_args.cpu_mix else se_args.o3_width,
+        "cmd": [se_args.cmd] + se_args.options.split(),
+        "env": env,
+    }
+
+
+def parse_amount(text, reference, units):
+    # "0.5" or "200M" -> absolute, "0.01x" -> fraction of the template value.
+    text = text.strip()
+    if text.endswith("x"):
+        return float(text[:-1]) * (reference or 0)
+    suffix = text[-1:].upper()
+    if suffix in units:
+        return float(text[:-1]) * units[suffix]
+    return float(text)
+
+
+def pick_failure(spec, run_name, seed):
+    draw = random.Random(f"{seed}:{run_name}").random()
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        mode, _, value = item.partition("=")
+        if mode not in FAILURES:
+            raise ValueError(f"unknown failure mode '{mode}' (expected {', '.join(FAILURES)})")
+        try:
+            if draw < float(value):
+                return mode
+        except ValueError:
+            if fnmatch.fnmatchcase(run_name, value):
+                return mode
+    return None
+
+
+def hold(seconds, burn):
+    deadline = time.monotonic() + seconds
+    if not burn:
+        time.sleep(max(seconds, 0))
+        return
+    while time.monotonic() < deadline:
+        sum(range(10000))
+
+
+def emulate(argv):
+    env = os.environ
+    try:
+        point = parse_command(list(argv))
+        templates = load_templates(env.get("FAKEGEM5_TEMPLATES", str(DEFAULT_TEMPLATES)))
+    except (OSError, ValueError) as exc:
+        print(f"fatal: {exc}", flush=True)
+        return 1
+    outdir = point["outdir"]
+    (width, template_cores), template = pick_template(templates, point["width"], point["cores"])
+    print("gem5 Simulator System.  http://gem5.org")
+    print("gem5 is copyrighted software; use the --copyright option for details.")
+    print(f"\ncommand line: gem5.fast {' '.join(argv)}")
+    print(f"fake gem5: {point['cores']} core(s) from template {template}\n")
+    print("Global frequency set at 1000000000000 ticks per second")
+
+    outdir.mkdir(parents=True, exist_ok=True)
+    stats, ini_text, json_text = scaled_files(template, template_cores, point, configs=True)
+    # Like gem5: configs at instantiation, stats.txt created empty and filled at the end.
+    (outdir / "config.ini").write_text(ini_text, encoding="utf-8")
+    (outdir / "config.json").write_text(json_text, encoding="utf-8")
+    (outdir / "stats.txt").write_text("", encoding="utf-8")
+
+    failure = pick_failure(env.get("FAKEGEM5_FAIL", ""), outdir.name, env.get("FAKEGEM5_SEED", "0"))
+    if failure == "fatal":
+        print(f"fatal: fake gem5: injected fatal error in {outdir.name}", flush=True)
+        return 1
+    seconds = parse_amount(env.get("FAKEGEM5_TIME", "0.1"), stat_value(stats, "host_seconds"), {})
+    # host_mem_usage is in KiB despite its "bytes" description.
+    rss = int(parse_amount(env.get("FAKEGEM5_RSS", "0"), (stat_value(stats, "host_mem_usage") or 0) * 1024, {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}))
+    # Filled, not only reserved, so the pages count in RSS.
+    ballast = bytearray(b"\x01") * rss
+    print("info: Entering event queue @ 0.  Starting simulation...")
+    for i in range(40):
+        print(WARNINGS[i % len(WARNINGS)])
+    sys.stdout.flush()
+
+    if failure == "hang":
+        while True:
+            time.sleep(3600)
+    hold(seconds, env.get("FAKEGEM5_BURN") == "1")
+    print("Done", flush=True)
+    if failure == "segv_after_done":
+        # The gem5-stable teardown crash: the benchmark finished, stats were never dumped.
+        signal.signal(signal.SIGSEGV, signal.SIG_DFL)
+        os.kill(os.getpid(), signal.SIGSEGV)
+    (outdir / "stats.txt").write_text(stats, encoding="utf-8")
+    tick = int(stat_value(stats, "final_tick") or 0)
+    print(f"Exiting @ tick {tick} because target called exit()")
+    del ballast
+    return 0
+
+
+def install(args):
+    gem5_bin = Path(args.dir) / "build" / "ARM" / "gem5.fast"
+    gem5_bin.parent.mkdir(parents=True, exist_ok=True)
+    defaults = {
+        "FAKEGEM5_TIME": args.time,
+        "FAKEGEM5_RSS": args.rss,
+        "FAKEGEM5_BURN": "1" if args.burn else "0",
+        "FAKEGEM5_FAIL": args.fail,
+        "FAKEGEM5_SEED": str(args.seed),
+        "FAKEGEM5_TEMPLATES": str(Path(args.templates).resolve()),
+    }
+    lines = ["#!/bin/sh", "# Written by scripts/cmpperf/fakegem5.py install; FAKEGEM5_* variables override these defaults."]
+    for name, value in defaults.items():
+        lines.append(f': "${{{name}:={value}}}"')
+    lines.append("export " + " ".join(defaults))
+    lines.append(f'exec "{sys.executable}" "{Path(__file__).resolve()}" run "$@"')
+    gem5_bin.write_text("\n".join(lines) + "\n")
+    gem5_bin.chmod(0o755)
+    print(f"Wrote fake gem5: {gem5_bin} (use --gem5 {args.dir})")
+    return 0
+
+
+def glob_re(patterns):
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+_FILTERED = {}
+
+
+def filtered_stats(template, template_cores, point, keep):
+    # (stats lines, indexes of the jittered lines), once per template, core count and
+    # --keep: only the jitter differs between two runs of the same shape.
+    key = (str(template), point["cores"], tuple(keep or ()))
+    if key not in _FILTERED:
+        stats, _, _ = scaled_files(template, template_cores, point, False)
+        lines = stats.splitlines(keepends=True)
+        if keep:
+            keep_re = glob_re(keep)
+            lines = [line for line in lines if not line.split() or line.startswith("-") or keep_re.match(line.split()[0])]
+        jitter_re = glob_re(JITTER_KEYS)
+        noisy = []
+        for i, line in enumerate(lines):
+            parts = line.split(None, 2)
+            if len(parts) < 2 or not jitter_re.match(parts[0]):
+                continue
+            try:
+                float(parts[1])
+            except ValueError:
+                continue
+            noisy.append(i)
+        _FILTERED[key] = (lines, noisy)
+    return _FILTERED[key]
+
+
+def jittered(lines, noisy, rng, jitter):
+    lines = list(lines)
+    for i in noisy:
+        line = lines[i]
+        key, value_text = line.split(None, 2)[:2]
+        value = float(value_text)
+        factor = 1 + rng.gauss(0, jitter)
+        text = str(int(round(value * factor))) if value_text.lstrip("-").isdigit() else f"{value * factor:.6f}"
+        # Only the value field: its text can also occur in the key (cpu09 for 9).
+        start = line.index(value_text, len(key))
+        lines[i] = line[:start] + text.rjust(len(value_text)) + line[start + len(value_text):]
+    return lines
+
+
+def generate_chunk(points, templates, keep, configs, jitter):
+    written = 0
+    for point in points:
+        (width, template_cores), template = pick_template(templates, point["width"], point["cores"])
+        lines, noisy = filtered_stats(template, template_cores, point, keep)
+        if jitter:
+            lines = jittered(lines, noisy, random.Random(zlib.crc32(point["name"].encode())), jitter)
+        stats = "".join(lines)
+        outdir = Path(point["outdir"])
+        outdir.mkdir(parents=True, exist_ok=True)
+        (outdir / "stats.txt").write_text(stats, encoding="utf-8")
+        written += len(stats)
+        if configs:
+            _, ini_text, json_text = scaled_files(template, template_cores, point, True)
+            (outdir / "config.ini").write_text(ini_text, encoding="utf-8")
+            (outdir / "config.json").write_text(json_text, encoding="utf-8")
+            written += len(ini_text) + len(json_text)
+    return len(points), written
+
+
+def generate(args):
+    started = time.perf_counter()
+    try:
+        templates = load_templates(args.templates)
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    widths = [int(value) for value in args.widths.replace(",", " ").split()]
+    threads_list = [int(value) for value in args.threads.replace(",", " ").split()]
+    out = Path(args.out)
+    env = ["OMP_WAIT_POLICY=ACTIVE", "GOMP_SPINCOUNT=1000000000"]
+
+    # Distinct run names: the size grows by one every time the (width, threads) grid wraps.
+    points = []
+    grid = [(width, threads) for width in widths for threads in threads_list]
+    for i in range(args.runs):
+        width, threads = grid[i % len(grid)]
+        size = 64 + i // len(grid)
+        name = f"s{size}_w{width}_t{threads}"
+        points.append(
+            {
+                "name": name,
+                "outdir": str(out / name),
+                "size": size,
+                "width": width,
+                "threads": threads,
+                "cores": threads,
+                "cmd": ["./test_omp", str(threads), str(size)],
+                "env": env,
+            }
+        )
+
+    out.mkdir(parents=True, exist_ok=True)
+    chunk = max(1, len(points) // (args.jobs * 8))
+    written = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [
+            pool.submit(generate_chunk, points[start:start + chunk], templates, args.keep, not args.no_configs, args.jitter)
+            for start in range(0, len(points), chunk)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            written += future.result()[1]
+
+    with (out / "state.tsv").open("w", encoding="utf-8") as handle:
+        handle.write("size\twidth\tthreads\tstatus\toutdir\tlog\tmix\n")
+        for point in points:
+            handle.write(f"{point['size']}\t{point['width']}\t{point['threads']}\tDONE\t{point['outdir']}\t\t-\n")
+    elapsed = time.perf_counter() - started
+    print(f"Wrote synthetic campaign: {out} ({len(points)} runs, {written / 1e6:.1f} MB in {elapsed:.1f}s)")
+    return 0
+
+
+def main():
+    # gem5 options such as --outdir=... must reach emulate() untouched by argparse.
+    if sys.argv[1:2] == ["run"]:
+        return emulate(sys.argv[2:])
+    args = parse_args()
+    if args.command == "install":
+        return install(args)
+    return generate(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
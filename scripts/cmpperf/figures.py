@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+
+import argparse
+import concurrent.futures
+import csv
+import hashlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+A7_SCRIPTS = REPO_ROOT / "scripts" / "A7"
+A15_SCRIPTS = REPO_ROOT / "scripts" / "A15"
+STATE_NAME = ".figures_state.json"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Incremental build of the campaign CSVs and figures (results -> CSV -> PNG). "
+            "Targets are rebuilt only when the content of their inputs changed; "
+            "independent targets run in parallel."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory holding the A7/ and A15/ campaigns (default: results).",
+    )
+    parser.add_argument(
+        "--images-root",
+        default="results/images",
+        help="Directory holding A7/ and A15/ outputs and the build state (default: results/images).",
+    )
+    parser.add_argument("--size", type=int, default=64, help="Matrix size of the campaigns (default: 64).")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count).",
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild the selected targets even if up to date.")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would be rebuilt.")
+    parser.add_argument("--list", action="store_true", help="List the targets with their inputs and outputs.")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Targets to build, with what they depend on (default: all).",
+    )
+    return parser.parse_args()
+
+
+class Target:
+    # One build step. `inputs` are paths or globs; `action` is (kind, payload):
+    #   ("script", (path, kwargs))  call main(**kwargs) of a scripts/A7 module
+    #   ("command", argv)           run a CLI script (scripts/A15)
+    #   ("function", (name, kwargs)) call a function of this module
+
+    def __init__(self, name, inputs, outputs, action, recipe):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = [Path(path) for path in outputs]
+        self.action = action
+        # Files whose content defines how the outputs are made: a change rebuilds the target.
+        self.recipe = [Path(path) for path in recipe]
+
+    def input_files(self):
+        files = set()
+        for pattern in self.inputs:
+            pattern = str(pattern)
+            if any(ch in pattern for ch in "*?["):
+                base = Path(pattern)
+                anchor = Path(base.anchor) if base.is_absolute() else Path(".")
+                relative = str(base.relative_to(anchor)) if base.is_absolute() else pattern
+                files.update(path for path in anchor.glob(relative) if path.is_file())
+            elif Path(pattern).is_file():
+                files.add(Path(pattern))
+        return sorted(files)
+
+
+def build_targets(results_root, images_root, size):
+    a7_dir = Path(results_root) / "A7"
+    a15_dir = Path(results_root) / "A15"
+    a7_images = Path(images_root) / "A7"
+    a15_images = Path(images_root) / "A15"
+    a7_stats = str(a7_dir / f"s{size}_t*" / "stats.txt")
+    q4 = a7_images / "q4_cycles.csv"
+    q5 = a7_images / "q5_cycles.csv"
+    q6 = a7_images / "q6_speedup.csv"
+    q7 = a7_images / "q7_ipc.csv"
+    this = Path(__file__).resolve()
+
+    def a7(name, script, inputs, output, **kwargs):
+        path = A7_SCRIPTS / script
+        return Target(name, inputs, [output], ("script", (str(path), kwargs)), [path])
+
+    def local(name, function, inputs, outputs, **kwargs):
+        return Target(name, inputs, outputs, ("function", (function, kwargs)), [this])
+
+    def a15(name, script, outputs):
+        path = A15_SCRIPTS / script
+        argv = [
+            sys.executable,
+            str(path),
+            "--results-root",
+            str(a15_dir),
+            "--images-dir",
+            str(a15_images),
+            "--size",
+            str(size),
+        ]
+        # The command runs from REPO_ROOT: its inputs and outputs are resolved there too.
+        root = REPO_ROOT / a15_dir
+        inputs = [str(root / "state.tsv"), str(root / f"s{size}_w*_t*" / "stats.txt")]
+        return Target(name, inputs, [REPO_ROOT / path for path in outputs], ("command", argv), [path])
+
+    return [
+        a7("a7_q4_csv", "extract_q4_cycles.py", [a7_stats], q4, a7_dir=str(a7_dir), size=size, out_csv=str(q4)),
+        local("a7_q5_csv", "write_q5_cycles", [q4], [q5], q4_csv=str(q4), out_csv=str(q5)),
+        local("a7_q6_csv", "write_q6_speedup", [q5], [q6], q5_csv=str(q5), out_csv=str(q6)),
+        a7("a7_q5_png", "plot_q5_cycles.py", [q5], a7_images / "q5_cycles_vs_threads.png",
+           csv_path=str(q5), out_png=str(a7_images / "q5_cycles_vs_threads.png")),
+        local("a7_q5_logy_png", "plot_q5_cycles_logy", [q5], [a7_images / "q5_cycles_vs_threads_logy.png"],
+              csv_path=str(q5), out_png=str(a7_images / "q5_cycles_vs_threads_logy.png")),
+        a7("a7_q6_png", "plot_q6_speedup.py", [q6], a7_images / "q6_speedup_vs_threads.png",
+           csv_path=str(q6), out_png=str(a7_images / "q6_speedup_vs_threads.png")),
+        a7("a7_q6_ideal_png", "plot_q6_speedup_ideal.py", [q6], a7_images / "q6_speedup_vs_threads_ideal.png",
+           csv_path=str(q6), out_png=str(a7_images / "q6_speedup_vs_threads_ideal.png")),
+        a7("a7_q7_csv", "extract_q7_ipc.py", [a7_stats], q7, a7_dir=str(a7_dir), size=size, out_csv=str(q7)),
+        a7("a7_q7_png", "plot_q7_ipc.py", [q7], a7_images / "q7_ipcmax_vs_threads.png",
+           csv_path=str(q7), out_png=str(a7_images / "q7_ipcmax_vs_threads.png")),
+        a15("a15_q9_cycles", "plot_q9_cycles.py",
+            [a15_images / "q9_cycles.csv", a15_images / "q9_speedup.csv", a15_images / "q9_cycles_3d.png"]),
+        a15("a15_q9_ipc", "extract_q9_ipc.py", [a15_images / "q9_ipc.csv", a15_images / "q9_ipc_max.csv"]),
+    ]
+
+
+# Steps of the A7 pipeline that had no script of their own.
+
+def write_q5_cycles(q4_csv, out_csv):
+    with Path(q4_csv).open() as handle:
+        rows = [(int(row["threads"]), int(row["cycles_max"])) for row in csv.DictReader(handle)]
+    with Path(out_csv).open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["threads", "cycles"])
+        writer.writerows(sorted(rows))
+
+
+def write_q6_speedup(q5_csv, out_csv):
+    with Path(q5_csv).open() as handle:
+        rows = sorted((int(row["threads"]), float(row["cycles"])) for row in csv.DictReader(handle))
+    baseline = dict(rows).get(1)
+    if baseline is None:
+        raise RuntimeError(f"No threads=1 row in {q5_csv}")
+    with Path(out_csv).open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["threads", "speedup"])
+        for threads, cycles in rows:
+            writer.writerow([threads, f"{baseline / cycles:.6f}"])
+
+
+def plot_q5_cycles_logy(csv_path, out_png):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    with Path(csv_path).open() as handle:
+        rows = sorted((int(row["threads"]), float(row["cycles"])) for row in csv.DictReader(handle))
+    plt.figure()
+    plt.plot([t for t, _ in rows], [c for _, c in rows], marker="o")
+    plt.yscale("log")
+    plt.xlabel("Threads (T)")
+    plt.ylabel("Cycles (C(T) = max cpu.numCycles), log scale")
+    plt.grid(True, which="both")
+    plt.savefig(out_png, dpi=200, bbox_inches="tight")
+    plt.close()
+
+
+def run_action(action):
+    # Runs in a worker process; returns (ok, captured output).
+    kind, payload = action
+    if kind == "command":
+        proc = subprocess.run(payload, cwd=REPO_ROOT, capture_output=True, text=True)
+        return proc.returncode == 0, proc.stdout + proc.stderr
+    try:
+        if kind == "script":
+            path, kwargs = payload
+            spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.main(**kwargs)
+        else:
+            name, kwargs = payload
+            globals()[name](**kwargs)
+    except Exception as exc:
+        return False, f"{type(exc).__name__}: {exc}"
+    return True, ""
+
+
+class HashCache:
+    # sha256 of file contents, recomputed only when size or mtime changed.
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def digest(self, path):
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        cached = self.entries.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        sha = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        self.entries[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+
+def target_key(target, hashes):
+    sha = hashlib.sha256()
+    sha.update(json.dumps(target.action, sort_keys=True, default=str).encode())
+    for path in target.recipe:
+        sha.update(f"recipe {path} {hashes.digest(path)}\n".encode())
+    for path in target.input_files():
+        sha.update(f"input {path} {hashes.digest(path)}\n".encode())
+    return sha.hexdigest()
+
+
+def is_fresh(target, key, record, hashes):
+    if not record or record.get("key") != key:
+        return False
+    # Outputs edited or deleted by hand are rebuilt too.
+    return all(hashes.digest(path) == record["outputs"].get(str(path)) for path in target.outputs)
+
+
+def select(targets, names):
+    # Requested targets plus everything upstream of them.
+    if not names:
+        return targets
+    producers = {str(path): target for target in targets for path in target.outputs}
+    by_name = {target.name: target for target in targets}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise KeyError(f"unknown target(s): {', '.join(unknown)}")
+    wanted = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in wanted:
+            continue
+        wanted.add(name)
+        for path in by_name[name].input_files() + [Path(p) for p in by_name[name].inputs]:
+            producer = producers.get(str(path))
+            if producer is not None:
+                stack.append(producer.name)
+    return [target for target in targets if target.name in wanted]
+
+
+def dependencies(targets):
+    producers = {str(path): target.name for target in targets for path in target.outputs}
+    deps = {}
+    for target in targets:
+        # Declared inputs, not only existing files: the producer must run first on a clean tree.
+        declared = {str(Path(p)) for p in target.inputs} | {str(p) for p in target.input_files()}
+        deps[target.name] = {producers[path] for path in declared if path in producers} - {target.name}
+    return deps
+
+
+def main():
+    args = parse_args()
+
+    targets = build_targets(args.results_root, args.images_root, args.size)
+    if args.list:
+        for target in targets:
+            print(f"{target.name}")
+            print(f"  inputs:  {', '.join(str(p) for p in target.inputs)}")
+            print(f"  outputs: {', '.join(str(p) for p in target.outputs)}")
+        return 0
+    try:
+        targets = select(targets, args.targets)
+    except KeyError as exc:
+        print(f"Error: {exc.args[0]}", file=sys.stderr)
+        return 1
+
+    state_path = Path(args.images_root) / STATE_NAME
+    state = {"files": {}, "targets": {}}
+    if state_path.is_file():
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    hashes = HashCache(state["files"])
+
+    deps = dependencies(targets)
+    by_name = {target.name: target for target in targets}
+    pending = dict(deps)
+    done = set()
+    failed = set()
+    rebuilt = []
+    skipped = []
+    started = time.perf_counter()
+
+    cycle = None
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            running = {}
+            while pending or running:
+                # Failed targets are settled too: their dependents are skipped, not stuck.
+                ready = [name for name, needs in pending.items() if needs <= done | failed]
+                for name in ready:
+                    del pending[name]
+                    target = by_name[name]
+                    if deps[name] & failed:
+                        failed.add(name)
+                        print(f"SKIP {name}: an input target failed", file=sys.stderr)
+                        continue
+                    key = target_key(target, hashes)
+                    if not args.force and is_fresh(target, key, state["targets"].get(name), hashes):
+                        skipped.append(name)
+                        done.add(name)
+                        continue
+                    if args.dry_run:
+                        print(f"WOULD BUILD {name}")
+                        rebuilt.append(name)
+                        done.add(name)
+                        continue
+                    for path in target.outputs:
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                    running[pool.submit(run_action, target.action)] = (name, key, time.perf_counter())
+                if not running:
+                    if pending and not ready:
+                        cycle = sorted(pending)
+                        break
+                    continue
+                finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    name, key, submitted = running.pop(future)
+                    ok, output = future.result()
+                    if ok:
+                        state["targets"][name] = {
+                            "key": key,
+                            "outputs": {str(path): hashes.digest(path) for path in by_name[name].outputs},
+                        }
+                        rebuilt.append(name)
+                        done.add(name)
+                        print(f"BUILT {name} ({time.perf_counter() - submitted:.2f}s)")
+                    else:
+                        failed.add(name)
+                        state["targets"].pop(name, None)
+                        print(f"FAILED {name}\n{output.rstrip()}", file=sys.stderr)
+    finally:
+        # Targets built before a failure or an interruption stay recorded.
+        if not args.dry_run:
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = state_path.with_name(state_path.name + ".tmp")
+            tmp_path.write_text(json.dumps(state, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp_path, state_path)
+
+    if cycle:
+        print(f"Error: dependency cycle between: {', '.join(cycle)}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{len(rebuilt)} rebuilt, {len(skipped)} up to date, {len(failed)} failed "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
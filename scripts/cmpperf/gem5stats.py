@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import contextlib
+import fnmatch
+import io
+import re
+import tarfile
+
+
+STAT_LINE_RE = re.compile(r"^(?P<key>[A-Za-z_][^\s#]*)\s+(?P<val>[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?|nan|inf|-inf)\b")
+BEGIN_MARKER = "---------- Begin Simulation Statistics ----------"
+END_MARKER = "---------- End Simulation Statistics"
+
+# Detailed cores are named system.cpuN (or system.cpu for a single core).
+# After --fast-forward the measured cores are system.switch_cpusN instead.
+CPU_STAT_RE = re.compile(r"^system\.(?P<group>switch_cpus|cpu)(?P<id>\d*)\.(?P<stat>\S+)$")
+
+# scratchrun.py --stage tar leaves <outdir>.tar.xz instead of the outdir.
+STATS_ARCHIVE_SUFFIX = ".tar.xz"
+
+
+def parse_value(text):
+    if text in ("nan", "inf", "-inf"):
+        return float(text)
+    if "." in text or "e" in text or "E" in text:
+        return float(text)
+    return int(text)
+
+
+@contextlib.contextmanager
+def open_stats(stats_path):
+    # A stats.txt, or the <outdir>/stats.txt member of a <outdir>.tar.xz, streamed
+    # without extracting the rest (scratchrun.py writes it as the first member).
+    stats_path = str(stats_path)
+    if not stats_path.endswith(STATS_ARCHIVE_SUFFIX):
+        with open(stats_path, "r", encoding="utf-8", errors="replace") as handle:
+            yield handle
+        return
+    with tarfile.open(stats_path, "r:xz") as tar:
+        for member in tar:
+            if member.isfile() and member.name.count("/") == 1 and member.name.endswith("/stats.txt"):
+                yield io.TextIOWrapper(tar.extractfile(member), encoding="utf-8", errors="replace")
+                return
+    raise FileNotFoundError(f"no stats.txt in {stats_path}")
+
+
+def read_stats(stats_path, dump=0, keys=None):
+    # Returns {key: value} for one stats dump (the first by default; -1 for the last).
+    # With keys, only those are kept and the scan stops once the first dump has them all.
+    wanted = set(keys) if keys is not None else None
+    dumps = []
+    current = None
+    with open_stats(stats_path) as handle:
+        for line in handle:
+            if line.startswith(BEGIN_MARKER):
+                current = {}
+                dumps.append(current)
+                continue
+            if line.startswith(END_MARKER):
+                current = None
+                if dump == 0:
+                    break
+                continue
+            match = STAT_LINE_RE.match(line)
+            if not match:
+                continue
+            if current is None:
+                # Stats files without markers (hand-trimmed or truncated).
+                current = {}
+                dumps.append(current)
+            key = match.group("key")
+            if wanted is not None and key not in wanted:
+                continue
+            current[key] = parse_value(match.group("val"))
+            if dump == 0 and wanted is not None and len(current) == len(wanted):
+                break
+
+    if not dumps:
+        return {}
+    return dumps[dump]
+
+
+def per_cpu(stats, stat):
+    values = {"cpu": {}, "switch_cpus": {}}
+    for key, value in stats.items():
+        match = CPU_STAT_RE.match(key)
+        if match and match.group("stat") == stat:
+            cpu_id = int(match.group("id")) if match.group("id") else 0
+            values[match.group("group")][cpu_id] = value
+    # Prefer the detailed cores that were switched in after fast-forward.
+    return values["switch_cpus"] or values["cpu"]
+
+
+def max_cycles(stats):
+    cycles = per_cpu(stats, "numCycles")
+    return max(cycles.values()) if cycles else None
+
+
+def core_count(stats):
+    return len(per_cpu(stats, "numCycles"))
+
+
+def matching(stats, pattern):
+    # {key: value} for every key matching a glob (fnmatch; '*' also spans dots).
+    return {key: value for key, value in stats.items() if fnmatch.fnmatchcase(key, pattern)}
+
+
+def sum_matching(stats, pattern):
+    return sum(matching(stats, pattern).values())
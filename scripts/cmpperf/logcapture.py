@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+import argparse
+import gzip
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+
+WARN_RE = re.compile(r"^(?P<level>warn|hack|info): (?P<message>.*)$")
+ERROR_RE = re.compile(r"^(?P<level>fatal|panic|Error|ERROR)\b:?\s*(?P<message>.*)$")
+EXIT_RE = re.compile(r"^Exiting @ tick (?P<tick>\d+) because (?P<reason>.*)$")
+NUMBER_RE = re.compile(r"0x[0-9a-fA-F]+|\d+")
+DONE_MARKER = "Done"
+# RSS samples kept per run: past this, every other sample is dropped and the
+# sampling interval doubles, so a week-long run still has a bounded summary.
+MAX_RSS_SAMPLES = 512
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Capture gem5 output into a gzip log, collapsing repeated warnings, "
+            "and write a JSON summary next to it. Either runs the command given "
+            "after -- or reads stdin."
+        )
+    )
+    parser.add_argument(
+        "--log",
+        required=True,
+        help="Compressed log path (.gz is appended if missing). The summary is <log>.summary.json.",
+    )
+    parser.add_argument(
+        "--keep",
+        type=int,
+        default=1,
+        help="Occurrences of each distinct warning written verbatim to the log (default: 1).",
+    )
+    parser.add_argument(
+        "--summary-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between summary refreshes while the run is live (default: 10).",
+    )
+    parser.add_argument(
+        "--rss-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between RSS samples of the command (default: 1; 0 disables sampling).",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not echo the output to stdout.",
+    )
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run (after --).")
+    args = parser.parse_args()
+    if args.command and args.command[0] == "--":
+        args.command = args.command[1:]
+    return args
+
+
+def now():
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def summary_path_for(log_path):
+    return Path(str(log_path) + ".summary.json")
+
+
+def read_summary(log_path):
+    path = summary_path_for(log_path)
+    if not path.is_file():
+        return None
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def tree_rss_kib(pid):
+    # VmRSS of pid and its descendants (a wrapper script may sit in front of gem5),
+    # None once the process is gone.
+    total = 0
+    pending = [pid]
+    found = False
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status", "r", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        found = True
+                        break
+            with open(f"/proc/{current}/task/{current}/children", "r", encoding="utf-8") as handle:
+                pending.extend(int(child) for child in handle.read().split())
+        except (OSError, ValueError):
+            continue
+    return total if found else None
+
+
+class RssSampler(threading.Thread):
+    # [[seconds since start, RSS KiB], ...] of the command's process tree.
+
+    def __init__(self, pid, interval):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.started = time.monotonic()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            rss = tree_rss_kib(self.pid)
+            if rss is not None:
+                self.samples.append([round(time.monotonic() - self.started, 2), rss])
+                if len(self.samples) > MAX_RSS_SAMPLES:
+                    self.samples = self.samples[::2]
+                    self.interval *= 2
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def usage_from_rusage(rusage, wall_seconds, sampler):
+    # Host cost of the command and the descendants it waited for. ru_inblock and
+    # ru_oublock count 512-byte blocks actually read from / written to storage.
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "user_seconds": round(rusage.ru_utime, 3),
+        "sys_seconds": round(rusage.ru_stime, 3),
+        "max_rss_kib": rusage.ru_maxrss,
+        "major_faults": rusage.ru_majflt,
+        "minor_faults": rusage.ru_minflt,
+        "voluntary_switches": rusage.ru_nvcsw,
+        "involuntary_switches": rusage.ru_nivcsw,
+        "read_bytes": rusage.ru_inblock * 512,
+        "write_bytes": rusage.ru_oublock * 512,
+        "rss_interval": sampler.interval if sampler else None,
+        "rss_samples": list(sampler.samples) if sampler else [],
+    }
+
+
+class LogCapture:
+    def __init__(self, log_path, keep=1, tail_lines=20):
+        self.log_path = Path(log_path)
+        self.keep = keep
+        self.handle = gzip.open(self.log_path, "wt", encoding="utf-8", compresslevel=6)
+        self.warnings = {}
+        self.errors = []
+        self.tail = deque(maxlen=tail_lines)
+        self.lines = 0
+        self.bytes_raw = 0
+        self.suppressed = 0
+        self.repeat_key = None
+        self.repeat_count = 0
+        self.exit_tick = None
+        self.exit_reason = None
+        self.done_line = None
+        self.started = now()
+        self.usage = None
+        self.sampler = None
+
+    def _flush_repeat(self):
+        if self.repeat_count:
+            self.handle.write(f"[logcapture] previous line repeated {self.repeat_count} more time(s)\n")
+        self.repeat_key = None
+        self.repeat_count = 0
+
+    def feed(self, line):
+        self.lines += 1
+        self.bytes_raw += len(line) + 1
+        self.tail.append(line)
+
+        warn = WARN_RE.match(line)
+        if warn and warn.group("level") != "info":
+            key = f"{warn.group('level')}: {NUMBER_RE.sub('#', warn.group('message'))}"
+            entry = self.warnings.get(key)
+            if entry is None:
+                entry = {
+                    "pattern": key,
+                    "example": line,
+                    "count": 0,
+                    "first_seen": now(),
+                    "first_line": self.lines,
+                }
+                self.warnings[key] = entry
+            entry["count"] += 1
+            entry["last_seen"] = now()
+            entry["last_line"] = self.lines
+            if entry["count"] > self.keep:
+                self.suppressed += 1
+                if self.repeat_key == key:
+                    self.repeat_count += 1
+                else:
+                    self._flush_repeat()
+                    self.repeat_key = key
+                    self.repeat_count = 1
+                return False
+        self._flush_repeat()
+
+        error = ERROR_RE.match(line)
+        if error:
+            self.errors.append({"line": self.lines, "text": line})
+        exit_match = EXIT_RE.match(line)
+        if exit_match:
+            self.exit_tick = int(exit_match.group("tick"))
+            self.exit_reason = exit_match.group("reason")
+        if line.strip() == DONE_MARKER:
+            self.done_line = self.lines
+        self.handle.write(line + "\n")
+        return True
+
+    def summary(self, returncode=None, running=False):
+        signal_name = None
+        if returncode is not None and returncode < 0:
+            signal_name = signal.Signals(-returncode).name
+        return {
+            "log": str(self.log_path),
+            "status": "running" if running else "finished",
+            "started": self.started,
+            "finished": None if running else now(),
+            "returncode": returncode,
+            "signal": signal_name,
+            "classification": None if running else self.classify(returncode, signal_name),
+            "done_marker": self.done_line is not None,
+            "done_line": self.done_line,
+            "exit_tick": self.exit_tick,
+            "exit_reason": self.exit_reason,
+            "lines": self.lines,
+            "bytes_raw": self.bytes_raw,
+            "suppressed_lines": self.suppressed,
+            "errors": self.errors[:50],
+            "warnings": sorted(self.warnings.values(), key=lambda entry: -entry["count"]),
+            "tail": list(self.tail),
+            # Filled when logcapture ran the command itself (not when reading a pipe).
+            "usage": self.live_usage() if running else self.usage,
+        }
+
+    def live_usage(self):
+        if self.sampler is None or not self.sampler.samples:
+            return None
+        return {"rss_kib": self.sampler.samples[-1][1], "rss_samples": list(self.sampler.samples)}
+
+    def classify(self, returncode, signal_name):
+        if returncode is None:
+            # Reading a pipe: only the log itself tells how the run ended.
+            return "ok" if self.exit_reason else "unknown"
+        if returncode == 0:
+            return "ok"
+        if signal_name and self.done_line is not None:
+            # Known gem5-stable failure: the benchmark finished but gem5 crashed on teardown.
+            return "crash_after_done"
+        if signal_name:
+            return "crash"
+        if self.errors:
+            return "fatal"
+        return "error"
+
+    def write_summary(self, returncode=None, running=False):
+        path = summary_path_for(self.log_path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.summary(returncode, running), handle, indent=2)
+        os.replace(tmp_path, path)
+
+    def close(self, returncode=None):
+        self._flush_repeat()
+        self.handle.close()
+        self.write_summary(returncode)
+
+
+def capture(stream, capture_log, echo, summary_interval):
+    last_summary = time.monotonic()
+    for raw in iter(stream.readline, b""):
+        line = raw.decode("utf-8", errors="replace").rstrip("\n")
+        # Only what reaches the log is echoed, so repeated warnings stay off the terminal too.
+        if capture_log.feed(line) and echo:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+        if time.monotonic() - last_summary >= summary_interval:
+            capture_log.write_summary(running=True)
+            last_summary = time.monotonic()
+
+
+def main():
+    args = parse_args()
+
+    log_path = Path(args.log if args.log.endswith(".gz") else args.log + ".gz")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    capture_log = LogCapture(log_path, keep=args.keep)
+
+    if not args.command:
+        capture(sys.stdin.buffer, capture_log, not args.quiet, args.summary_interval)
+        capture_log.close()
+        return 0
+
+    started = time.monotonic()
+    try:
+        process = subprocess.Popen(args.command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    except OSError as error:
+        capture_log.feed(f"Error: cannot start {args.command[0]}: {error}")
+        capture_log.close(127)
+        print(f"Error: cannot start {args.command[0]}: {error}", file=sys.stderr)
+        return 127
+
+    def forward(signum):
+        # os.kill, not Popen.send_signal/poll: those may reap the child, and os.wait4
+        # below needs it unreaped for its rusage. Until then the pid cannot be reused.
+        try:
+            os.kill(process.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def terminate(signum, frame):
+        # A cancelled run (run_campaign.py --timeout, kill) still gets a complete log
+        # and summary: gem5 is stopped and its remaining output drained.
+        forward(signum)
+
+    signal.signal(signal.SIGTERM, terminate)
+    if args.rss_interval > 0:
+        capture_log.sampler = RssSampler(process.pid, args.rss_interval)
+        capture_log.sampler.start()
+    while True:
+        try:
+            capture(process.stdout, capture_log, not args.quiet, args.summary_interval)
+            break
+        except KeyboardInterrupt:
+            # Keep reading until gem5 closes stdout: if nobody drains the pipe, gem5 blocks
+            # writing its exit messages and never exits, and wait4 below waits forever.
+            forward(signal.SIGINT)
+    # wait4 rather than wait: the child's rusage, even when it crashed and wrote no stats.
+    while True:
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+            break
+        except InterruptedError:
+            continue
+    returncode = process.returncode = os.waitstatus_to_exitcode(status)
+    if capture_log.sampler:
+        capture_log.sampler.stop()
+    capture_log.usage = usage_from_rusage(rusage, time.monotonic() - started, capture_log.sampler)
+    capture_log.close(returncode)
+
+    # Same convention as the shell: 128+N for a child killed by signal N.
+    return 128 - returncode if returncode < 0 else returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
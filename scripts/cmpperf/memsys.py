@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import re
+import sys
+from pathlib import Path
+
+from campaign import find_runs
+from gem5stats import read_stats
+from metrics import base_metrics
+
+
+# DDR3_1600_x64 as configured by se.py: 1600 MT/s x 8 bytes = 12800 MiB/s (gem5 peakBW).
+DEFAULT_PEAK_BW_MIB = 12800.0
+DEFAULT_L2_BYTES = 2 * 1024 * 1024
+MIB = 1024 * 1024
+CORE_BYTES_RE = re.compile(r"^system\.mem_ctrls\.bytes_read::(?P<cpu>(?:switch_)?cpus?\d*)\.(?P<kind>inst|data)$")
+
+FIELDS = [
+    "campaign",
+    "size",
+    "width",
+    "threads",
+    "cycles",
+    "sim_ops",
+    "dram_bytes",
+    "dram_read_bytes",
+    "dram_write_bytes",
+    "achieved_bw_mib",
+    "peak_bw_mib",
+    "bw_fraction",
+    "bus_util",
+    "row_hit_rate",
+    "bytes_per_activate",
+    "avg_mem_lat_ns",
+    "top_core",
+    "top_core_share",
+    "arith_intensity",
+    "perf_gops",
+    "compute_roof_gops",
+    "memory_roof_gops",
+    "ridge_intensity",
+    "bound",
+    "roof_fraction",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "DRAM bandwidth, row-buffer locality and roofline placement of every run "
+            "(arithmetic intensity = sim_ops / DRAM bytes)."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--campaign",
+        action="append",
+        default=None,
+        help="Only include these campaigns (repeatable).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images/A15",
+        help="Directory where memsys.csv and memsys_cores.csv are written (default: results/images/A15).",
+    )
+    parser.add_argument(
+        "--peak-bw",
+        type=float,
+        default=None,
+        help=f"Peak DRAM bandwidth in MiB/s (default: the run's peakBW stat, else {DEFAULT_PEAK_BW_MIB:.0f}).",
+    )
+    parser.add_argument(
+        "--project-size",
+        type=int,
+        action="append",
+        default=None,
+        help="Also project the roofline position of a larger SIZE from the measured one (repeatable).",
+    )
+    parser.add_argument(
+        "--elem-bytes",
+        type=int,
+        default=8,
+        help="Bytes per matrix element, used for the working-set check of projections (default: 8).",
+    )
+    parser.add_argument("--plot", action="store_true", help="Also draw roofline.png.")
+    return parser.parse_args()
+
+
+def core_traffic(stats):
+    # {cpu: bytes read from DRAM} (inst + data) from bytes_read::cpuN.{inst,data}.
+    traffic = {}
+    for key, value in stats.items():
+        match = CORE_BYTES_RE.match(key)
+        if match:
+            traffic[match.group("cpu")] = traffic.get(match.group("cpu"), 0) + value
+    return traffic
+
+
+def l2_bytes(outdir):
+    # size= of the [system.l2] section of config.ini; se.py's default when absent.
+    ini_path = Path(outdir) / "config.ini"
+    if not ini_path.is_file():
+        return DEFAULT_L2_BYTES
+    section = None
+    for line in ini_path.read_text(encoding="utf-8", errors="replace").splitlines():
+        if line.startswith("["):
+            section = line.strip()
+        elif section == "[system.l2]" and line.startswith("size="):
+            return int(line.split("=", 1)[1])
+    return DEFAULT_L2_BYTES
+
+
+def clock_hz(stats):
+    period = stats.get("system.cpu_clk_domain.clock")
+    if not period:
+        return float("nan")
+    return stats.get("sim_freq", 10**12) / period
+
+
+def memsys_metrics(stats, width, threads, peak_bw_mib=None):
+    metrics = base_metrics(stats)
+    if metrics is None:
+        return None
+    sim_seconds = metrics["sim_seconds"] or float("nan")
+    read_bytes = stats.get("system.mem_ctrls.bytesReadDRAM", 0)
+    write_bytes = stats.get("system.mem_ctrls.bytesWritten", 0)
+    dram_bytes = read_bytes + write_bytes
+    peak_bw = peak_bw_mib or stats.get("system.mem_ctrls.peakBW") or DEFAULT_PEAK_BW_MIB
+    achieved_bw = dram_bytes / sim_seconds / MIB
+
+    traffic = core_traffic(stats)
+    traffic_total = sum(traffic.values())
+    top_core = max(traffic, key=traffic.get) if traffic_total else ""
+
+    # Roofline in ops/s: every busy core can retire at most `width` ops per cycle
+    # (1 for the in-order A7 runs, which have no width).
+    hz = clock_hz(stats)
+    busy_cores = min(threads, metrics["cores"])
+    compute_roof = busy_cores * (width or 1) * hz
+    intensity = metrics["sim_ops"] / dram_bytes if dram_bytes else float("inf")
+    memory_roof = intensity * peak_bw * MIB
+    ridge = compute_roof / (peak_bw * MIB)
+    perf = metrics["sim_ops"] / sim_seconds
+    attainable = min(compute_roof, memory_roof)
+
+    metrics.update(
+        {
+            "dram_bytes": dram_bytes,
+            "dram_read_bytes": read_bytes,
+            "dram_write_bytes": write_bytes,
+            "achieved_bw_mib": achieved_bw,
+            "peak_bw_mib": peak_bw,
+            "bw_fraction": achieved_bw / peak_bw,
+            "bus_util": stats.get("system.mem_ctrls.busUtil", float("nan")) / 100.0,
+            "row_hit_rate": stats.get("system.mem_ctrls.pageHitRate", float("nan")) / 100.0,
+            "bytes_per_activate": stats.get("system.mem_ctrls.bytesPerActivate::mean", float("nan")),
+            "avg_mem_lat_ns": stats.get("system.mem_ctrls.avgMemAccLat", float("nan")) / 1000.0,
+            "core_traffic": traffic,
+            "top_core": top_core,
+            "top_core_share": traffic[top_core] / traffic_total if traffic_total else float("nan"),
+            "arith_intensity": intensity,
+            "perf_gops": perf / 1e9,
+            "compute_roof_gops": compute_roof / 1e9,
+            "memory_roof_gops": memory_roof / 1e9,
+            "ridge_intensity": ridge,
+            # Atomic-mode runs (A7) never reach the DRAM model: nothing to place.
+            "bound": ("memory" if intensity < ridge else "compute") if dram_bytes else "no-dram",
+            "roof_fraction": perf / attainable if attainable else float("nan"),
+        }
+    )
+    return metrics
+
+
+def project(row, size, elem_bytes, l2_bytes):
+    # Unblocked matrix product: ops grow as N^3 and compulsory DRAM traffic as N^2
+    # while the three N x N matrices fit in L2, so intensity grows linearly with N.
+    # Past L2 the re-reads of B dominate and the linear estimate is only an upper bound.
+    scale = size / row["size"]
+    intensity = row["arith_intensity"] * scale
+    working_set = 3 * size * size * elem_bytes
+    bound = "memory" if intensity < row["ridge_intensity"] else "compute"
+    return {
+        "size": size,
+        "arith_intensity": intensity,
+        "working_set_mib": working_set / MIB,
+        "fits_l2": working_set <= l2_bytes,
+        "bound": bound if working_set <= l2_bytes else f"{bound}?",
+    }
+
+
+def plot_roofline(rows, png_path):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    placed = [row for row in rows if row["dram_bytes"]]
+    peak_bw = max(row["peak_bw_mib"] for row in placed) * MIB
+    intensities = [row["arith_intensity"] for row in placed]
+    x = [min(intensities) / 4, max(intensities) * 4]
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for roof in sorted({row["compute_roof_gops"] for row in placed}):
+        ridge = roof * 1e9 / peak_bw
+        ax.plot([x[0], ridge, x[1]], [x[0] * peak_bw / 1e9, roof, roof], color="0.7", linewidth=1)
+    for width in sorted({row["width"] or 0 for row in placed}):
+        points = [row for row in placed if (row["width"] or 0) == width]
+        ax.scatter(
+            [row["arith_intensity"] for row in points],
+            [row["perf_gops"] for row in points],
+            label=f"w{width}" if width else "in-order",
+        )
+        for row in points:
+            ax.annotate(f"t{row['threads']}", (row["arith_intensity"], row["perf_gops"]), fontsize=7)
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("Arithmetic intensity (ops / DRAM byte)")
+    ax.set_ylabel("Performance (Gops/s)")
+    ax.set_title("Roofline - DDR3_1600_x64")
+    ax.grid(True, which="both", linestyle="--", alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(png_path, dpi=150)
+    plt.close(fig)
+
+
+def main():
+    args = parse_args()
+
+    runs = [
+        run
+        for run in find_runs(args.results_root)
+        if not args.campaign or run["campaign"] in args.campaign
+    ]
+    if not runs:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    rows = []
+    for run in runs:
+        stats = read_stats(run["stats_path"])
+        metrics = memsys_metrics(stats, run["width"], run["threads"], args.peak_bw)
+        if metrics is None:
+            print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+            continue
+        metrics.update({key: run[key] for key in ("name", "campaign", "size", "width", "threads", "outdir")})
+        rows.append(metrics)
+    rows.sort(key=lambda row: (row["campaign"], row["size"] or 0, row["width"] or 0, row["threads"]))
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "memsys.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    cores_path = images_dir / "memsys_cores.csv"
+    with cores_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["run", "cpu", "dram_bytes", "share"])
+        for row in rows:
+            total = sum(row["core_traffic"].values())
+            for cpu, value in sorted(row["core_traffic"].items()):
+                writer.writerow([row["name"], cpu, value, value / total if total else ""])
+    print(f"Wrote memory-system CSV: {csv_path}")
+    print(f"Wrote per-core DRAM traffic CSV: {cores_path}")
+
+    print(
+        f"{'run':<26} {'MiB/s':>8} {'%peak':>6} {'rowhit':>6} {'B/act':>6} "
+        f"{'ops/B':>7} {'Gops/s':>7} {'roof':>6} {'top core':>14}  bound"
+    )
+    for row in rows:
+        if not row["dram_bytes"]:
+            print(f"{row['name']:<26} {'-':>8} {'-':>6} {'-':>6} {'-':>6} {'-':>7} {row['perf_gops']:7.3f}  no DRAM traffic (atomic CPU)")
+            continue
+        print(
+            f"{row['name']:<26} {row['achieved_bw_mib']:8.1f} {row['bw_fraction']:6.1%} "
+            f"{row['row_hit_rate']:6.1%} {row['bytes_per_activate']:6.1f} {row['arith_intensity']:7.1f} "
+            f"{row['perf_gops']:7.3f} {row['roof_fraction']:6.1%} "
+            f"{row['top_core']:>9} {row['top_core_share']:4.0%}  {row['bound']}"
+        )
+
+    if args.project_size:
+        print("\nProjection (intensity scales with SIZE while the matrices fit in L2; '?' = beyond L2):")
+        # t=1 and the widest thread count of each width bracket the whole sweep.
+        max_threads = {}
+        for row in rows:
+            key = (row["campaign"], row["width"])
+            max_threads[key] = max(max_threads.get(key, 0), row["threads"])
+        for row in rows:
+            if not row["dram_bytes"] or not row["size"]:
+                continue
+            if row["threads"] not in (1, max_threads[(row["campaign"], row["width"])]):
+                continue
+            for size in args.project_size:
+                projected = project(row, size, args.elem_bytes, l2_bytes(row["outdir"]))
+                print(
+                    f"  {row['name']} -> s{size}: {projected['arith_intensity']:.1f} ops/B "
+                    f"(ridge {row['ridge_intensity']:.2f}), working set {projected['working_set_mib']:.2f} MiB: "
+                    f"{projected['bound']}"
+                )
+
+    if args.plot and any(row["dram_bytes"] for row in rows):
+        png_path = images_dir / "roofline.png"
+        plot_roofline(rows, png_path)
+        print(f"Wrote roofline plot: {png_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import sys
+
+from campaign import find_runs
+from gem5stats import core_count, max_cycles, per_cpu, read_stats
+
+
+def base_metrics(stats):
+    # Metrics shared by every analysis; cycles is the critical path (max over cores)
+    # as in extract_q4_cycles.py / plot_q9_cycles.py.
+    sim_insts = stats.get("sim_insts")
+    cycles = max_cycles(stats)
+    if not sim_insts or not cycles:
+        return None
+    committed = per_cpu(stats, "committedInsts")
+    cycles_per_cpu = per_cpu(stats, "numCycles")
+    ipc_per_cpu = [
+        committed[cpu] / cycles_per_cpu[cpu]
+        for cpu in committed
+        if cycles_per_cpu.get(cpu)
+    ]
+    return {
+        "cores": core_count(stats),
+        "sim_insts": sim_insts,
+        "sim_ops": stats.get("sim_ops", sim_insts),
+        "sim_ticks": stats.get("sim_ticks"),
+        "sim_seconds": stats.get("sim_seconds"),
+        "cycles": cycles,
+        "ipc": sim_insts / cycles,
+        "ipc_max": max(ipc_per_cpu) if ipc_per_cpu else float("nan"),
+        "host_seconds": stats.get("host_seconds", float("nan")),
+        "host_inst_rate": stats.get("host_inst_rate", float("nan")),
+        "host_mem_usage": stats.get("host_mem_usage", float("nan")),
+    }
+
+
+def group_key(row):
+    # Runs that share a t=1 baseline: same campaign, core type, size and width or mix.
+    return (row.get("campaign"), row.get("size"), row.get("width"), row.get("mix"))
+
+
+def baseline_rows(rows):
+    # The t=1 row each row is compared with. Single-point variant campaigns
+    # (A15_w4_t8_active) borrow the t=1 run of another campaign with the same width;
+    # their size is unknown (None) and matches any. A mix only has a baseline if a
+    # t=1 run of that same mix exists: never another core's.
+    baselines = {group_key(row): row for row in rows if row["threads"] == 1}
+    shared = {}
+    for (_, size, width, mix), baseline in sorted(baselines.items(), key=lambda item: str(item[0])):
+        shared.setdefault((size, width, mix), baseline)
+        shared.setdefault((None, width, mix), baseline)
+    return [
+        baselines.get(group_key(row)) or shared.get((row.get("size"), row.get("width"), row.get("mix")))
+        for row in rows
+    ]
+
+
+def add_speedup(rows):
+    # Adds cycles_t1, speedup and efficiency (speedup / threads) in place, and the
+    # useful-work IPC: the t=1 instruction count over the run's cycles. Instructions
+    # beyond that work (sync_share) are OpenMP overhead, mostly spin-waiting under
+    # OMP_WAIT_POLICY=ACTIVE, and inflate ipc (see spin.py for the per-core split).
+    for row, baseline in zip(rows, baseline_rows(rows)):
+        row["cycles_t1"] = baseline["cycles"] if baseline else None
+        row["speedup"] = baseline["cycles"] / row["cycles"] if baseline else float("nan")
+        row["efficiency"] = row["speedup"] / row["threads"] if baseline else float("nan")
+        work = baseline.get("sim_insts") if baseline else None
+        row["useful_ipc"] = work / row["cycles"] if work else float("nan")
+        row["sync_share"] = max(0.0, 1 - work / row["sim_insts"]) if work and row.get("sim_insts") else float("nan")
+    return rows
+
+
+def core_type(run):
+    # A7 runs have no O3 width, A15 runs do; --cpu-mix runs combine several types.
+    if run.get("mix"):
+        return "mix"
+    return "A7" if run.get("width") is None else "A15"
+
+
+def run_table(results_root, campaigns=None):
+    # base_metrics + speedup of every run under results_root, one dict per run.
+    rows = []
+    for run in find_runs(results_root):
+        metrics = base_metrics(read_stats(run["stats_path"]))
+        if metrics is None:
+            print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+            continue
+        metrics.update({key: run[key] for key in ("name", "campaign", "size", "width", "mix", "threads")})
+        metrics["core_type"] = core_type(run)
+        rows.append(metrics)
+    rows.sort(key=lambda row: (row["campaign"], row["size"] or 0, row["mix"] or "", row["width"] or 0, row["threads"]))
+    # Filtered after add_speedup so variants keep the t=1 baseline of their parent campaign.
+    add_speedup(rows)
+    return [row for row in rows if not campaigns or row["campaign"] in campaigns]
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+from campaign import read_state_rows, run_key
+from gem5stats import read_stats
+from logcapture import read_summary
+
+
+HOST_KEYS = ("sim_insts", "host_inst_rate", "host_seconds")
+OUTDIR_ARG_RE = re.compile(r"^--outdir=(?P<outdir>.+)$")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Live progress view of a gem5 campaign (state.tsv, running gem5 processes, log tails)."
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results/A15",
+        help="Root directory of the campaign being monitored (default: results/A15).",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help="Path to state.tsv (default: <results-root>/state.tsv).",
+    )
+    parser.add_argument(
+        "--history-root",
+        action="append",
+        default=None,
+        help="Campaign root used for host_inst_rate/sim_insts history (repeatable, default: results/A15).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Refresh interval in seconds (default: 5).",
+    )
+    parser.add_argument(
+        "--tail",
+        type=int,
+        default=2,
+        help="Log lines shown per running job (default: 2).",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Print one snapshot and exit.",
+    )
+    return parser.parse_args()
+
+
+class LogTail:
+    # Keeps a byte offset per log so each refresh only reads what gem5 appended.
+
+    def __init__(self, lines):
+        self.offsets = {}
+        self.tails = {}
+        self.lines = lines
+
+    def read(self, log_path):
+        log_path = str(log_path)
+        if log_path.endswith(".gz"):
+            # Compressed captures publish their tail in the periodic JSON summary.
+            try:
+                summary = read_summary(log_path)
+            except (OSError, ValueError):
+                summary = None
+            return summary["tail"][-self.lines:] if summary and self.lines else []
+        tail = self.tails.setdefault(log_path, collections.deque(maxlen=self.lines))
+        try:
+            size = os.path.getsize(log_path)
+        except OSError:
+            return tail
+        offset = self.offsets.get(log_path, 0)
+        if size < offset:
+            # Log was truncated by a retry of the same job.
+            offset = 0
+            tail.clear()
+        if size > offset:
+            with open(log_path, "rb") as handle:
+                handle.seek(offset)
+                chunk = handle.read(size - offset)
+            # Only consume complete lines; a partial one is re-read next time.
+            end = chunk.rfind(b"\n") + 1
+            for line in chunk[:end].decode("utf-8", errors="replace").splitlines():
+                if line.strip():
+                    tail.append(line.rstrip())
+            self.offsets[log_path] = offset + end
+        return tail
+
+
+class History:
+    # host_inst_rate / sim_insts of finished runs, cached per stats.txt mtime.
+
+    def __init__(self, roots):
+        self.roots = [Path(root) for root in roots]
+        self.cache = {}
+
+    def runs(self):
+        history = {}
+        for root in self.roots:
+            state_file = root / "state.tsv"
+            if not state_file.is_file():
+                continue
+            for row in read_state_rows(state_file):
+                if not row["status"].startswith("DONE"):
+                    continue
+                stats_path = Path(row["outdir"]) / "stats.txt"
+                try:
+                    mtime = stats_path.stat().st_mtime
+                except OSError:
+                    continue
+                cached = self.cache.get(stats_path)
+                if cached is None or cached[0] != mtime:
+                    stats = read_stats(stats_path, keys=HOST_KEYS)
+                    if not all(key in stats for key in HOST_KEYS):
+                        continue
+                    cached = (mtime, stats)
+                    self.cache[stats_path] = cached
+                history[run_key(row)] = cached[1]
+        return history
+
+    def expected_seconds(self, key, history):
+        if key in history:
+            return history[key]["host_seconds"]
+        if not history:
+            return None
+        size, width, threads, mix = key
+
+        def distance(other):
+            o_size, o_width, o_threads, o_mix = other
+            return (
+                o_mix != mix,
+                abs((o_width or 0) - (width or 0)),
+                abs((o_threads.bit_length()) - threads.bit_length()),
+                abs(o_size - size),
+            )
+
+        # Nearest configuration: same mix and width first, then closest thread count.
+        nearest = min(history, key=distance)
+        ref = history[nearest]
+        # test_omp does size^3 multiply-adds; scale the instruction count accordingly.
+        sim_insts = ref["sim_insts"] * (size / nearest[0]) ** 3
+        # More simulated cores lower the host rate roughly in proportion.
+        rate = ref["host_inst_rate"] * nearest[2] / threads
+        return sim_insts / rate if rate else None
+
+
+def running_processes():
+    running = {}
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return running
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    try:
+        uptime = float((proc / "uptime").read_text().split()[0])
+    except (OSError, ValueError):
+        return running
+    for pid_dir in proc.iterdir():
+        if not pid_dir.name.isdigit():
+            continue
+        try:
+            argv = (pid_dir / "cmdline").read_bytes().split(b"\0")
+            stat = (pid_dir / "stat").read_text()
+        except OSError:
+            continue
+        argv = [arg.decode(errors="replace") for arg in argv]
+        if "gem5" not in os.path.basename(argv[0]):
+            continue
+        outdir = None
+        for index, arg in enumerate(argv):
+            match = OUTDIR_ARG_RE.match(arg)
+            if match:
+                outdir = match.group("outdir")
+            elif arg == "-d" and index + 1 < len(argv):
+                outdir = argv[index + 1]
+        if outdir is None:
+            continue
+        # Field 22 of /proc/<pid>/stat is the start time in clock ticks after boot.
+        start_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+        elapsed = uptime - start_ticks / clock_ticks
+        running[os.path.normpath(outdir)] = {"pid": int(pid_dir.name), "elapsed": elapsed}
+    return running
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(max(seconds, 0))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours:d}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes:d}m{seconds:02d}s"
+
+
+def summary_elapsed(row):
+    # Seconds since logcapture started the job, from its summary next to the log.
+    log_path = row.get("log") or row.get("logfile")
+    if not log_path:
+        return None
+    try:
+        summary = read_summary(log_path)
+    except (OSError, ValueError):
+        return None
+    if not summary or not summary.get("started"):
+        return None
+    try:
+        started = time.mktime(time.strptime(summary["started"], "%Y-%m-%dT%H:%M:%S"))
+    except ValueError:
+        return None
+    return time.time() - started
+
+
+def snapshot(state_file, history, log_tail):
+    rows = read_state_rows(state_file)
+    runs = history.runs()
+    processes = running_processes()
+
+    counts = collections.Counter()
+    lines = []
+    remaining = 0.0
+    unknown = 0
+
+    for row in rows:
+        key = run_key(row)
+        outdir = os.path.normpath(row["outdir"])
+        expected = history.expected_seconds(key, runs)
+        process = processes.get(outdir)
+
+        owner = None
+        if process is None and row["status"].startswith("RUNNING"):
+            # Claimed by another host or worker (RUNNING:<host>-<pid>): no local gem5 process,
+            # so the elapsed time comes from the logcapture summary when there is one.
+            owner = row["status"].partition(":")[2] or "?"
+
+        if process is not None or owner is not None:
+            counts["RUNNING"] += 1
+            elapsed = process["elapsed"] if process is not None else summary_elapsed(row)
+            if expected is None:
+                unknown += 1
+            else:
+                remaining += max(expected - (elapsed or 0.0), 0.0)
+            # Host time spent so far over the host time expected from the history.
+            if expected and elapsed is not None:
+                progress_text = f"elapsed/expected={min(elapsed / expected, 0.99) * 100:5.1f}%"
+            else:
+                progress_text = "elapsed/expected=    ?"
+            where = f"pid={process['pid']:<7}" if process is not None else f"owner={owner}"
+            lines.append(
+                f"  RUN  s{key[0]} {f'm{key[3]}' if key[3] else f'w{key[1]}'} t{key[2]:<3} {where} "
+                f"elapsed={format_seconds(elapsed):>9} expected={format_seconds(expected):>9} {progress_text}"
+            )
+            for line in log_tail.read(row.get("log") or row.get("logfile") or ""):
+                lines.append(f"       | {line[:110]}")
+        elif row["status"].startswith("DONE"):
+            counts["DONE"] += 1
+        elif row["status"] == "FAILED":
+            counts["FAILED"] += 1
+        else:
+            counts["PENDING"] += 1
+            if expected is None:
+                unknown += 1
+            else:
+                remaining += expected
+
+    workers = max(counts["RUNNING"], 1)
+    header = [
+        f"{state_file}  {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"jobs={len(rows)} done={counts['DONE']} running={counts['RUNNING']} "
+        f"pending={counts['PENDING']} failed={counts['FAILED']}",
+        f"ETA ~ {format_seconds(remaining / workers)} with {workers} worker(s)"
+        + (f" ({unknown} job(s) without history)" if unknown else ""),
+        "",
+    ]
+    return "\n".join(header + lines)
+
+
+def main():
+    args = parse_args()
+
+    state_file = Path(args.state_file) if args.state_file else Path(args.results_root) / "state.tsv"
+    if not state_file.is_file():
+        print(f"Error: state file not found: {state_file}", file=sys.stderr)
+        return 1
+
+    history = History(args.history_root or ["results/A15"])
+    log_tail = LogTail(args.tail)
+
+    try:
+        while True:
+            text = snapshot(state_file, history, log_tail)
+            if args.once:
+                print(text)
+                return 0
+            # Clear screen and home the cursor, like watch(1).
+            sys.stdout.write("\033[2J\033[H" + text + "\n")
+            sys.stdout.flush()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from campaign import find_runs
+from energy import DEFAULT_PARAMS, energy_metrics, load_params
+from gem5stats import read_stats
+
+
+DEFAULT_OBJECTIVES = ["cycles", "area_mm2", "energy_uj", "host_seconds"]
+# Rows compared against the whole table at once; bounds memory to BLOCK x N x objectives booleans.
+BLOCK = 256
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Multi-objective Pareto fronts over every campaign (A7, A15 and variants): "
+            "cycles, area, energy and host cost, all minimized."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--objective",
+        action="append",
+        default=None,
+        help=f"Column to minimize (repeatable; default: {', '.join(DEFAULT_OBJECTIVES)}).",
+    )
+    parser.add_argument(
+        "--params",
+        default=str(DEFAULT_PARAMS),
+        help="Energy/area parameters, as for energy.py.",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images",
+        help="Directory where pareto.csv (and pareto_edges.csv) are written (default: results/images).",
+    )
+    parser.add_argument(
+        "--edges",
+        action="store_true",
+        help="Also write every dominance pair to pareto_edges.csv (can be large).",
+    )
+    return parser.parse_args()
+
+
+def dominance_block(values, start, stop):
+    # dominates[i, j]: row start+i is <= row j on every objective and < on one.
+    block = values[start:stop, None, :]
+    not_worse = (block <= values[None, :, :]).all(axis=2)
+    better = (block < values[None, :, :]).any(axis=2)
+    return not_worse & better
+
+
+def non_dominated_sort(values):
+    # Fast non-dominated sort (Deb et al.) with the pairwise comparisons done by
+    # NumPy in row blocks. Returns the front index of every row (0 = Pareto front)
+    # and the number of rows dominating it.
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    dominated_count = np.zeros(count, dtype=np.int64)
+    dominates = []
+    for start in range(0, count, BLOCK):
+        stop = min(start + BLOCK, count)
+        block = dominance_block(values, start, stop)
+        dominated_count += block.sum(axis=0)
+        dominates.extend(np.flatnonzero(row) for row in block)
+
+    ranks = np.full(count, -1, dtype=np.int64)
+    remaining = dominated_count.copy()
+    current = np.flatnonzero(remaining == 0)
+    rank = 0
+    while len(current):
+        ranks[current] = rank
+        following = []
+        for i in current:
+            targets = dominates[i]
+            remaining[targets] -= 1
+            following.append(targets[remaining[targets] == 0])
+        current = np.unique(np.concatenate(following)) if following else np.array([], dtype=np.int64)
+        rank += 1
+    return ranks, dominated_count, dominates
+
+
+def knee_point(values, front):
+    # Front member closest to the ideal point once each objective is scaled to [0, 1].
+    points = values[front]
+    lo = points.min(axis=0)
+    span = points.max(axis=0) - lo
+    span[span == 0] = 1.0
+    distance = np.linalg.norm((points - lo) / span, axis=1)
+    return front[int(np.argmin(distance))]
+
+
+def load_table(results_root, params):
+    rows = []
+    for run in find_runs(results_root):
+        metrics = energy_metrics(read_stats(run["stats_path"]), run["width"], run["outdir"], params, run["mix"])
+        if metrics is None:
+            print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+            continue
+        metrics.update({key: run[key] for key in ("name", "campaign", "size", "width", "threads")})
+        rows.append(metrics)
+    return rows
+
+
+def main():
+    args = parse_args()
+    objectives = args.objective or DEFAULT_OBJECTIVES
+
+    try:
+        params = load_params(args.params)
+        rows = load_table(args.results_root, params)
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    if not rows:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+    missing = [name for name in objectives if name not in rows[0]]
+    if missing:
+        print(f"Error: unknown objective(s): {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    values = np.array([[row[name] for name in objectives] for row in rows], dtype=np.float64)
+    # A run without a value (nan) can never be on the front.
+    values[np.isnan(values)] = np.inf
+
+    started = time.perf_counter()
+    ranks, dominated_count, dominates = non_dominated_sort(values)
+    elapsed = time.perf_counter() - started
+
+    front = np.flatnonzero(ranks == 0)
+    dominated_by = {i: [] for i in range(len(rows))}
+    for i in front:
+        for j in dominates[i]:
+            dominated_by[j].append(rows[i]["name"])
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "pareto.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["run", "campaign", "size", "width", "threads", "rank", "dominated_by_count", "dominates_count"] + objectives + ["dominated_by_front"])
+        order = np.lexsort((values[:, 0], ranks))
+        for i in order:
+            row = rows[i]
+            writer.writerow(
+                [row["name"], row["campaign"], row["size"], row["width"], row["threads"], ranks[i], dominated_count[i], len(dominates[i])]
+                + [row[name] for name in objectives]
+                + [";".join(dominated_by[i])]
+            )
+    print(f"Wrote Pareto CSV: {csv_path}")
+    if args.edges:
+        edges_path = images_dir / "pareto_edges.csv"
+        with edges_path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["dominator", "dominated"])
+            for i, targets in enumerate(dominates):
+                for j in targets:
+                    writer.writerow([rows[i]["name"], rows[j]["name"]])
+        print(f"Wrote dominance pairs: {edges_path}")
+
+    print(
+        f"{len(rows)} configurations, {ranks.max() + 1} fronts, "
+        f"{len(front)} on the Pareto front ({elapsed * 1000:.1f} ms)"
+    )
+    print(f"{'run':<26} " + " ".join(f"{name:>13}" for name in objectives) + "  dominates")
+    for i in front[np.argsort(values[front, 0])]:
+        print(f"{rows[i]['name']:<26} " + " ".join(f"{rows[i][name]:13.6g}" for name in objectives) + f"  {len(dominates[i])}")
+    knee = knee_point(values, front)
+    print(f"\nRecommended (closest to the ideal point of the front): {rows[knee]['name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
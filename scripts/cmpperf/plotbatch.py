@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from metrics import run_table
+
+
+DEFAULT_SPECS = Path(__file__).with_name("figure_specs.json")
+SPEC_KEYS = {
+    "out", "where", "kind", "x", "y", "hue", "facet", "dpi", "marker",
+    "logx", "logy", "ideal", "title", "xlabel", "ylabel",
+}
+KINDS = ("line", "bar")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Render every campaign figure in one batch from declarative specs "
+            "(figure_specs.json) over the in-memory metrics table."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--cube",
+        default=None,
+        help="Read the table from a metrics cube (cube.py refresh) instead of parsing stats.txt.",
+    )
+    parser.add_argument(
+        "--specs",
+        default=str(DEFAULT_SPECS),
+        help="JSON figure specs (default: figure_specs.json next to this script).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images/batch",
+        help="Directory the spec 'out' paths are relative to (default: results/images/batch).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count).",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=None,
+        help="Only render figures whose 'out' contains this text (repeatable).",
+    )
+    return parser.parse_args()
+
+
+def load_specs(path):
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    defaults = document.get("defaults", {})
+    specs = []
+    for index, figure in enumerate(document.get("figures", [])):
+        spec = dict(defaults, **figure)
+        unknown = set(spec) - SPEC_KEYS
+        if unknown:
+            raise ValueError(f"{path}: figure {index}: unknown key(s) {', '.join(sorted(unknown))}")
+        for key in ("out", "x", "y"):
+            if key not in spec:
+                raise ValueError(f"{path}: figure {index}: missing '{key}'")
+        if spec["kind"] not in KINDS:
+            raise ValueError(f"{path}: figure {index}: kind must be one of {', '.join(KINDS)}")
+        specs.append(spec)
+    return specs
+
+
+def select_rows(rows, spec):
+    # Only the columns the figure uses are sent to the worker.
+    columns = [spec["x"], spec["y"]] + [spec[key] for key in ("hue", "facet") if spec.get(key)]
+    missing = [column for column in columns if rows and column not in rows[0]]
+    if missing:
+        raise KeyError(f"{spec['out']}: unknown column(s) {', '.join(missing)}")
+    where = spec.get("where") or {}
+    return [
+        {column: row[column] for column in columns}
+        for row in rows
+        if all(row.get(column) in accepted for column, accepted in where.items())
+    ]
+
+
+def group(rows, column):
+    # {value: rows}, in sorted value order (None last); a single None group without a column.
+    if not column:
+        return {None: rows}
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[column], []).append(row)
+    return dict(sorted(groups.items(), key=lambda item: (item[0] is None, item[0] if item[0] is not None else 0)))
+
+
+def init_worker():
+    # One matplotlib setup per worker, reused by every figure it renders.
+    import matplotlib
+
+    matplotlib.use("Agg")
+    matplotlib.rcParams.update({"axes.grid": True, "grid.alpha": 0.5, "figure.max_open_warning": 0})
+
+
+def draw(axis, rows, spec):
+    x_key, y_key = spec["x"], spec["y"]
+    series = group(rows, spec.get("hue"))
+    bar_width = 0.8 / len(series)
+    categories = sorted({row[x_key] for row in rows})
+    for number, (value, members) in enumerate(series.items()):
+        members = sorted(members, key=lambda row: row[x_key])
+        xs = [row[x_key] for row in members]
+        ys = [row[y_key] for row in members]
+        label = f"{spec['hue']}={value}" if spec.get("hue") else None
+        if spec["kind"] == "bar":
+            positions = [categories.index(x) + (number - (len(series) - 1) / 2) * bar_width for x in xs]
+            axis.bar(positions, ys, width=bar_width, label=label)
+        else:
+            axis.plot(xs, ys, marker=spec["marker"], label=label)
+    if spec["kind"] == "bar":
+        axis.set_xticks(range(len(categories)))
+        axis.set_xticklabels([str(category) for category in categories])
+    if spec["ideal"]:
+        axis.plot(categories, categories, linestyle="--", color="gray", label="Ideal (S=T)")
+    if spec["logx"] and spec["kind"] == "line":
+        axis.set_xscale("log", base=2)
+    if spec["logy"]:
+        axis.set_yscale("log")
+    axis.set_xlabel(spec.get("xlabel", x_key))
+    if axis.get_legend_handles_labels()[0]:
+        axis.legend(fontsize="small")
+
+
+def render(spec, rows, out_path):
+    import matplotlib.pyplot as plt
+
+    started = time.perf_counter()
+    facets = group(rows, spec.get("facet"))
+    figure, axes = plt.subplots(
+        1,
+        len(facets),
+        figsize=(6.4 if len(facets) == 1 else 4.2 * len(facets), 4.8),
+        sharey=True,
+        squeeze=False,
+    )
+    for axis, (value, members) in zip(axes[0], facets.items()):
+        draw(axis, members, spec)
+        if spec.get("facet"):
+            axis.set_title(f"{spec['facet']}={value}")
+    axes[0][0].set_ylabel(spec.get("ylabel", spec["y"]))
+    if spec.get("title"):
+        figure.suptitle(spec["title"])
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    figure.savefig(out_path, dpi=spec["dpi"], bbox_inches="tight")
+    plt.close(figure)
+    return time.perf_counter() - started
+
+
+def main():
+    args = parse_args()
+
+    started = time.perf_counter()
+    try:
+        specs = load_specs(args.specs)
+    except (OSError, ValueError) as exc:
+        print(f"Error: cannot load figure specs: {exc}", file=sys.stderr)
+        return 1
+    if args.only:
+        specs = [spec for spec in specs if any(text in spec["out"] for text in args.only)]
+    if args.cube:
+        from cube import MetricsCube
+
+        try:
+            rows = MetricsCube(args.cube).rows()
+        except OSError as exc:
+            print(f"Error: cannot open cube: {exc}", file=sys.stderr)
+            return 1
+    else:
+        rows = run_table(args.results_root)
+    if not rows:
+        print(f"Error: no run found under {args.cube or args.results_root}", file=sys.stderr)
+        return 1
+    loaded = time.perf_counter() - started
+
+    jobs = []
+    for spec in specs:
+        try:
+            selected = select_rows(rows, spec)
+        except KeyError as exc:
+            print(f"Error: {exc.args[0]}", file=sys.stderr)
+            return 1
+        if not selected:
+            print(f"Warning: no run matches {spec['out']}, skipped", file=sys.stderr)
+            continue
+        jobs.append((spec, selected, Path(args.images_dir) / spec["out"]))
+
+    failed = 0
+    workers = max(1, min(args.jobs, len(jobs)))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures = {pool.submit(render, spec, selected, out_path): out_path for spec, selected, out_path in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            out_path = futures[future]
+            try:
+                seconds = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"Error: {out_path}: {type(exc).__name__}: {exc}", file=sys.stderr)
+                continue
+            print(f"Wrote image: {out_path} ({seconds:.2f}s)")
+
+    print(
+        f"{len(jobs) - failed} figures from {len(rows)} runs with {workers} workers "
+        f"in {time.perf_counter() - started:.2f}s (table {loaded:.2f}s)"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
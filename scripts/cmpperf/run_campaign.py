@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import csv
+import fcntl
+import os
+import re
+import shlex
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from campaign import read_state_rows
+from logcapture import read_summary
+
+
+HERE = Path(__file__).resolve().parent
+REPO_ROOT = HERE.parents[1]
+# Relative to the repository root, which is the working directory on every host.
+SE_SCRIPT = "scripts/A15/se_a15.py"
+LOG_CAPTURE = "scripts/cmpperf/logcapture.py"
+SCRATCH_RUN = "scripts/cmpperf/scratchrun.py"
+STATE_FIELDS = ["size", "width", "threads", "status", "outdir", "log", "mix"]
+# Host cost of the last attempt (logcapture.py summary), after the columns
+# run_q9_a15.sh reads by position.
+USAGE_FIELDS = [
+    "wall_seconds",
+    "user_seconds",
+    "sys_seconds",
+    "max_rss_kib",
+    "major_faults",
+    "voluntary_switches",
+    "involuntary_switches",
+    "read_bytes",
+    "write_bytes",
+]
+MAX_THREADS = 32
+# ssh exits with 255 when the connection itself fails (host down, auth, network).
+SSH_CONNECTION_ERROR = 255
+JOB_ID_RE = re.compile(r"(\d+)")
+# se_a15.py options that stop a run early, as --maxinsts/--rel-max-tick in run_q9_a15.sh.
+SAMPLING_ARGS = ("--maxinsts", "--rel-max-tick")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run an A15 campaign (same sweep and state.tsv as run_q9_a15.sh) on a local "
+            "process pool, a list of SSH hosts or a Slurm-style batch scheduler. Runners "
+            "claim jobs through state.tsv, so several of them can share one campaign."
+        )
+    )
+    parser.add_argument(
+        "--gem5",
+        default=os.environ.get("GEM5", "/home/g/gbusnot/ES201/tools/TP5/gem5-stable"),
+        help="gem5-stable path, identical on every host (default: $GEM5 or the ENSTA path).",
+    )
+    parser.add_argument("--binary", default="./test_omp", help="Benchmark binary (default: ./test_omp).")
+    parser.add_argument("--size", type=int, default=64, help="Matrix size (default: 64).")
+    parser.add_argument("--widths", default="2 4 8", help='O3 widths, space/comma separated (default: "2 4 8").')
+    parser.add_argument(
+        "--threads",
+        default="",
+        help="Thread list (default: powers of 2 up to min(SIZE, 32), or the core count of each mix).",
+    )
+    parser.add_argument("--mixes", default="", help="Heterogeneous CPU mixes instead of --widths (see cpu_mix.py).")
+    parser.add_argument(
+        "--results-root",
+        default=None,
+        help="Output root (default: results/A15, results/A15_mix with --mixes, + _sampled with --maxinsts/--rel-max-tick).",
+    )
+    parser.add_argument("--env-file", default=None, help="Environment file passed to se_a15.py (--env).")
+    parser.add_argument(
+        "--omp-active-wait",
+        action="store_true",
+        help="Append OMP_WAIT_POLICY=ACTIVE and GOMP_SPINCOUNT=1000000000.",
+    )
+    parser.add_argument("--no-caches", action="store_true", help="Disable --caches --l2cache.")
+    parser.add_argument(
+        "--se-arg",
+        action="append",
+        default=[],
+        help="Extra se_a15.py argument, e.g. --se-arg=--maxinsts=500000 (repeatable).",
+    )
+
+    parser.add_argument("--backend", choices=("local", "ssh", "slurm"), default="local", help="Executor (default: local).")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="local: concurrent gem5 processes (default: 1).")
+    parser.add_argument(
+        "--pin",
+        choices=("none", "core", "numa"),
+        default="none",
+        help=(
+            "local: pin each worker to its own core or NUMA node, slots spread over the nodes, "
+            "memory bound to the node with numactl when there are several (default: none)."
+        ),
+    )
+    parser.add_argument(
+        "--scratch",
+        default=None,
+        help=(
+            "Run gem5 with its outdir and log in this local directory (/tmp, /dev/shm, '$TMPDIR' "
+            "on Slurm nodes) and stage them into the results tree when it ends."
+        ),
+    )
+    parser.add_argument(
+        "--stage",
+        choices=("move", "tar"),
+        default="move",
+        help="With --scratch: move the outdir in by rename, or only write <outdir>.tar.xz (default: move).",
+    )
+    parser.add_argument(
+        "--hosts",
+        default="",
+        help='ssh: hosts as "host[:slots]", space/comma separated, e.g. "salle1:2,salle2".',
+    )
+    parser.add_argument(
+        "--ssh-command",
+        default="ssh -o BatchMode=yes {host}",
+        help="ssh: command the remote shell line is appended to (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--remote-root",
+        default=str(REPO_ROOT),
+        help="ssh: repository path on the hosts (default: this checkout's path).",
+    )
+    parser.add_argument("--slurm-jobs", type=int, default=8, help="slurm: jobs submitted at once (default: 8).")
+    parser.add_argument("--sbatch", default="sbatch --parsable", help="slurm: submit command (default: %(default)s).")
+    parser.add_argument("--sbatch-args", default="", help='slurm: extra sbatch options, e.g. "-p cpu --time=12:00:00".')
+    parser.add_argument(
+        "--squeue",
+        default="squeue -h -j {job_id} -o %T",
+        help="slurm: prints the job state, nothing once it left the queue (default: %(default)s).",
+    )
+    parser.add_argument("--scancel", default="scancel {job_id}", help="slurm: cancel command (default: %(default)s).")
+
+    parser.add_argument("--retries", type=int, default=0, help="Re-run a failed job up to N times (default: 0).")
+    parser.add_argument(
+        "--max-host-failures",
+        type=int,
+        default=3,
+        help="Consecutive connection/submission failures before a host is dropped (default: 3).",
+    )
+    parser.add_argument(
+        "--reclaim",
+        action="store_true",
+        help="Reset RUNNING rows to PENDING first (after a runner died).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Cancel a run after this many seconds and mark it FAILED (default: none).",
+    )
+    parser.add_argument("--poll", type=float, default=2.0, help="Seconds between status polls (default: 2).")
+    parser.add_argument("--dry-run", action="store_true", help="Print the commands and exit.")
+    return parser.parse_args()
+
+
+def read_list(raw):
+    return raw.replace(",", " ").split()
+
+
+def mix_cores(mix):
+    return sum(int(cluster.split("x", 1)[0]) for cluster in mix.split("+"))
+
+
+def build_jobs(args, results_root, env_file):
+    # One job per (configuration, threads), named and laid out like run_q9_a15.sh.
+    mixes = read_list(args.mixes)
+    configs = mixes or [int(width) for width in read_list(args.widths)]
+    threads_list = [int(threads) for threads in read_list(args.threads)]
+    if not threads_list and not mixes:
+        threads = 1
+        while threads <= min(args.size, MAX_THREADS):
+            threads_list.append(threads)
+            threads *= 2
+
+    jobs = []
+    for config in configs:
+        for threads in threads_list or [mix_cores(config)]:
+            if threads > MAX_THREADS or threads > args.size or (mixes and threads > mix_cores(config)):
+                raise ValueError(f"thread value {threads} is out of range for size {args.size} / {config}")
+            if mixes:
+                name, width, mix = f"s{args.size}_m{config}_t{threads}", "-", config
+            else:
+                name, width, mix = f"s{args.size}_w{config}_t{threads}", str(config), "-"
+            outdir = f"{results_root}/{name}"
+            argv = [f"{args.gem5}/build/ARM/gem5.fast", f"--outdir={outdir}", SE_SCRIPT, "--cpu-type=detailed"]
+            if mixes:
+                argv.append(f"--cpu-mix={mix}")
+            else:
+                argv += [f"--o3-width={width}", f"--num-cpus={threads}"]
+            argv += ["-c", args.binary, "-o", f"{threads} {args.size}"]
+            if env_file:
+                argv += ["--env", env_file]
+            if not args.no_caches:
+                argv += ["--caches", "--l2cache"]
+            argv += args.se_arg
+            jobs.append(
+                {
+                    "key": (str(args.size), width, str(threads), mix),
+                    "name": name,
+                    "outdir": outdir,
+                    "log": f"{results_root}/logs/{name}.log.gz",
+                    "argv": argv,
+                }
+            )
+    return jobs
+
+
+def captured(job, python="python3"):
+    # gem5 command wrapped in logcapture.py (compressed log + JSON summary), as in run_q9_a15.sh,
+    # and in scratchrun.py when the job runs in a local scratch directory.
+    argv = [python, LOG_CAPTURE, "--quiet", "--log", job["log"], "--", *job["argv"]]
+    if job.get("scratch"):
+        staging = ["--scratch", job["scratch"], "--stage", job["stage"], "--outdir", job["outdir"], "--log", job["log"]]
+        argv = [python, SCRATCH_RUN, *staging, "--", *argv]
+    return argv
+
+
+def row_key(row):
+    return (row["size"], row["width"], row["threads"], row.get("mix") or "-")
+
+
+class StateStore:
+    # state.tsv, shared by every runner and by run_q9_a15.sh. Each read-modify-write
+    # holds an flock on state.tsv.lock and replaces the file by rename; the shell takes
+    # the same lock and skips RUNNING:<owner> rows.
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+
+    @contextlib.contextmanager
+    def locked(self):
+        with self.lock_path.open("a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def read(self):
+        return read_state_rows(self.path) if self.path.is_file() else []
+
+    def write(self, rows):
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w", newline="") as handle:
+            writer = csv.DictWriter(
+                handle, fieldnames=STATE_FIELDS + USAGE_FIELDS, delimiter="\t", extrasaction="ignore", lineterminator="\n"
+            )
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, self.path)
+
+    def init(self, jobs, reclaim):
+        # Same merge as run_q9_a15.sh: one row per planned job, previous statuses kept.
+        # Rows this runner does not plan (another runner's --widths/--threads) stay as
+        # they are, claims included.
+        with self.locked():
+            previous = {row_key(row): row for row in self.read()}
+            planned = {job["key"] for job in jobs}
+            others = [row for key, row in previous.items() if key not in planned]
+            if reclaim:
+                for row in others:
+                    if row["status"].startswith("RUNNING"):
+                        row["status"] = "PENDING"
+            rows = []
+            for job in jobs:
+                status = previous.get(job["key"], {}).get("status", "PENDING")
+                if reclaim and status.startswith("RUNNING"):
+                    status = "PENDING"
+                size, width, threads, mix = job["key"]
+                rows.append(
+                    {
+                        "size": size,
+                        "width": width,
+                        "threads": threads,
+                        "status": status,
+                        "outdir": job["outdir"],
+                        "log": job["log"],
+                        "mix": mix,
+                        **{field: previous.get(job["key"], {}).get(field) or "" for field in USAGE_FIELDS},
+                    }
+                )
+            self.write(rows + others)
+        return Counter("DONE" if row["status"].startswith("DONE") else row["status"].split(":", 1)[0] for row in rows)
+
+    def claim(self, owner, keys, skip):
+        # Marks the first job that is neither done, claimed nor in skip as RUNNING:<owner>.
+        with self.locked():
+            rows = self.read()
+            for row in rows:
+                key = row_key(row)
+                if key not in keys or key in skip:
+                    continue
+                if row["status"].startswith("DONE") or row["status"].startswith("RUNNING"):
+                    continue
+                row["status"] = f"RUNNING:{owner}"
+                self.write(rows)
+                return key
+        return None
+
+    def set_status(self, key, status, usage=None):
+        with self.locked():
+            rows = self.read()
+            for row in rows:
+                if row_key(row) == key:
+                    row["status"] = status
+                    # No summary (log not visible from here): keep what is already recorded.
+                    if usage:
+                        row.update({field: usage.get(field, "") for field in USAGE_FIELDS})
+            self.write(rows)
+
+
+def job_usage(job):
+    # Host cost recorded by logcapture.py for the job, when its log is visible from
+    # here (local runs, shared home for ssh and Slurm); {} otherwise.
+    try:
+        summary = read_summary(REPO_ROOT / job["log"])
+    except (OSError, ValueError):
+        return {}
+    if not summary or summary.get("status") != "finished":
+        return {}
+    return summary.get("usage") or {}
+
+
+def parse_cpulist(text):
+    # sysfs CPU list: "0-3,8,10-11" -> [0, 1, 2, 3, 8, 10, 11].
+    cpus = []
+    for part in text.strip().split(","):
+        if part:
+            first, _, last = part.partition("-")
+            cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def cpu_topology():
+    # {NUMA node: CPUs this process may use}, each core's first hardware thread before
+    # the SMT siblings; one node when sysfs has no NUMA information.
+    allowed = os.sched_getaffinity(0)
+
+    def sibling_rank(cpu):
+        try:
+            siblings = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list").read_text()
+            return parse_cpulist(siblings).index(cpu)
+        except (OSError, ValueError):
+            return 0
+
+    nodes = {}
+    for path in sorted(Path("/sys/devices/system/node").glob("node[0-9]*")):
+        try:
+            cpus = [cpu for cpu in parse_cpulist((path / "cpulist").read_text()) if cpu in allowed]
+        except OSError:
+            continue
+        if cpus:
+            nodes[int(path.name[len("node"):])] = cpus
+    if not nodes:
+        nodes = {0: sorted(allowed)}
+    return {node: sorted(cpus, key=lambda cpu: (sibling_rank(cpu), cpu)) for node, cpus in nodes.items()}
+
+
+def placements(mode, count):
+    # (CPUs, NUMA node) of each local slot. Slots go round-robin over the nodes so
+    # concurrent gem5 processes share the memory bandwidth of every socket.
+    nodes = cpu_topology()
+    order = sorted(nodes)
+    result = []
+    for i in range(count):
+        node = order[i % len(order)]
+        cpus = nodes[node]
+        if mode == "numa":
+            result.append((cpus, node))
+        else:
+            result.append(([cpus[(i // len(order)) % len(cpus)]], node))
+    total = sum(len(cpus) for cpus in nodes.values())
+    if mode == "core" and count > total:
+        print(f"Warning: {count} slots for {total} CPUs; some cores run two gem5 processes", file=sys.stderr)
+    return result, len(nodes)
+
+
+class LocalExecutor:
+    # gem5 processes on this machine.
+
+    def __init__(self, jobs, pin="none"):
+        self.slots = [("localhost", i) for i in range(jobs)]
+        self.placements = None
+        self.numactl = None
+        if pin != "none":
+            self.placements, node_count = placements(pin, jobs)
+            if node_count > 1:
+                self.numactl = shutil.which("numactl")
+                if self.numactl is None:
+                    print("Warning: numactl not found: CPUs pinned, memory left to first-touch placement", file=sys.stderr)
+            for (host, i), (cpus, node) in zip(self.slots, self.placements):
+                print(f"  slot {i}: node {node}, CPUs {','.join(map(str, cpus))}")
+
+    def start(self, job, slot):
+        argv = captured(job, sys.executable)
+        pin = None
+        if self.placements:
+            cpus, node = self.placements[slot[1]]
+            # Inherited by logcapture.py and gem5.
+            pin = lambda: os.sched_setaffinity(0, cpus)
+            if self.numactl:
+                argv = [self.numactl, f"--membind={node}", "--", *argv]
+        return subprocess.Popen(
+            argv,
+            cwd=REPO_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+            preexec_fn=pin,
+        )
+
+    def poll(self, handle):
+        return handle.poll()
+
+    def cancel(self, handle):
+        # True once nothing of the job is left running.
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(handle.pid, signal.SIGTERM)
+        handle.wait()
+        return True
+
+    def connection_error(self, returncode):
+        return False
+
+
+class SSHExecutor(LocalExecutor):
+    # One ssh session per job; the hosts share the repository path (NFS home), so
+    # outputs and logs land in the same results/ tree as a local run.
+
+    def __init__(self, hosts, ssh_command, remote_root):
+        self.slots = [(host, i) for host, count in hosts for i in range(count)]
+        self.ssh_command = shlex.split(ssh_command)
+        self.remote_root = remote_root
+
+    def ssh(self, host, line):
+        return [token.format(host=host) for token in self.ssh_command] + [line]
+
+    def start(self, job, slot):
+        # Without a pty, killing ssh leaves the remote job running: the remote shell
+        # records its pid, which leads the process group sshd gave the session
+        # (the shell, logcapture.py and gem5), and removes it when the job ends.
+        pid_file = f"{job['log']}.pid"
+        quoted = shlex.quote(pid_file)
+        line = (
+            f"cd {shlex.quote(self.remote_root)} && mkdir -p {shlex.quote(str(Path(pid_file).parent))} "
+            f"&& echo $$ > {quoted} && {{ {shlex.join(captured(job))}; rc=$?; rm -f {quoted}; exit $rc; }}"
+        )
+        process = subprocess.Popen(
+            self.ssh(slot[0], line), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT, start_new_session=True,
+        )
+        return {"process": process, "host": slot[0], "pid_file": pid_file}
+
+    def poll(self, handle):
+        return handle["process"].poll()
+
+    def cancel(self, handle):
+        # Kills the remote process group, then the local ssh. False when the host could
+        # not be reached and its pid file (seen through the shared tree) says the job
+        # started: it may still be running there.
+        quoted = shlex.quote(handle["pid_file"])
+        line = f"cd {shlex.quote(self.remote_root)} && test -f {quoted} && kill -TERM -- -$(cat {quoted}) 2>/dev/null; rm -f {quoted}"
+        try:
+            result = subprocess.run(
+                self.ssh(handle["host"], line), stdin=subprocess.DEVNULL, capture_output=True, timeout=60
+            )
+            reached = result.returncode != SSH_CONNECTION_ERROR
+        except subprocess.TimeoutExpired:
+            reached = False
+        super().cancel(handle["process"])
+        return reached or not (REPO_ROOT / handle["pid_file"]).exists()
+
+    def connection_error(self, returncode):
+        return returncode == SSH_CONNECTION_ERROR
+
+
+class SlurmExecutor:
+    # One batch job per run. The job script writes its exit code next to the log, so
+    # completion is known without sacct; a job that leaves the queue without it was lost.
+
+    def __init__(self, jobs, sbatch, sbatch_args, squeue, scancel):
+        self.slots = [("slurm", i) for i in range(jobs)]
+        self.sbatch = shlex.split(sbatch) + shlex.split(sbatch_args)
+        self.squeue = shlex.split(squeue)
+        self.scancel = shlex.split(scancel)
+
+    def start(self, job, slot):
+        log = REPO_ROOT / job["log"]
+        script = log.with_name(f"{job['name']}.sbatch")
+        marker = log.with_name(f"{job['name']}.exitcode")
+        marker.unlink(missing_ok=True)
+        script.write_text(
+            "#!/bin/bash\n"
+            f"#SBATCH --job-name={job['name']}\n"
+            f"#SBATCH --output={log.with_name(job['name'] + '.slurm.out')}\n"
+            f"cd {shlex.quote(str(REPO_ROOT))}\n"
+            f"{shlex.join(captured(job))}\n"
+            f"echo $? > {shlex.quote(str(marker))}.tmp && mv {shlex.quote(str(marker))}.tmp {shlex.quote(str(marker))}\n",
+            encoding="utf-8",
+        )
+        result = subprocess.run(self.sbatch + [str(script)], capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        ids = JOB_ID_RE.findall(result.stdout)
+        if result.returncode != 0 or not ids:
+            raise OSError(f"submission failed: {(result.stderr or result.stdout).strip()}")
+        return {"job_id": ids[-1], "marker": marker, "gone": 0}
+
+    def command(self, template, handle):
+        return [token.format(job_id=handle["job_id"]) for token in template]
+
+    def poll(self, handle):
+        if handle["marker"].is_file():
+            return int(handle["marker"].read_text().strip() or 1)
+        result = subprocess.run(self.command(self.squeue, handle), capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        if result.stdout.strip():
+            handle["gone"] = 0
+            return None
+        # Out of the queue: give a shared filesystem a few polls to show the marker.
+        handle["gone"] += 1
+        return "lost" if handle["gone"] >= 3 else None
+
+    def cancel(self, handle):
+        result = subprocess.run(self.command(self.scancel, handle), capture_output=True, stdin=subprocess.DEVNULL)
+        return result.returncode == 0
+
+    def connection_error(self, returncode):
+        return False
+
+
+def parse_hosts(raw):
+    hosts = []
+    for item in read_list(raw):
+        host, _, count = item.partition(":")
+        hosts.append((host, int(count) if count else 1))
+    return hosts
+
+
+def make_executor(args):
+    if args.pin != "none" and args.backend != "local":
+        raise ValueError('--pin only applies to --backend local (Slurm: --sbatch-args "--cpu-bind=cores")')
+    if args.backend == "ssh":
+        hosts = parse_hosts(args.hosts)
+        if not hosts:
+            raise ValueError("--backend ssh needs --hosts")
+        return SSHExecutor(hosts, args.ssh_command, args.remote_root)
+    if args.backend == "slurm":
+        return SlurmExecutor(args.slurm_jobs, args.sbatch, args.sbatch_args, args.squeue, args.scancel)
+    return LocalExecutor(args.jobs, args.pin)
+
+
+def label(job):
+    return f"{job['name']} ({job['outdir']})"
+
+
+def run(store, jobs, executor, args):
+    by_key = {job["key"]: job for job in jobs}
+    owner = f"{socket.gethostname()}-{os.getpid()}"
+    free = list(executor.slots)
+    running = {}
+    attempts = Counter()
+    given_up = set()
+    host_failures = Counter()
+    dropped = set()
+    results = Counter()
+    per_host = Counter()
+
+    def release(slot):
+        if slot[0] not in dropped:
+            free.append(slot)
+
+    def connection_failed(slot, key, reason, requeue=True):
+        # Back to PENDING for another host once the job is known to be stopped. Otherwise
+        # it may still be writing its outdir there: the claim is kept so no other host
+        # starts it into the same directory.
+        if requeue:
+            store.set_status(key, "PENDING")
+            print(f"Warning: {slot[0]}: {reason}", file=sys.stderr)
+        else:
+            print(f"Warning: {slot[0]}: {reason}; may still run there, left RUNNING (check, then --reclaim)", file=sys.stderr)
+        host_failures[slot[0]] += 1
+        if host_failures[slot[0]] >= args.max_host_failures and slot[0] not in dropped:
+            dropped.add(slot[0])
+            free[:] = [other for other in free if other[0] != slot[0]]
+            print(f"Warning: dropping host {slot[0]} after {host_failures[slot[0]]} failures", file=sys.stderr)
+
+    try:
+        while True:
+            while free:
+                slot = free.pop(0)
+                key = store.claim(owner, by_key, given_up)
+                if key is None:
+                    free.insert(0, slot)
+                    break
+                job = by_key[key]
+                if not job.get("scratch"):
+                    Path(REPO_ROOT / job["outdir"]).mkdir(parents=True, exist_ok=True)
+                try:
+                    handle = executor.start(job, slot)
+                except OSError as exc:
+                    connection_failed(slot, key, exc)
+                    release(slot)
+                    continue
+                running[slot] = (key, handle, time.perf_counter())
+                print(f"RUN: {label(job)} on {slot[0]}")
+            if not running:
+                break
+            time.sleep(args.poll)
+            for slot, (key, handle, started) in list(running.items()):
+                returncode = executor.poll(handle)
+                job = by_key[key]
+                if returncode is None and args.timeout and time.perf_counter() - started > args.timeout:
+                    # A hung gem5 never exits by itself.
+                    returncode = "timeout" if executor.cancel(handle) else "unreachable"
+                if returncode is None:
+                    continue
+                del running[slot]
+                if returncode == "unreachable":
+                    connection_failed(slot, key, f"timed out, cannot reach it to stop {job['name']}", requeue=False)
+                elif returncode == 0:
+                    store.set_status(key, "DONE", job_usage(job))
+                    host_failures[slot[0]] = 0
+                    results["DONE"] += 1
+                    per_host[slot[0]] += 1
+                    print(f"DONE: {label(job)} on {slot[0]} in {time.perf_counter() - started:.0f}s")
+                elif executor.connection_error(returncode):
+                    # ssh lost the session: stop what may have started before requeuing.
+                    connection_failed(
+                        slot, key, f"connection failed while running {job['name']}", requeue=executor.cancel(handle)
+                    )
+                else:
+                    store.set_status(key, "FAILED", job_usage(job))
+                    attempts[key] += 1
+                    if attempts[key] > args.retries:
+                        given_up.add(key)
+                        results["FAILED"] += 1
+                    print(f"FAILED: {label(job)} on {slot[0]} (exit={returncode}), see {job['log']}", file=sys.stderr)
+                release(slot)
+    except KeyboardInterrupt:
+        print("Interrupted: cancelling running jobs", file=sys.stderr)
+        for slot, (key, handle, _) in running.items():
+            if executor.cancel(handle):
+                store.set_status(key, "PENDING")
+            else:
+                print(f"Warning: {slot[0]} unreachable, {by_key[key]['name']} left RUNNING", file=sys.stderr)
+        return 130
+
+    pending = sum(
+        1 for row in store.read()
+        if row_key(row) in by_key and not row["status"].startswith("DONE") and row_key(row) not in given_up
+    )
+    print(f"Campaign: done={results['DONE']} failed={results['FAILED']} left={pending} ({owner})")
+    for host, count in sorted(per_host.items()):
+        print(f"  {host}: {count} run(s)")
+    if dropped:
+        print(f"  dropped hosts: {', '.join(sorted(dropped))}")
+    return 1 if results["FAILED"] or pending else 0
+
+
+def interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    args = parse_args()
+    # kill/timeout cancel the running jobs and release their claims, like Ctrl-C.
+    signal.signal(signal.SIGTERM, interrupt)
+
+    # Sampled and mixed runs go to their own tree so they never shadow full runs in state.tsv.
+    results_root = args.results_root
+    if results_root is None:
+        results_root = "results/A15_mix" if args.mixes else "results/A15"
+        if any(arg.split("=", 1)[0] in SAMPLING_ARGS for arg in args.se_arg):
+            results_root += "_sampled"
+    logs_dir = REPO_ROOT / results_root / "logs"
+    env_file = args.env_file
+    if args.omp_active_wait:
+        # Written under results/, which every host sees, instead of a local mktemp.
+        env_path = Path(results_root) / "logs" / "omp_active_env.txt"
+        lines = Path(args.env_file).read_text().splitlines() if args.env_file else []
+        lines += ["OMP_WAIT_POLICY=ACTIVE", "GOMP_SPINCOUNT=1000000000"]
+        if not args.dry_run:
+            logs_dir.mkdir(parents=True, exist_ok=True)
+            (REPO_ROOT / env_path).write_text("\n".join(lines) + "\n")
+        env_file = str(env_path)
+
+    try:
+        jobs = build_jobs(args, results_root, env_file)
+        executor = make_executor(args)
+        if args.scratch:
+            for job in jobs:
+                job.update(scratch=args.scratch, stage=args.stage)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    if args.dry_run:
+        for job in jobs:
+            print(shlex.join(captured(job)))
+        return 0
+    if args.backend == "local" and not os.access(jobs[0]["argv"][0], os.X_OK):
+        print(f"Error: gem5 binary not found or not executable: {jobs[0]['argv'][0]}", file=sys.stderr)
+        return 1
+
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    store = StateStore(REPO_ROOT / results_root / "state.tsv")
+    counts = store.init(jobs, args.reclaim)
+    print(
+        f"Campaign {results_root}: {len(jobs)} jobs ({', '.join(f'{status.lower()}={count}' for status, count in sorted(counts.items()))}), "
+        f"backend={args.backend} slots={len(executor.slots)}"
+    )
+    return run(store, jobs, executor, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+import argparse
+import ctypes
+import errno
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+
+
+STAGES = ("move", "tar")
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run a gem5 job with its outdir and log in a local scratch directory, then "
+            "stage them into the results tree: the outdir is moved in by rename (or "
+            "archived as <outdir>.tar.xz) and the log replaces the old one atomically."
+        )
+    )
+    parser.add_argument(
+        "--scratch",
+        required=True,
+        help="Local directory (e.g. /tmp, /dev/shm, $TMPDIR on a Slurm node); environment variables are expanded.",
+    )
+    parser.add_argument("--outdir", required=True, help="Final gem5 outdir in the results tree.")
+    parser.add_argument("--log", required=True, help="Final logcapture.py log in the results tree.")
+    parser.add_argument(
+        "--stage",
+        choices=STAGES,
+        default="move",
+        help="move: outdir renamed into place; tar: <outdir>.tar.xz only (default: move).",
+    )
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run (after --); --outdir/--log values are rewritten.")
+    args = parser.parse_args()
+    if args.command and args.command[0] == "--":
+        args.command = args.command[1:]
+    return args
+
+
+def rewrite(argv, replacements):
+    # Arguments equal to a final path, or ending in "=<path>", point to scratch instead.
+    out = []
+    for arg in argv:
+        for final, local in replacements.items():
+            if arg == final:
+                arg = local
+            elif arg.endswith("=" + final):
+                arg = arg[: -len(final)] + local
+        out.append(arg)
+    return out
+
+
+def replace_file(source, target):
+    # Copied next to the target first, so the rename stays on one filesystem.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def exchange(a, b):
+    # Atomic swap of two paths (renameat2 RENAME_EXCHANGE, Linux >= 3.15 on local
+    # filesystems). False where the libc or the filesystem (NFS) does not support it.
+    libc = ctypes.CDLL(None, use_errno=True)
+    renameat2 = getattr(libc, "renameat2", None)
+    if renameat2 is None:
+        return False
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    if renameat2(AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error, os.strerror(error), str(a))
+
+
+def replace_dir(source, target):
+    # Readers see the old outdir or the complete new one, never a half-copied tree.
+    # The old one is swapped out atomically; without RENAME_EXCHANGE it is renamed
+    # aside first, and the outdir is missing between the two renames.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f".{target.name}.{os.getpid()}.staging")
+    shutil.copytree(source, staging)
+    if not target.exists():
+        os.rename(staging, target)
+        return
+    if exchange(staging, target):
+        # staging now holds the old outdir.
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    old = target.with_name(f".{target.name}.{os.getpid()}.old")
+    os.rename(target, old)
+    os.rename(staging, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def archive_dir(source, target):
+    archive = target.with_name(target.name + ".tar.xz")
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive.with_name(f".{archive.name}.{os.getpid()}.tmp")
+    with tarfile.open(tmp_path, "w:xz") as tar:
+        # stats.txt first: gem5stats.read_stats streams the archive and stops there.
+        tar.add(source, arcname=target.name, recursive=False)
+        children = sorted(source.iterdir(), key=lambda path: (path.name != "stats.txt", path.name))
+        for child in children:
+            tar.add(child, arcname=f"{target.name}/{child.name}")
+    os.replace(tmp_path, archive)
+    return archive
+
+
+def stage_log(local_log, final_log):
+    # The compressed log and its JSON summary (logcapture.py).
+    for suffix in ("", ".summary.json"):
+        source = Path(str(local_log) + suffix)
+        if source.is_file():
+            replace_file(source, Path(str(final_log) + suffix))
+
+
+def main():
+    args = parse_args()
+    if not args.command:
+        print("Error: no command given (after --)", file=sys.stderr)
+        return 2
+
+    outdir = Path(args.outdir)
+    final_log = Path(args.log)
+    scratch_root = Path(os.path.expandvars(args.scratch))
+    if "$" in str(scratch_root):
+        print(f"Error: --scratch {args.scratch}: environment variable not set on {os.uname().nodename}", file=sys.stderr)
+        return 2
+    scratch_root.mkdir(parents=True, exist_ok=True)
+    work = Path(tempfile.mkdtemp(prefix=f"{outdir.name}.", dir=scratch_root))
+    local_outdir = work / outdir.name
+    local_log = work / final_log.name
+    command = rewrite(args.command, {args.outdir: str(local_outdir), args.log: str(local_log)})
+
+    process = subprocess.Popen(command)
+    terminated = []
+
+    def forward(signum, frame):
+        # The executor cancels the whole process group; the log is still staged.
+        terminated.append(signum)
+        if process.poll() is None:
+            process.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    returncode = process.wait()
+
+    try:
+        stage_log(local_log, final_log)
+        if not terminated and local_outdir.is_dir():
+            if args.stage == "tar":
+                archive_dir(local_outdir, outdir)
+            else:
+                replace_dir(local_outdir, outdir)
+    except OSError as exc:
+        print(f"Error: staging {work} into the results tree failed: {exc}; scratch kept", file=sys.stderr)
+        return returncode or 1
+    shutil.rmtree(work, ignore_errors=True)
+
+    if terminated:
+        return 128 + terminated[0]
+    # Same convention as the shell: 128+N for a child killed by signal N.
+    return 128 - returncode if returncode < 0 else returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from campaign import find_runs
+from configindex import effective_params
+from cube import RUN_MEASURES, MetricsCube, run_record
+from run_campaign import MAX_THREADS
+
+
+FACTORS = ["core_type", "size", "width", "mix", "threads", "cores", "cache", "wait_policy"]
+# Sweep dimension -> run_campaign.py option that samples it.
+SWEEP_FLAGS = {
+    "size": "--size",
+    "width": "--widths",
+    "threads": "--threads",
+    "mix": "--mixes",
+    "wait_policy": "--omp-active-wait",
+    "cache": "--no-caches",
+}
+INDEX_FIELDS = ["metric", "term", "kind", "share", "total_share", "levels"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Variance-based (Sobol/ANOVA) sensitivity of cycles and host cost to the swept "
+            "parameters: main effects, two-way interactions and total effects over the "
+            "campaign table, and which sweep dimensions to sample densely or collapse."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--cube",
+        default=None,
+        help="Read the table from a metrics cube (cube.py refresh) instead of parsing runs; no mix/wait_policy.",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images",
+        help="Directory where sensitivity.csv and sensitivity.json are written (default: results/images).",
+    )
+    parser.add_argument(
+        "--campaign",
+        action="append",
+        default=[],
+        help="Only include these campaigns (repeatable; default: all).",
+    )
+    parser.add_argument(
+        "--metric",
+        action="append",
+        default=[],
+        help="Measure to explain (repeatable; default: cycles and host_seconds).",
+    )
+    parser.add_argument(
+        "--linear",
+        action="store_true",
+        help="Decompose the variance of the metric itself instead of its logarithm.",
+    )
+    parser.add_argument(
+        "--dense",
+        type=float,
+        default=0.10,
+        help="Total-effect share above which a dimension is sampled densely (default: 0.10).",
+    )
+    parser.add_argument(
+        "--collapse",
+        type=float,
+        default=0.01,
+        help="Share under which a dimension (and all its interactions) is collapsed to one level (default: 0.01).",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Interactions printed per metric (default: 10).")
+    return parser.parse_args()
+
+
+def load_rows(args):
+    if args.cube:
+        return MetricsCube(args.cube).rows()
+    rows = []
+    for run in find_runs(args.results_root):
+        if args.campaign and run["campaign"] not in args.campaign:
+            continue
+        record = run_record(run)
+        if record is None:
+            print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+            continue
+        coords, values = record
+        row = dict(coords, **dict(zip(RUN_MEASURES, values)))
+        row["mix"] = run["mix"]
+        row["wait_policy"] = (effective_params(run["outdir"]) or {}).get("omp_wait_policy")
+        rows.append(row)
+    return rows
+
+
+def partition(labels):
+    # Level codes in order of first appearance: equal for factors that split the runs alike.
+    codes = {}
+    return tuple(codes.setdefault(label, len(codes)) for label in labels)
+
+
+def sweep_factors(rows):
+    # Factors with more than one level, aliases merged (threads=cores in homogeneous
+    # sweeps; core_type=cache=wait_policy when each core type has its own campaign).
+    # A factor fixed by the level of another (core_type by width: A7 has none) is
+    # nested: it is left out of the decomposition and reported with that factor.
+    merged = {}
+    for name in FACTORS:
+        labels = [row.get(name) for row in rows]
+        if len(set(labels)) < 2:
+            continue
+        key = partition(labels)
+        for members, known in merged.values():
+            if known == key:
+                members.append(name)
+                break
+        else:
+            merged[name] = ([name], key)
+    factors = {"=".join(members): np.array(key) for members, key in merged.values()}
+    nested = {}
+    for name in sorted(factors, key=lambda n: len(set(factors[n].tolist()))):
+        parents = [other for other in determined_by(factors, name) if other not in nested]
+        if parents:
+            nested[name] = parents[0]
+    return {name: codes for name, codes in factors.items() if name not in nested}, nested
+
+
+def group_ss(codes, y, columns):
+    # Sum of squares between the cells of the given factors, and within them.
+    if not columns:
+        return 0.0, float(((y - y.mean()) ** 2).sum())
+    _, cells = np.unique(codes[:, columns], axis=0, return_inverse=True)
+    cells = cells.reshape(-1)
+    counts = np.bincount(cells)
+    means = np.bincount(cells, weights=y) / counts
+    between = float((counts * (means - y.mean()) ** 2).sum())
+    within = float(((y - means[cells]) ** 2).sum())
+    return between, within
+
+
+def decompose(codes, names, y):
+    # First-order share S_i = Var(E[y|x_i]) / Var(y), pair share S_ij from the (x_i, x_j)
+    # cell means minus both main effects, and total share ST_i = E[Var(y|x_~i)] / Var(y):
+    # what is left when every other factor is fixed. Replicates (same point in two
+    # campaigns, run-to-run noise) are the residual and are taken out of ST_i.
+    total = float(((y - y.mean()) ** 2).sum())
+    if not total:
+        return None
+    k = len(names)
+    _, residual = group_ss(codes, y, list(range(k)))
+    main = [group_ss(codes, y, [i])[0] / total for i in range(k)]
+    pairs = {}
+    for i, j in itertools.combinations(range(k), 2):
+        pairs[(names[i], names[j])] = group_ss(codes, y, [i, j])[0] / total - main[i] - main[j]
+    totals = [(group_ss(codes, y, [j for j in range(k) if j != i])[1] - residual) / total for i in range(k)]
+    return {
+        "main": dict(zip(names, main)),
+        "pairs": pairs,
+        "total": dict(zip(names, totals)),
+        "residual": residual / total,
+    }
+
+
+def determined_by(factors, name):
+    # Other factors whose level fixes this one (core_type by width, say).
+    own = factors[name]
+    return [
+        other
+        for other, codes in factors.items()
+        if other != name and all(len(set(own[codes == level])) == 1 for level in set(codes.tolist()))
+    ]
+
+
+def sort_levels(levels):
+    return sorted(levels, key=lambda level: (level is None, str(type(level)), level if level is not None else 0))
+
+
+def dense_levels(levels):
+    # Observed numeric levels plus the geometric midpoints (sweeps are powers of two).
+    numeric = [level for level in levels if isinstance(level, (int, float)) and level > 0]
+    if len(numeric) != len(levels):
+        return levels
+    extra = {round(math.sqrt(a * b)) for a, b in zip(numeric, numeric[1:])}
+    return sorted(set(numeric) | extra)
+
+
+def sweep_levels(rows, name, levels, max_threads):
+    # Levels the factor's run_campaign.py option accepts, as values of that option's
+    # dimension (cache for core_type=cache): no "-" (A7 width, mixed runs) and thread
+    # counts the runner allows for the swept sizes.
+    members = name.split("=")
+    flagged = [member for member in members if member in SWEEP_FLAGS]
+    if not flagged:
+        return levels
+    if flagged[0] != members[0]:
+        alias = {row.get(members[0]): row.get(flagged[0]) for row in rows}
+        levels = sort_levels({alias[level] for level in levels if level in alias})
+    levels = [level for level in levels if level is not None]
+    if "threads" in members:
+        levels = [level for level in levels if 1 <= level <= max_threads]
+    return levels
+
+
+def factor_levels(rows, name):
+    return sort_levels({row.get(name.split("=")[0]) for row in rows})
+
+
+def advise(args, factors, nested, results, rows):
+    plan = {}
+    for name in factors:
+        levels = factor_levels(rows, name)
+        totals = [result["total"][name] for result in results.values()]
+        pairs = [share for result in results.values() for pair, share in result["pairs"].items() if name in pair]
+        if max(totals) >= args.dense:
+            advice, sample = "dense", dense_levels(levels)
+        elif max(totals + pairs) >= args.collapse:
+            advice, sample = "sparse", sort_levels({levels[0], levels[len(levels) // 2], levels[-1]})
+        else:
+            # Cheapest level: it does not change the answer, only the bill.
+            cost = {}
+            for row in rows:
+                cost.setdefault(row.get(name.split("=")[0]), []).append(row.get("host_seconds", float("nan")))
+            medians = {
+                level: float(np.nanmedian(values)) if not np.isnan(values).all() else math.inf
+                for level, values in cost.items()
+            }
+            advice, sample = "collapse", [min(levels, key=lambda level: medians[level])]
+        plan[name] = {"advice": advice, "levels": levels, "sample": sample, "total_share": dict(zip(results, totals))}
+    for name, parent in nested.items():
+        levels = factor_levels(rows, name)
+        plan[name] = {"advice": f"with {parent}", "levels": levels, "sample": levels, "total_share": {}}
+    max_threads = min([MAX_THREADS] + [row["size"] for row in rows])
+    for name, entry in plan.items():
+        entry["sample"] = sweep_levels(rows, name, entry["sample"], max_threads)
+        entry["flags"] = [SWEEP_FLAGS[member] for member in name.split("=") if member in SWEEP_FLAGS]
+    return plan
+
+
+def label(level):
+    return "-" if level is None else str(level)
+
+
+def main():
+    args = parse_args()
+    try:
+        rows = load_rows(args)
+    except (OSError, ValueError) as exc:
+        print(f"Error: cannot read the table: {exc}", file=sys.stderr)
+        return 1
+    if args.campaign:
+        rows = [row for row in rows if row.get("campaign") in args.campaign]
+    # Hand-named variants (A15_w4_t8_active) have no size: not a sweep point.
+    unknown = [row for row in rows if row.get("size") is None or row.get("threads") is None]
+    rows = [row for row in rows if row not in unknown]
+    if unknown:
+        print(f"Note: {len(unknown)} runs without size/threads left out (hand-named variants)")
+    if len(rows) < 3:
+        print(f"Error: need at least 3 runs, found {len(rows)}", file=sys.stderr)
+        return 1
+
+    metrics = args.metric or ["cycles", "host_seconds"]
+    factors, nested = sweep_factors(rows)
+    if not factors:
+        print("Error: no parameter varies across the selected runs.", file=sys.stderr)
+        return 1
+    names = list(factors)
+    codes = np.column_stack([factors[name] for name in names])
+
+    results = {}
+    index_rows = []
+    for metric in metrics:
+        values = np.array([row.get(metric, float("nan")) for row in rows], dtype=np.float64)
+        valid = np.isfinite(values) & ((values > 0) | args.linear)
+        if valid.sum() < 3:
+            print(f"Warning: {metric}: fewer than 3 runs with a value, skipped", file=sys.stderr)
+            continue
+        y = values[valid] if args.linear else np.log(values[valid])
+        result = decompose(codes[valid], names, y)
+        if result is None:
+            print(f"Warning: {metric}: constant over the selected runs, skipped", file=sys.stderr)
+            continue
+        results[metric] = result
+        for name in names:
+            index_rows.append(
+                {
+                    "metric": metric,
+                    "term": name,
+                    "kind": "main",
+                    "share": result["main"][name],
+                    "total_share": result["total"][name],
+                    "levels": len(set(factors[name].tolist())),
+                }
+            )
+        for (a, b), share in result["pairs"].items():
+            index_rows.append({"metric": metric, "term": f"{a} x {b}", "kind": "pair", "share": share})
+        index_rows.append({"metric": metric, "term": "residual", "kind": "residual", "share": result["residual"]})
+    if not results:
+        print("Error: no metric could be decomposed.", file=sys.stderr)
+        return 1
+
+    scale = "variance" if args.linear else "variance of log"
+    print(f"{len(rows)} runs, factors: {', '.join(f'{name} ({len(set(factors[name].tolist()))})' for name in names)}")
+    for name, parent in nested.items():
+        print(f"  {name} is fixed by {parent}: counted in its effect")
+    for metric, result in results.items():
+        print(f"\n{metric} ({scale}; residual {result['residual']:.1%}):")
+        print(f"  {'factor':<32} {'main':>7} {'total':>7}")
+        for name in sorted(names, key=lambda n: -result["total"][n]):
+            print(f"  {name:<32} {result['main'][name]:7.1%} {result['total'][name]:7.1%}")
+        ranked = sorted(result["pairs"].items(), key=lambda item: -item[1])[: args.top]
+        if ranked:
+            print(f"  {'interaction':<32} {'share':>7}")
+            for (a, b), share in ranked:
+                print(f"  {a + ' x ' + b:<32} {share:7.1%}")
+
+    plan = advise(args, factors, nested, results, rows)
+    print(f"\nSweep plan (dense: total >= {args.dense:.0%}, collapse: all shares < {args.collapse:.0%}):")
+    for name, entry in plan.items():
+        flags = f" [{' '.join(entry['flags'])}]" if entry["flags"] else ""
+        sample = " ".join(label(level) for level in entry["sample"])
+        print(f"  {name:<32} {entry['advice']:<18} {sample}{flags}")
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "sensitivity.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=INDEX_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(index_rows)
+    json_path = images_dir / "sensitivity.json"
+    document = {
+        "runs": len(rows),
+        "scale": "linear" if args.linear else "log",
+        "thresholds": {"dense": args.dense, "collapse": args.collapse},
+        "plan": plan,
+    }
+    json_path.write_text(json.dumps(document, indent=1, default=str) + "\n", encoding="utf-8")
+    print(f"\nWrote sensitivity CSV: {csv_path}")
+    print(f"Wrote sweep plan: {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+from campaign import find_runs
+from configindex import effective_params
+from gem5stats import per_cpu, read_stats
+from metrics import add_speedup, base_metrics, baseline_rows, core_type
+
+
+# O3 cores count committed branches/loads at commit; simple and Minor cores use
+# their own names. The first name a run has is used.
+BRANCH_STATS = ("commit.branches", "Branches")
+LOAD_STATS = ("commit.loads", "num_load_insts")
+IDLE_STATS = ("idleCycles", "num_idle_cycles")
+# Branches per instruction of a GOMP spin loop (~4 instructions, one branch); spin.csv
+# measures it as spin_branch_ratio, 0.25 on every ACTIVE run.
+SPIN_BRANCH_RATIO = 0.25
+LLSC_STATS = ("dcache.LoadLockedReq_accesses::total", "dcache.StoreCondReq_accesses::total")
+
+RUN_FIELDS = [
+    "name", "campaign", "core_type", "size", "width", "mix", "threads", "wait_policy", "baseline",
+    "sim_insts", "work_insts", "sync_insts", "sync_share", "cycles", "ipc", "useful_ipc",
+    "ipc_inflation", "spin_branch_ratio", "idle_share", "llsc_pki",
+]
+CORE_FIELDS = [
+    "name", "campaign", "threads", "wait_policy", "cpu", "committed", "cycles", "idle_cycles",
+    "ipc", "sync_insts", "useful_insts", "useful_ipc", "sync_share", "branch_ratio", "load_ratio", "llsc_ops",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Useful-work IPC of OpenMP runs: committed instructions beyond the t=1 work "
+            "(spin-waiting under OMP_WAIT_POLICY=ACTIVE, runtime overhead) are split per "
+            "core from their branch signature and reported next to the raw IPC."
+        )
+    )
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images",
+        help="Directory where spin.csv and spin_cores.csv are written (default: results/images).",
+    )
+    parser.add_argument(
+        "--campaign",
+        action="append",
+        default=[],
+        help="Only report these campaigns (repeatable); t=1 baselines still come from every campaign.",
+    )
+    return parser.parse_args()
+
+
+def first_per_cpu(stats, names):
+    for name in names:
+        values = per_cpu(stats, name)
+        if values:
+            return values
+    return {}
+
+
+def core_counters(stats):
+    committed = per_cpu(stats, "committedInsts")
+    cycles = per_cpu(stats, "numCycles")
+    branches = first_per_cpu(stats, BRANCH_STATS)
+    loads = first_per_cpu(stats, LOAD_STATS)
+    idle = first_per_cpu(stats, IDLE_STATS)
+    llsc = [per_cpu(stats, name) for name in LLSC_STATS]
+    return [
+        {
+            "cpu": cpu,
+            "committed": committed[cpu],
+            "cycles": cycles.get(cpu, 0),
+            "idle_cycles": idle.get(cpu, float("nan")),
+            "branches": branches.get(cpu, float("nan")),
+            "loads": loads.get(cpu, float("nan")),
+            "llsc_ops": sum(values[cpu] for values in llsc if cpu in values) if any(llsc) else float("nan"),
+        }
+        for cpu in sorted(committed)
+    ]
+
+
+def split_sync(cores, work, branch_ratio):
+    # Instructions beyond the sequential work are synchronization overhead. Spin loops
+    # are branch-dense (a GOMP spin iteration is ~4 instructions, one branch), so each
+    # core gets a share of that excess in proportion to its branches beyond the t=1 mix.
+    # Also returns the branch ratio this implies for the excess, a check of the split:
+    # constant across active runs when the excess really is spinning.
+    sync = max(0, sum(core["committed"] for core in cores) - work)
+    excess = [max(0.0, core["branches"] - branch_ratio * core["committed"]) for core in cores]
+    if sync == 0 or any(value != value for value in excess):
+        return [0.0 if sync == 0 else float("nan")] * len(cores), float("nan")
+    total = sum(excess)
+    if not total:
+        # No branch signature: spread over the cores by committed instructions.
+        weights = [core["committed"] for core in cores]
+        total = sum(weights)
+    else:
+        weights = excess
+    shares = [min(core["committed"], sync * weight / total) for core, weight in zip(cores, weights)]
+    return shares, branch_ratio + sum(excess) / sync
+
+
+def ratio(numerator, denominator):
+    return numerator / denominator if denominator else float("nan")
+
+
+def main():
+    args = parse_args()
+
+    rows = []
+    counters = {}
+    for run in find_runs(args.results_root):
+        stats = read_stats(run["stats_path"])
+        metrics = base_metrics(stats)
+        if metrics is None:
+            print(f"Warning: skipping {run['name']} (no sim_insts/numCycles)", file=sys.stderr)
+            continue
+        metrics.update({key: run[key] for key in ("name", "campaign", "size", "width", "mix", "threads")})
+        metrics["core_type"] = core_type(run)
+        metrics["outdir"] = run["outdir"]
+        rows.append(metrics)
+        counters[run["name"]] = core_counters(stats)
+    if not rows:
+        print(f"Error: no run found under {args.results_root}", file=sys.stderr)
+        return 1
+    rows.sort(key=lambda row: (row["campaign"], row["size"] or 0, row["mix"] or "", row["width"] or 0, row["threads"]))
+    # useful_ipc and sync_share as everywhere else (metrics.add_speedup).
+    add_speedup(rows)
+
+    run_rows = []
+    core_rows = []
+    for row, baseline in zip(rows, baseline_rows(rows)):
+        if args.campaign and row["campaign"] not in args.campaign:
+            continue
+        if baseline is None:
+            print(f"Warning: skipping {row['name']} (no t=1 run for its size and width or mix)", file=sys.stderr)
+            continue
+        cores = counters[row["name"]]
+        base_cores = counters[baseline["name"]]
+        work = sum(core["committed"] for core in base_cores)
+        branch_ratio = ratio(sum(core["branches"] for core in base_cores), work)
+        shares, spin_branch_ratio = split_sync(cores, work, branch_ratio)
+        params = effective_params(row["outdir"]) or {}
+
+        committed = sum(core["committed"] for core in cores)
+        sync = max(0, committed - work)
+        llsc = sum(core["llsc_ops"] for core in cores)
+        run_rows.append(
+            {
+                **{key: row[key] for key in ("name", "campaign", "core_type", "size", "width", "mix", "threads")},
+                "wait_policy": params.get("omp_wait_policy") or "unknown",
+                "baseline": baseline["name"],
+                "sim_insts": row["sim_insts"],
+                "work_insts": work,
+                "sync_insts": sync,
+                "sync_share": row["sync_share"],
+                "cycles": row["cycles"],
+                "ipc": row["ipc"],
+                "useful_ipc": row["useful_ipc"],
+                "ipc_inflation": row["ipc"] / row["useful_ipc"] - 1,
+                "spin_branch_ratio": spin_branch_ratio,
+                "idle_share": ratio(sum(core["idle_cycles"] for core in cores), sum(core["cycles"] for core in cores)),
+                "llsc_pki": ratio(1000 * llsc, committed),
+            }
+        )
+        for core, share in zip(cores, shares):
+            useful = core["committed"] - share
+            core_rows.append(
+                {
+                    "name": row["name"],
+                    "campaign": row["campaign"],
+                    "threads": row["threads"],
+                    "wait_policy": run_rows[-1]["wait_policy"],
+                    "cpu": core["cpu"],
+                    "committed": core["committed"],
+                    "cycles": core["cycles"],
+                    "idle_cycles": core["idle_cycles"],
+                    "ipc": ratio(core["committed"], core["cycles"]),
+                    "sync_insts": share,
+                    "useful_insts": useful,
+                    "useful_ipc": ratio(useful, core["cycles"]),
+                    "sync_share": ratio(share, core["committed"]),
+                    "branch_ratio": ratio(core["branches"], core["committed"]),
+                    "load_ratio": ratio(core["loads"], core["committed"]),
+                    "llsc_ops": core["llsc_ops"],
+                }
+            )
+    if not run_rows:
+        print("Error: no run with a t=1 baseline found.", file=sys.stderr)
+        return 1
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    runs_path = images_dir / "spin.csv"
+    cores_path = images_dir / "spin_cores.csv"
+    for path, fields, table in ((runs_path, RUN_FIELDS, run_rows), (cores_path, CORE_FIELDS, core_rows)):
+        with path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(table)
+
+    print(f"{'run':<28} {'policy':<8} {'ipc':>7} {'useful':>7} {'infl':>6} {'sync':>6} {'idle':>6} {'spin br':>7}")
+    for row in run_rows:
+        print(
+            f"{row['name']:<28} {row['wait_policy']:<8} {row['ipc']:7.3f} {row['useful_ipc']:7.3f} "
+            f"{row['ipc_inflation']:6.1%} {row['sync_share']:6.1%} {row['idle_share']:6.1%} {row['spin_branch_ratio']:7.3f}"
+        )
+    print(f"Wrote spin CSV: {runs_path}")
+    print(f"Wrote spin CSV: {cores_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import re
+import sys
+import time
+from pathlib import Path
+
+from campaign import find_runs
+from gem5stats import CPU_STAT_RE, read_stats
+
+# Per-requestor breakdowns such as system.l2.ReadReq_misses::cpu5.data.
+REQUESTOR_RE = re.compile(r"::(?P<group>switch_cpus|cpu)\d+\.")
+
+# Ranking groups; the first matching pattern wins, everything else is "other".
+FAMILIES = [
+    ("dcache", re.compile(r"^system\.(?:switch_)?cpus?\d*\*?\.dcache\.")),
+    ("icache", re.compile(r"^system\.(?:switch_)?cpus?\d*\*?\.icache\.")),
+    ("cpu", re.compile(r"^system\.(?:switch_)?cpus?\d*\*?\.")),
+    ("l2", re.compile(r"^system\.l2\.")),
+    ("tol2bus", re.compile(r"^system\.tol2bus\.")),
+    ("membus", re.compile(r"^system\.membus\.")),
+    ("mem_ctrls", re.compile(r"^system\.mem_ctrls")),
+    ("host", re.compile(r"^host_")),
+]
+FIELDS = [
+    "family",
+    "key",
+    "pairs",
+    "moved",
+    "a_mean",
+    "b_mean",
+    "abs_delta_mean",
+    "rel_delta_mean",
+    "rel_delta_max",
+    "only_in",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Diff every stats.txt key between two runs or two campaigns aligned on "
+            "(size, width, mix, threads), with the largest movers per stat family."
+        )
+    )
+    parser.add_argument("a", help="Run (e.g. A15/s64_w4_t8) or campaign (e.g. A15).")
+    parser.add_argument("b", help="Run or campaign compared against a (e.g. A15_w4_t8_active).")
+    parser.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory scanned for runs (default: results).",
+    )
+    parser.add_argument(
+        "--min-rel",
+        type=float,
+        default=0.05,
+        help="Relative change |b-a|/|a| a key needs to count as moved (default: 0.05).",
+    )
+    parser.add_argument(
+        "--min-abs",
+        type=float,
+        default=0.0,
+        help="Absolute change a key also needs to count as moved (default: 0).",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Movers shown per family (default: 10).")
+    parser.add_argument(
+        "--family",
+        action="append",
+        default=None,
+        help=f"Only show these families (repeatable; {', '.join(name for name, _ in FAMILIES)}, other).",
+    )
+    parser.add_argument(
+        "--per-core",
+        action="store_true",
+        help="Keep system.cpuN keys apart instead of folding them into system.cpu* (mean over cores).",
+    )
+    parser.add_argument(
+        "--csv",
+        default=None,
+        help="Also write every moved key to this CSV (e.g. results/images/statdiff.csv).",
+    )
+    return parser.parse_args()
+
+
+def family(key):
+    for name, pattern in FAMILIES:
+        if pattern.match(key):
+            return name
+    return "other"
+
+
+def fold_cores(stats):
+    # system.cpu3.dcache.x -> system.cpu*.dcache.x (and ::cpu3.data -> ::cpu*.data),
+    # averaged over cores: pairs are aligned on the same thread count, so relative
+    # deltas of counts are unchanged and ratio stats (ipc, miss rates) stay meaningful.
+    folded = {}
+    counts = {}
+    for key, value in stats.items():
+        match = CPU_STAT_RE.match(key)
+        if match:
+            key = f"system.{match.group('group')}*.{match.group('stat')}"
+        key = REQUESTOR_RE.sub(lambda m: f"::{m.group('group')}*.", key)
+        folded[key] = folded.get(key, 0) + value
+        counts[key] = counts.get(key, 0) + 1
+    return {key: value / counts[key] for key, value in folded.items()}
+
+
+def point(run):
+    return (run["size"], run["width"], run["mix"], run["threads"])
+
+
+def align(runs, a, b):
+    # [(run_a, run_b)] for two runs, or for every point two campaigns share. Hand-named
+    # variants have no size (None), which matches any size.
+    by_name = {run["name"]: run for run in runs}
+    by_campaign = {}
+    for run in runs:
+        by_campaign.setdefault(run["campaign"], []).append(run)
+    if a in by_name and b in by_name:
+        return [(by_name[a], by_name[b])]
+    if a in by_campaign and b in by_campaign:
+        pairs = []
+        for run_a in by_campaign[a]:
+            for run_b in by_campaign[b]:
+                same = all(
+                    x == y or (i == 0 and (x is None or y is None))
+                    for i, (x, y) in enumerate(zip(point(run_a), point(run_b)))
+                )
+                if same:
+                    pairs.append((run_a, run_b))
+                    break
+        return pairs
+    unknown = [name for name in (a, b) if name not in by_name and name not in by_campaign]
+    if unknown:
+        raise KeyError(f"no run or campaign named: {', '.join(unknown)}")
+    raise KeyError("compare two runs or two campaigns, not one of each")
+
+
+def load_matrices(pairs, fold):
+    import numpy as np
+
+    # Per side, float64 values and bool presence [pairs x keys] over the union of keys
+    # (gem5 itself writes nan, so NaN cannot mark a missing key).
+    sides = ([], [])
+    for run_a, run_b in pairs:
+        for side, run in zip(sides, (run_a, run_b)):
+            stats = read_stats(run["stats_path"])
+            side.append(fold_cores(stats) if fold else stats)
+    keys = sorted(set().union(*sides[0], *sides[1]))
+    index = {key: j for j, key in enumerate(keys)}
+    matrices = []
+    for side in sides:
+        values = np.zeros((len(side), len(keys)))
+        present = np.zeros((len(side), len(keys)), dtype=bool)
+        for i, stats in enumerate(side):
+            columns = np.fromiter((index[key] for key in stats), dtype=np.int64, count=len(stats))
+            values[i, columns] = np.fromiter(stats.values(), dtype=np.float64, count=len(stats))
+            present[i, columns] = True
+        matrices.append((values, present))
+    return keys, matrices[0], matrices[1]
+
+
+def diff(a, b, min_rel, min_abs):
+    import numpy as np
+
+    # Per key over all pairs; keys missing on one side (and nan/inf values) count
+    # as 0 there, and keys found on one side only are reported in only_in.
+    (a, present_a), (b, present_b) = a, b
+    a0 = np.where(np.isfinite(a), a, 0.0)
+    b0 = np.where(np.isfinite(b), b, 0.0)
+    delta = b0 - a0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = np.where(a0 != 0, delta / np.abs(a0), np.where(delta != 0, np.inf * np.sign(delta), 0.0))
+    moved = (np.abs(rel) >= min_rel) & (np.abs(delta) > min_abs) & (present_a | present_b)
+    finite = np.isfinite(rel)
+    strongest = np.argmax(np.where(np.isnan(rel), -1, np.abs(rel)), axis=0)
+    with np.errstate(invalid="ignore"):
+        rel_mean = np.where(finite, rel, 0.0).sum(axis=0) / finite.sum(axis=0)
+    return {
+        "moved": moved.sum(axis=0),
+        "a_mean": a0.mean(axis=0),
+        "b_mean": b0.mean(axis=0),
+        "abs_delta_mean": delta.mean(axis=0),
+        # Over the pairs where the key had a non-zero base value.
+        "rel_delta_mean": rel_mean,
+        "rel_delta_max": rel[strongest, np.arange(rel.shape[1])],
+        "only_a": present_a.any(axis=0) & ~present_b.any(axis=0),
+        "only_b": present_b.any(axis=0) & ~present_a.any(axis=0),
+    }
+
+
+def main():
+    args = parse_args()
+    # After parse_args: --help does not pay for the numpy import.
+    import numpy as np
+
+    started = time.perf_counter()
+    try:
+        pairs = align(find_runs(args.results_root), args.a, args.b)
+    except KeyError as exc:
+        print(f"Error: {exc.args[0]}", file=sys.stderr)
+        return 1
+    if not pairs:
+        print(f"Error: {args.a} and {args.b} have no (size, width, mix, threads) point in common.", file=sys.stderr)
+        return 1
+    keys, a, b = load_matrices(pairs, not args.per_core)
+    loaded = time.perf_counter() - started
+    result = diff(a, b, args.min_rel, args.min_abs)
+    elapsed = time.perf_counter() - started - loaded
+
+    rows = []
+    for j in np.flatnonzero(result["moved"]):
+        only_in = "a" if result["only_a"][j] else "b" if result["only_b"][j] else ""
+        rows.append(
+            {
+                "family": family(keys[j]),
+                "key": keys[j],
+                "pairs": len(pairs),
+                "moved": int(result["moved"][j]),
+                **{name: float(result[name][j]) for name in ("a_mean", "b_mean", "abs_delta_mean", "rel_delta_mean", "rel_delta_max")},
+                "only_in": only_in,
+            }
+        )
+    # Keys that only exist on one side (+-inf) go after the real movers.
+    rows.sort(key=lambda row: (-row["moved"], bool(row["only_in"]), -abs(row["rel_delta_max"])))
+
+    print(
+        f"{len(pairs)} pair(s), {len(keys)} keys: {len(rows)} moved by >= {args.min_rel:.0%} "
+        f"(load {loaded:.2f}s, diff {elapsed * 1000:.1f} ms)"
+    )
+    for run_a, run_b in pairs[:5]:
+        print(f"  {run_a['name']} -> {run_b['name']}")
+    if len(pairs) > 5:
+        print(f"  ... {len(pairs) - 5} more")
+
+    families = args.family or [name for name, _ in FAMILIES] + ["other"]
+    for name in families:
+        movers = [row for row in rows if row["family"] == name][: args.top]
+        if not movers:
+            continue
+        print(f"\n[{name}]")
+        print(f"  {'key':<58} {'a':>13} {'b':>13} {'rel max':>9} {'moved':>6}")
+        for row in movers:
+            flag = f" (only in {row['only_in']})" if row["only_in"] else ""
+            print(
+                f"  {row['key']:<58} {row['a_mean']:13.6g} {row['b_mean']:13.6g} "
+                f"{row['rel_delta_max']:+9.1%} {row['moved']:>3}/{row['pairs']:<2}{flag}"
+            )
+
+    if args.csv:
+        csv_path = Path(args.csv)
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        with csv_path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nWrote stat diff CSV: {csv_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
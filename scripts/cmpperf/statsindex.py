@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+import argparse
+import fnmatch
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from campaign import find_runs
+from gem5stats import BEGIN_MARKER, END_MARKER, STATS_ARCHIVE_SUFFIX, parse_value, read_stats
+
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"G5IDX1\n\0"
+# magic, stats size, stats mtime_ns, entry count, key width
+INDEX_HEADER = struct.Struct("<8sQQII")
+KEY_RE = re.compile(rb"^([A-Za-z_][^\s#]*)\s")
+GLOB_CHARS = "*?["
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Sidecar key -> byte offset index for stats.txt, and mmap lookups "
+            "of single keys or key globs across many runs."
+        )
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build (or refresh stale) stats.txt.idx files.")
+    build.add_argument("--results-root", default="results", help="Directory scanned for stats.txt (default: results).")
+    build.add_argument("--force", action="store_true", help="Rebuild even if the index is up to date.")
+
+    query = sub.add_parser("query", help="Print the requested keys of every run as TSV.")
+    query.add_argument("--results-root", default="results", help="Directory scanned for stats.txt (default: results).")
+    query.add_argument("patterns", nargs="+", help="Stat keys or globs, e.g. sim_insts 'system.cpu*.committedInsts'.")
+    return parser.parse_args()
+
+
+def index_path_for(stats_path):
+    return Path(str(stats_path) + INDEX_SUFFIX)
+
+
+def build_index(stats_path):
+    stats_path = Path(stats_path)
+    stat = stats_path.stat()
+    keys = []
+    offsets = []
+    with stats_path.open("rb") as handle:
+        offset = 0
+        begun = False
+        for line in handle:
+            if line.startswith(BEGIN_MARKER.encode()):
+                if begun:
+                    break
+                begun = True
+            elif line.startswith(END_MARKER.encode()):
+                # Only the first dump is indexed, like read_stats() by default.
+                break
+            else:
+                match = KEY_RE.match(line)
+                if match:
+                    keys.append(match.group(1))
+                    offsets.append(offset)
+            offset += len(line)
+
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    width = max((len(key) for key in keys), default=1)
+    key_array = np.array([keys[i] for i in order], dtype=f"S{width}")
+    offset_array = np.array([offsets[i] for i in order], dtype="<u8")
+
+    index_path = index_path_for(stats_path)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with tmp_path.open("wb") as out:
+        out.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(keys), width))
+        out.write(key_array.tobytes())
+        out.write(offset_array.tobytes())
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def index_is_fresh(stats_path):
+    index_path = index_path_for(stats_path)
+    try:
+        with index_path.open("rb") as handle:
+            magic, size, mtime_ns, _, _ = INDEX_HEADER.unpack(handle.read(INDEX_HEADER.size))
+    except (OSError, struct.error):
+        return False
+    stat = Path(stats_path).stat()
+    return magic == INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+
+class StatsIndex:
+    # Read-only view of one stats.txt through its sidecar index; nothing but the
+    # index and the requested lines is paged in.
+
+    def __init__(self, stats_path, build=True):
+        self.stats_path = Path(stats_path)
+        if not index_is_fresh(self.stats_path):
+            if not build:
+                raise FileNotFoundError(f"no up-to-date index for {self.stats_path}")
+            build_index(self.stats_path)
+        with index_path_for(self.stats_path).open("rb") as handle:
+            raw = handle.read()
+        _, _, _, count, width = INDEX_HEADER.unpack_from(raw)
+        start = INDEX_HEADER.size
+        self.keys = np.frombuffer(raw, dtype=f"S{width}", count=count, offset=start)
+        self.offsets = np.frombuffer(raw, dtype="<u8", count=count, offset=start + count * width)
+        self._file = None
+        self._map = None
+
+    def _mmap(self):
+        if self._map is None:
+            self._file = self.stats_path.open("rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _value_at(self, offset):
+        data = self._mmap()
+        end = data.find(b"\n", offset)
+        fields = data[offset:end if end >= 0 else len(data)].split()
+        return parse_value(fields[1].decode())
+
+    def _positions(self, pattern):
+        encoded = pattern.encode()
+        cut = min((i for i, ch in enumerate(pattern) if ch in GLOB_CHARS), default=None)
+        if cut is None:
+            i = int(np.searchsorted(self.keys, encoded))
+            if i < len(self.keys) and self.keys[i] == encoded:
+                return [i]
+            return []
+        # Globs: binary-search the literal prefix, then fnmatch inside that range only.
+        prefix = encoded[:cut]
+        lo = int(np.searchsorted(self.keys, prefix, side="left"))
+        hi = int(np.searchsorted(self.keys, prefix + b"\xff", side="left"))
+        return [i for i in range(lo, hi) if fnmatch.fnmatchcase(self.keys[i].decode(), pattern)]
+
+    def get(self, key, default=None):
+        positions = self._positions(key)
+        return self._value_at(int(self.offsets[positions[0]])) if positions else default
+
+    def lookup(self, patterns):
+        found = {}
+        for pattern in patterns:
+            for i in self._positions(pattern):
+                found[self.keys[i].decode()] = self._value_at(int(self.offsets[i]))
+        return found
+
+
+def build(args):
+    count = 0
+    started = time.perf_counter()
+    for run in find_runs(args.results_root):
+        # Byte offsets only mean something in a plain stats.txt, not inside a .tar.xz.
+        if str(run["stats_path"]).endswith(STATS_ARCHIVE_SUFFIX):
+            continue
+        if args.force or not index_is_fresh(run["stats_path"]):
+            build_index(run["stats_path"])
+            count += 1
+    print(f"Indexed {count} stats file(s) in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+def query(args):
+    runs = find_runs(args.results_root)
+    if not runs:
+        print(f"Error: no run with stats.txt found under {args.results_root}", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    results = []
+    for run in runs:
+        if str(run["stats_path"]).endswith(STATS_ARCHIVE_SUFFIX):
+            # scratchrun.py --stage tar runs have no index: full parse of the archived stats.txt.
+            stats = read_stats(run["stats_path"])
+            found = {key: value for key, value in stats.items() if any(fnmatch.fnmatchcase(key, p) for p in args.patterns)}
+            results.append((run["name"], found))
+            continue
+        with StatsIndex(run["stats_path"]) as index:
+            results.append((run["name"], index.lookup(args.patterns)))
+    elapsed = time.perf_counter() - started
+
+    keys = sorted({key for _, found in results for key in found})
+    print("\t".join(["run"] + keys))
+    for name, found in results:
+        print("\t".join([name] + [str(found.get(key, "")) for key in keys]))
+    print(f"# {len(runs)} run(s), {len(keys)} key(s) in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+def main():
+    args = parse_args()
+    if args.command == "build":
+        return build(args)
+    return query(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import math
+import sys
+from pathlib import Path
+
+from campaign import describe_row, done_runs, read_state_rows
+from gem5stats import max_cycles, per_cpu, read_stats
+from spin import BRANCH_STATS, SPIN_BRANCH_RATIO, first_per_cpu
+
+
+METRICS = ["ipc", "cpi", "cycles_est"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare a sampled campaign (--maxinsts / --rel-max-tick windows) "
+            "against the full runs and report the estimation error per metric."
+        )
+    )
+    parser.add_argument(
+        "--full-root",
+        default="results/A15",
+        help="Root directory of the full campaign (default: results/A15).",
+    )
+    parser.add_argument(
+        "--sampled-root",
+        default="results/A15_sampled",
+        help="Root directory of the sampled campaign (default: results/A15_sampled).",
+    )
+    parser.add_argument(
+        "--images-dir",
+        default="results/images/A15",
+        help="Directory where the validation CSV is written (default: results/images/A15).",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=None,
+        help="Optional size filter.",
+    )
+    return parser.parse_args()
+
+
+def run_metrics(stats_path):
+    # Instructions and cycles of the measured cores: after --fast-forward the switch
+    # CPUs, whose counters start at the switch, while sim_insts also counts the
+    # fast-forwarded instructions (stats are not reset).
+    stats = read_stats(stats_path)
+    insts = sum(per_cpu(stats, "committedInsts").values())
+    cycles = max_cycles(stats)
+    if not insts or not cycles:
+        return None
+    return {
+        "insts": insts,
+        "branches": sum(first_per_cpu(stats, BRANCH_STATS).values()) or float("nan"),
+        "cycles": cycles,
+        "ipc": insts / cycles,
+        "cpi": cycles / insts,
+        "host_seconds": stats.get("host_seconds", float("nan")),
+    }
+
+
+def useful_ipc(metrics, branch_ratio):
+    # IPC without the spin-wait instructions: those beyond the t=1 branch mix are
+    # counted at SPIN_BRANCH_RATIO branches each, as spin.py splits them.
+    if math.isnan(metrics["branches"]) or math.isnan(branch_ratio):
+        return float("nan")
+    excess = max(0.0, metrics["branches"] - branch_ratio * metrics["insts"])
+    sync = min(metrics["insts"], excess / (SPIN_BRANCH_RATIO - branch_ratio))
+    return (metrics["insts"] - sync) / metrics["cycles"]
+
+
+def load_campaign(root, size_filter):
+    state_file = Path(root) / "state.tsv"
+    rows, missing = done_runs(read_state_rows(state_file), size_filter)
+    runs = {}
+    for row in rows:
+        metrics = run_metrics(row["stats_path"])
+        if metrics is None:
+            missing.append((row, "committedInsts or numCycles not found in stats.txt"))
+            continue
+        runs[(row["size"], row["width"], row["mix"], row["threads"])] = metrics
+    return runs, missing
+
+
+def rel_error(estimate, reference):
+    if reference == 0:
+        return float("nan")
+    return (estimate - reference) / reference
+
+
+def compare(full_runs, sampled_runs):
+    # The unit of work is the full t=1 instruction count of the same configuration:
+    # it carries no OpenMP spin and is the only count known without a full run. Its
+    # branch ratio separates the spin-wait instructions of a window from the work.
+    t1_by_config = {key[:3]: metrics for key, metrics in full_runs.items() if key[3] == 1}
+
+    rows = []
+    for key in sorted(sampled_runs, key=lambda k: (k[0], k[1] or 0, k[2] or "", k[3])):
+        full = full_runs.get(key)
+        if full is None:
+            continue
+        sampled = sampled_runs[key]
+        size, width, mix, threads = key
+        t1 = t1_by_config.get(key[:3], full)
+        work = t1["insts"]
+        branch_ratio = t1["branches"] / t1["insts"]
+        # Estimated with the useful-work IPC: the raw IPC counts spin-waiting
+        # (OMP_WAIT_POLICY=ACTIVE) as work and would put cycles_est low by sync_share.
+        sampled_useful_ipc = useful_ipc(sampled, branch_ratio)
+        cycles_est = work / sampled_useful_ipc
+        rows.append(
+            {
+                "size": size,
+                "width": width,
+                "mix": mix,
+                "threads": threads,
+                "ipc_full": full["ipc"],
+                "ipc_sampled": sampled["ipc"],
+                "ipc_err": rel_error(sampled["ipc"], full["ipc"]),
+                "cpi_full": full["cpi"],
+                "cpi_sampled": sampled["cpi"],
+                "cpi_err": rel_error(sampled["cpi"], full["cpi"]),
+                "cycles_full": full["cycles"],
+                "cycles_est": cycles_est,
+                "cycles_est_err": rel_error(cycles_est, full["cycles"]),
+                "useful_ipc_full": work / full["cycles"],
+                "useful_ipc_sampled": sampled_useful_ipc,
+                "sync_share_full": max(0.0, 1 - work / full["insts"]),
+                "sync_share_sampled": 1 - sampled_useful_ipc / sampled["ipc"],
+                "sampled_insts": sampled["insts"],
+                "host_seconds_full": full["host_seconds"],
+                "host_seconds_sampled": sampled["host_seconds"],
+                "host_speedup": (
+                    full["host_seconds"] / sampled["host_seconds"]
+                    if sampled["host_seconds"]
+                    else float("nan")
+                ),
+            }
+        )
+    return rows
+
+
+def summarize(rows):
+    summary = []
+    for metric in METRICS:
+        errors = [abs(row[f"{metric}_err"]) for row in rows if not math.isnan(row[f"{metric}_err"])]
+        if not errors:
+            continue
+        summary.append(
+            {
+                "metric": metric,
+                "runs": len(errors),
+                "mean_abs_err": sum(errors) / len(errors),
+                "max_abs_err": max(errors),
+            }
+        )
+    speedups = [row["host_speedup"] for row in rows if not math.isnan(row["host_speedup"])]
+    mean_speedup = sum(speedups) / len(speedups) if speedups else float("nan")
+    return summary, mean_speedup
+
+
+def write_rows(rows, csv_path):
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    args = parse_args()
+
+    for root in (args.full_root, args.sampled_root):
+        if not (Path(root) / "state.tsv").is_file():
+            print(f"Error: state file not found: {Path(root) / 'state.tsv'}", file=sys.stderr)
+            return 1
+
+    full_runs, _ = load_campaign(args.full_root, args.size)
+    sampled_runs, sampled_missing = load_campaign(args.sampled_root, args.size)
+
+    rows = compare(full_runs, sampled_runs)
+    if not rows:
+        print("Error: no sampled run has a matching full run.", file=sys.stderr)
+        return 1
+
+    images_dir = Path(args.images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = images_dir / "sampled_validation.csv"
+    summary_path = images_dir / "sampled_validation_summary.csv"
+
+    summary, mean_speedup = summarize(rows)
+    write_rows(rows, csv_path)
+    write_rows(summary, summary_path)
+
+    print(f"Wrote validation CSV: {csv_path}")
+    print(f"Wrote summary CSV: {summary_path}")
+    for entry in summary:
+        print(
+            f"  {entry['metric']:<11} runs={entry['runs']:<3} "
+            f"mean|err|={entry['mean_abs_err'] * 100:6.2f}%  max|err|={entry['max_abs_err'] * 100:6.2f}%"
+        )
+    print(f"  host time speedup (full / sampled): {mean_speedup:.1f}x")
+
+    if sampled_missing:
+        print("Sampled runs not included:")
+        for row, reason in sampled_missing:
+            print(f"  {describe_row(row)} -> {reason}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())